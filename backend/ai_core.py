@@ -1,21 +1,132 @@
 import os
-from groq import Groq
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
 import json
+import threading
+import time
+from concurrent.futures import Future
+from embedding_cache import open_cache
+from vector_index import make_retriever
+from ranking import GENERIC_TERMS, build_rank_context, score_candidates
+from roles import canon_role, infer_profile_role, infer_role_from_skills
+from feature_store import feature_store
+from team_index import team_index
+from corpus_stats import corpus_stats
+from result_cache import result_cache
+from corpus_version import corpus_version
+from lazy import LazySingleton
+import metrics
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+CHROMA_PATH = os.getenv("CHROMA_PATH", "./chroma_db")
+
+
+def _load_groq_client():
+    from groq import Groq
+    return Groq(api_key=os.getenv("GROQ_API_KEY"))
+
+
+def _load_embedding_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+
+def _open_chroma():
+    """Open the persistent Chroma client and sync the derived indexes with it."""
+    import chromadb
+    from chromadb.config import Settings
+    chroma = chromadb.PersistentClient(
+        path=CHROMA_PATH,
+        settings=Settings(anonymized_telemetry=False)
+    )
+
+    # team_id -> member ids; Chroma is the source of truth, so rebuild on open
+    try:
+        team_index.rebuild(chroma.get_collection(name="collaborators"))
+    except Exception as e:
+        print(f"⚠️  Team index not rebuilt ({e}); using persisted copy with {len(team_index)} teams")
+
+    # Role/availability counters for /stats and /users/available
+    try:
+        corpus_stats.reconcile(chroma.get_collection(name="collaborators"))
+    except Exception as e:
+        print(f"⚠️  Corpus counters not reconciled ({e}); will retry on first use")
+    return chroma
+
 
-# Initialize Groq client
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# Expensive clients are created on first use (or by warmup()), so importing this module is cheap
+client = LazySingleton("groq_client", _load_groq_client)
+embedding_model = LazySingleton("embedding_model", _load_embedding_model)
+chroma_client = LazySingleton("chroma_client", _open_chroma)
 
-# Initialize embedding model
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+# Persistent embedding cache shared with seed_db (None if disabled)
+embedding_cache = open_cache(EMBEDDING_MODEL_NAME)
 
-# Initialize ChromaDB client (disable telemetry noise)
-chroma_client = chromadb.PersistentClient(
-    path="./chroma_db",
-    settings=Settings(anonymized_telemetry=False)
-)
+# Availability values that count as "can still be matched"
+AVAILABLE_STATUSES = ["Available", "Full-time", "Part-time", "Contract", "Advisory", "Open"]
+
+# Extra matches find_collaborators ranks (and caches) beyond the 5 it returns, so a cached
+# list can still serve callers whose exclude_ids remove a few of them
+EXCLUDE_HEADROOM = 5
+
+# Retrieval backend for similarity search (RETRIEVAL_BACKEND=chroma|numpy)
+retriever = make_retriever(lambda: chroma_client.get_collection(name="collaborators"))
+
+# Result of the last warmup() run (None until one has run)
+last_warmup = None
+
+
+def warmup():
+    """
+    Load the embedding model, open Chroma and build the Groq client, then run one dummy
+    encode and one dummy similarity query so the first real request pays none of it.
+    Returns per-step timings in seconds; a failed step is reported, not raised.
+    """
+    global last_warmup
+    timings = {}
+    errors = {}
+    start = time.perf_counter()
+
+    step = time.perf_counter()
+    vector = None
+    try:
+        vector = embedding_model.encode("warmup").tolist()
+    except Exception as e:
+        errors["embedding_model"] = str(e)
+    timings["embedding_model"] = round(time.perf_counter() - step, 3)
+
+    step = time.perf_counter()
+    try:
+        chroma_client.get()
+        if vector is not None:
+            retriever.query(vector, 1)
+    except Exception as e:
+        errors["chroma_client"] = str(e)
+    timings["chroma_client"] = round(time.perf_counter() - step, 3)
+
+    step = time.perf_counter()
+    try:
+        if isinstance(client, LazySingleton):
+            client.get()
+    except Exception as e:
+        errors["groq_client"] = str(e)
+    timings["groq_client"] = round(time.perf_counter() - step, 3)
+
+    timings["total"] = round(time.perf_counter() - start, 3)
+    last_warmup = {"timings": timings, "errors": errors, "ok": not errors}
+    print(f"🔥 Warmup finished in {timings['total']:.2f}s" + (f" with errors: {errors}" if errors else ""))
+    return last_warmup
+
+
+def readiness():
+    """Per-component initialization state, without triggering any loading."""
+    components = {}
+    for name, obj in (("embedding_model", embedding_model), ("chroma_client", chroma_client), ("groq_client", client)):
+        # Benchmarks/tests may swap a component for a plain stub object
+        components[name] = obj.status() if isinstance(obj, LazySingleton) else {"ready": True, "stub": True}
+    return {
+        "ready": all(c["ready"] for c in components.values()),
+        "components": components,
+        "warmup": last_warmup
+    }
 
 
 def get_chat_response(message, chat_history):
@@ -64,21 +175,24 @@ You: What domains interest you most?
     messages.append({"role": "user", "content": message})
     
     try:
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=messages,
-            temperature=0.2,  # Lower for more consistent tracking
-            max_tokens=30  # Strictly short responses
-        )
+        with metrics.stage("llm_chat"):
+            response = client.chat.completions.create(
+                model="llama-3.1-8b-instant",
+                messages=messages,
+                temperature=0.2,  # Lower for more consistent tracking
+                max_tokens=30  # Strictly short responses
+            )
         return response.choices[0].message.content
     except Exception as e:
         return "I'm having trouble responding right now. Could you try again?"
 
 
-def extract_user_profile(chat_transcript):
+def extract_user_profile(chat_transcript, raise_errors=False):
     """
     Extract structured profile from chat transcript using Groq's llama-3.3-70b-versatile model with JSON mode.
     Optimized to handle long, informal Slack-style intros or multi-turn chats.
+    With raise_errors=True a failed call (Groq error, invalid JSON) raises instead of
+    returning the placeholder profile, so batch callers can retry the message later.
     """
     prompt = f"""Extract a JSON profile from the conversation or intro text.
 Required keys (always present):
@@ -111,15 +225,16 @@ Conversation or Intro:
 Return ONLY valid JSON, no other text."""
 
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",  # Updated to current model
-            messages=[
-                {"role": "system", "content": "You are a JSON extraction expert. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"}
-        )
+        with metrics.stage("llm_extract"):
+            response = client.chat.completions.create(
+                model="llama-3.3-70b-versatile",  # Updated to current model
+                messages=[
+                    {"role": "system", "content": "You are a JSON extraction expert. Return only valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                response_format={"type": "json_object"}
+            )
         
         raw_content = response.choices[0].message.content
         profile = json.loads(raw_content)
@@ -136,6 +251,8 @@ Return ONLY valid JSON, no other text."""
             
         return profile
     except json.JSONDecodeError as e:
+        if raise_errors:
+            raise
         return {
             "name": "User",
             "skills": ["General"],
@@ -143,6 +260,8 @@ Return ONLY valid JSON, no other text."""
             "looking_for": "Software Engineer"
         }
     except Exception as e:
+        if raise_errors:
+            raise
         return {
             "name": "User",
             "skills": ["General"],
@@ -151,79 +270,92 @@ Return ONLY valid JSON, no other text."""
         }
 
 
+def _encode(texts):
+    """Run the embedding model on cache misses (timed as the embed_encode stage)."""
+    with metrics.stage("embed_encode"):
+        return embedding_model.encode(texts, show_progress_bar=False).tolist()
+
+
 def create_embedding(text):
     """
-    Create embedding using sentence-transformers.
+    Create embedding using sentence-transformers, served from the on-disk cache when possible.
     """
-    return embedding_model.encode(text).tolist()
+    if embedding_cache is None:
+        return _encode([text])[0]
+    return embedding_cache.encode([text], _encode)[0]
 
 
-def find_collaborators(user_profile):
+def create_embeddings(texts, cache=True):
+    """
+    Batch version of create_embedding: one encode call for every text not already cached.
+    cache=False skips the on-disk cache for throwaway texts (e.g. slot detector tokens).
+    """
+    if not texts:
+        return []
+    if embedding_cache is None or not cache:
+        return _encode(texts)
+    return embedding_cache.encode(texts, _encode)
+
+
+class EmbeddingMemo:
+    """
+    Per-request {text: embedding} memo shared by steps that may run on different threads.
+    Concurrent requests for the same text embed it once; the others wait for that result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+        self.reused = 0
+
+    def get(self, text):
+        with self._lock:
+            fut = self._futures.get(text)
+            owner = fut is None
+            if owner:
+                fut = self._futures[text] = Future()
+            else:
+                self.reused += 1
+        if owner:
+            try:
+                fut.set_result(create_embedding(text))
+            except Exception as e:
+                fut.set_exception(e)
+        return fut.result()
+
+
+def _embed(text, embeddings=None):
+    return embeddings.get(text) if embeddings is not None else create_embedding(text)
+
+
+def _searchable_text(role, profile):
+    """
+    Text embedded for a profile: role, then skills, then interests. Stored profiles use their
+    own role and searches the wanted role(s), so the two texts (and an EmbeddingMemo entry)
+    coincide when someone is looking for their own role.
+    """
+    return f"{role} {' '.join(profile.get('skills', []))} {' '.join(profile.get('interests', []))}"
+
+
+def find_collaborators(user_profile, embeddings=None, exclude_ids=None):
     """
     Find matching collaborators from ChromaDB based on user profile.
+    Pass an EmbeddingMemo as `embeddings` to share query embeddings with other steps, and
+    the searching user's own id(s) as `exclude_ids` if their profile may already be saved.
     """
-    try:
-        # Get or create collection
-        collection = chroma_client.get_collection(name="collaborators")
-        
-        # Helper: canonicalize role labels to match our DB roles
-        def _canon_role(raw: str) -> str:
-            if not raw:
-                return ''
-            s = str(raw).strip().lower()
-            direct = {
-                'software engineer': 'Software Engineer',
-                'engineer': 'Software Engineer',
-                'developer': 'Software Engineer',
-                'swe': 'Software Engineer',
-                'coder': 'Software Engineer',
-                'frontend': 'Software Engineer',
-                'backend': 'Software Engineer',
-                'fullstack': 'Software Engineer',
-                'full-stack': 'Software Engineer',
-                'ux': 'Designer',
-                'ui': 'Designer',
-                'ui/ux': 'Designer',
-                'designer': 'Designer',
-                'product manager': 'Product Manager',
-                'pm': 'Product Manager',
-                'product': 'Product Manager',
-                'data scientist': 'Data Scientist',
-                'ml engineer': 'Data Scientist',
-                'ai engineer': 'Data Scientist',
-                'finance expert': 'Finance & Operations',
-                'marketing': 'Marketing & Growth',
-                'growth': 'Marketing & Growth',
-                'sales': 'Sales & Business Development',
-                'business development': 'Sales & Business Development',
-                'biz dev': 'Sales & Business Development',
-                'finance': 'Finance & Operations',
-                'operations': 'Finance & Operations',
-                'ops': 'Finance & Operations',
-            }
-            if s in direct:
-                return direct[s]
-            if any(k in s for k in ['engineer', 'developer', 'dev', 'coder']):
-                return 'Software Engineer'
-            if any(k in s for k in ['design', 'figma', 'ux', 'ui']):
-                return 'Designer'
-            if 'product' in s or s == 'pm':
-                return 'Product Manager'
-            if any(k in s for k in ['data', 'ml', 'machine learning', 'ai']):
-                return 'Data Scientist'
-            if any(k in s for k in ['marketing', 'growth']):
-                return 'Marketing & Growth'
-            if any(k in s for k in ['sales', 'business', 'partnership']):
-                return 'Sales & Business Development'
-            if any(k in s for k in ['finance', 'operation', 'ops']):
-                return 'Finance & Operations'
-            return raw.strip()
+    exclude = set(exclude_ids or ())
+    # Rank a few extra so the cached list still has 5 left once any caller's ids are dropped
+    limit = 5 + max(len(exclude), EXCLUDE_HEADROOM)
 
+    def _without_excluded(rows):
+        return [md for md in rows if md.get('id') not in exclude] if exclude else rows
+
+    try:
         # Create query embedding from desired roles (roles_needed or looking_for) and interests
         roles_needed = user_profile.get('roles_needed', []) or []
-        roles_needed_canon = [ _canon_role(r) for r in roles_needed if r ]
+        roles_needed_canon = [ canon_role(r) for r in roles_needed if r ]
         looking_for_raw = user_profile.get('looking_for', 'collaborator')
-        looking_for_canon = _canon_role(looking_for_raw)
+        looking_for_canon = canon_role(looking_for_raw)
         # Only use known roles for filtering/targeting; treat others as generic
         known_roles = {
             'Software Engineer','Designer','Product Manager','Data Scientist',
@@ -234,261 +366,84 @@ def find_collaborators(user_profile):
         roles_needed_canon = [r for r in roles_needed_canon if r in known_roles]
         lf_for_filter = looking_for_canon if looking_for_canon in known_roles else ''
         roles_part = ' '.join(roles_needed_canon) if roles_needed_canon else lf_for_filter
+
+        # Same normalized query against an unchanged corpus: reuse the previous ranking.
+        # It is cached before exclude_ids are applied, so callers with new ids share it
+        result_key = result_cache.collaborators_key(user_profile, roles_needed_canon, lf_for_filter)
+        cached = result_cache.get(result_key)
+        if cached is not None:
+            kept = _without_excluded(cached)
+            # A list cut at the limit that lost too many rows is re-ranked with a longer one
+            if kept and (len(kept) >= 5 or len(cached) < 5 + EXCLUDE_HEADROOM):
+                return kept[:5]
+
+        collection = chroma_client.get_collection(name="collaborators")
         # Include interests and skills to improve semantic recall
-        query_text = f"{roles_part} {' '.join(user_profile.get('interests', []))} {' '.join(user_profile.get('skills', []))}"
-        query_embedding = create_embedding(query_text)
+        query_text = _searchable_text(roles_part, user_profile)
+        query_embedding = _embed(query_text, embeddings)
         
-        # Build where clause: prefer broad availability; narrow by role only if explicitly requested
-        where_clause = {"availability": {"$in": ["Available", "Full-time", "Part-time", "Contract", "Advisory", "Open"]}}
+        # Build filters: prefer broad availability; narrow by role only if explicitly requested
         looking_for = lf_for_filter.strip() if isinstance(lf_for_filter, str) else ''
         role_filters = []
 
-        # Add OR filters from roles_needed array
+        # Collect role filters (OR-ed together) from roles_needed array
         if isinstance(roles_needed_canon, list):
             for r in roles_needed_canon:
                 r = str(r).strip()
                 if r:
-                    role_filters.append({"role": {"$eq": r}})
+                    role_filters.append(r)
 
         # Add filter from looking_for if it's not generic
-        generic_terms = {"collaborator", "any", "anyone", "any role", "teammate", "partner"}
-        if looking_for and looking_for.lower() not in generic_terms:
+        if looking_for and looking_for.lower() not in GENERIC_TERMS:
             if looking_for in known_roles:
-                role_filters.append({"role": {"$eq": looking_for}})
-
-        if role_filters:
-            where_clause = {
-                "$and": [
-                    {"availability": {"$in": ["Available", "Full-time", "Part-time", "Contract", "Advisory", "Open"]}},
-                    {"$or": role_filters}
-                ]
-            }
-        else:
-            # Heuristic: if no explicit target roles, infer complimentary roles from user's skills
-            skills_lower = ' '.join([s.lower() for s in user_profile.get('skills', [])])
-            inferred_role = None
-            if any(w in skills_lower for w in ['python', 'javascript', 'react', 'node', 'c++', 'java', 'backend', 'frontend', 'fullstack', 'devops']):
-                inferred_role = 'Software Engineer'
-            elif any(w in skills_lower for w in ['design', 'figma', 'ui', 'ux', 'sketch', 'adobe']):
-                inferred_role = 'Designer'
-            elif any(w in skills_lower for w in ['product', 'roadmap', 'pm', 'strategy', 'analytics']):
-                inferred_role = 'Product Manager'
-            elif any(w in skills_lower for w in ['data', 'ml', 'machine learning', 'analytics', 'sql', 'pytorch', 'tensorflow']):
-                inferred_role = 'Data Scientist'
-
-            default_targets = []
-            if inferred_role == 'Software Engineer':
-                default_targets = ['Designer', 'Product Manager']
-            elif inferred_role == 'Designer':
-                default_targets = ['Software Engineer', 'Product Manager']
-            elif inferred_role == 'Product Manager':
-                default_targets = ['Software Engineer', 'Designer']
-            elif inferred_role == 'Data Scientist':
-                default_targets = ['Software Engineer', 'Product Manager']
-
-            # For generic cases, don't hard-filter on role; rely on semantic search + re-ranking
-            where_clause = {"availability": {"$in": ["Available", "Full-time", "Part-time", "Contract", "Advisory", "Open"]}}
-        
-        # Prepare token functions (needed for domain logic)
-        def _tokens(s):
-            if not s:
-                return []
-            if isinstance(s, list):
-                toks = []
-                for x in s:
-                    x = str(x).lower()
-                    for ch in [',', '/', '|', '&']:
-                        x = x.replace(ch, ' ')
-                    toks.extend([t for t in x.split() if t])
-                return toks
-            s = str(s).lower()
-            for ch in [',', '/', '|', '&']:
-                s = s.replace(ch, ' ')
-            return [t for t in s.split() if t]
-
-        # Normalize topic tokens to reduce synonym mismatch
-        def _norm_topics(tokens):
-            aliases = {
-                'healthtech': 'healthcare', 'health': 'healthcare', 'medtech': 'healthcare', 'medical': 'healthcare',
-                'healthpolicy': 'healthcare', 'policy': 'healthcare',
-                'fintech': 'finance', 'fin': 'finance', 'financial': 'finance', 'finsec': 'security', 'financialsecurity': 'security', 'finsecurity': 'security',
-                'ai': 'ai', 'ml': 'ai', 'machine': 'ai', 'machinelearning': 'ai', 'llm': 'ai', 'agents': 'ai',
-                'edtech': 'education', 'ed': 'education',
-                'climatetech': 'climate', 'climate': 'climate',
-                'robotics': 'robotics', 'drone': 'robotics', 'drones': 'robotics',
-                'security': 'security', 'infosec': 'security', 'cyber': 'security'
-            }
-            out = []
-            for t in tokens:
-                t2 = aliases.get(t, t)
-                out.append(t2)
-            return set(out)
-
-        user_interest_toks = _norm_topics(set(_tokens(user_profile.get('interests', []))))
-        user_skills_toks = set(_tokens(user_profile.get('skills', [])))
-        
-        # Query ChromaDB with filters
+                role_filters.append(looking_for)
+
+        # For generic cases, don't hard-filter on role; rely on semantic search + re-ranking
+
+        # Retrieval tiers, tried in order until one returns candidates:
+        # role + availability, then availability only (if a role was asked for), then unfiltered
+        tiers = [(AVAILABLE_STATUSES, role_filters or None)]
+        if looking_for:
+            tiers.append((AVAILABLE_STATUSES, None))
+        tiers.append((None, None))
+
+        # Gather candidate pool for fallback and re-ranking
         try:
-            results = collection.query(
-                query_embeddings=[query_embedding],
-                n_results=50,  # Larger pool for robust re-ranking
-                where=where_clause,
-                include=["metadatas"]
-            )
-            
-            # If no matches with role filter, try without role but keep availability filter
-            if not results['metadatas'] or len(results['metadatas'][0]) == 0:
-                if looking_for:
-                    print(f"No exact role matches for '{looking_for}', trying semantic search...")
-                    results = collection.query(
-                        query_embeddings=[query_embedding],
-                        n_results=50,
-                        where={"availability": {"$in": ["Available", "Full-time", "Part-time", "Contract", "Advisory", "Open"]}},
-                        include=["metadatas"]
-                    )
-            # Final fallback: fully unfiltered semantic search
-            if not results['metadatas'] or len(results['metadatas'][0]) == 0:
-                results = collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=50,
-                    include=["metadatas"]
-                )
+            with metrics.stage("vector_query"):
+                cand_pool, tier = retriever.query_tiers(query_embedding, 50, tiers)  # Larger pool for robust re-ranking
+            if tier > 0:
+                metrics.fallbacks.inc("unfiltered_tier" if tiers[tier] == (None, None) else "availability_only_tier")
+            if tier > 0 and looking_for:
+                print(f"No exact role matches for '{looking_for}', trying semantic search...")
         except Exception as query_error:
             print(f"Query with filter failed: {query_error}, trying without filter...")
-            results = collection.query(
-                query_embeddings=[query_embedding],
-                n_results=20,
-                include=["metadatas"]
-            )
-        
-        # Gather candidate pool for fallback and re-ranking
-        cand_pool = []
-        try:
-            if results and results.get('metadatas') and len(results['metadatas']) > 0:
-                cand_pool = results['metadatas'][0] or []
-        except Exception:
-            cand_pool = []
-
-        # Deterministic re-ranker for better demo results (functions already defined above)
-
-        # Infer user's own role for complementarity
-        skills_lower = ' '.join([s.lower() for s in user_profile.get('skills', [])])
-        if any(w in skills_lower for w in ['python', 'javascript', 'react', 'node', 'c++', 'java', 'backend', 'frontend', 'fullstack', 'devops']):
-            user_role = 'Software Engineer'
-        elif any(w in skills_lower for w in ['design', 'figma', 'ui', 'ux', 'sketch', 'adobe']):
-            user_role = 'Designer'
-        elif any(w in skills_lower for w in ['product', 'roadmap', 'pm', 'strategy', 'analytics']):
-            user_role = 'Product Manager'
-        elif any(w in skills_lower for w in ['data', 'ml', 'machine learning', 'analytics', 'sql', 'pytorch', 'tensorflow']):
-            user_role = 'Data Scientist'
-        else:
-            user_role = 'Other'
+            metrics.fallbacks.inc("query_error")
+            with metrics.stage("vector_query"):
+                cand_pool = retriever.query(query_embedding, 20)
+        # With a background save the new profile may already be searchable
+        fallback_pool = _without_excluded(cand_pool)
 
-        # Determine target and complementary roles for scoring
-        generic_terms = {"collaborator", "any", "anyone", "any role", "teammate", "partner"}
+        # Determine target roles for scoring
         target_roles = []
         if roles_needed_canon:
             target_roles = roles_needed_canon
-        elif looking_for and looking_for.lower() not in generic_terms:
+        elif looking_for and looking_for.lower() not in GENERIC_TERMS:
             target_roles = [looking_for]
 
-        complement_roles = []
-        if user_role == 'Software Engineer':
-            complement_roles = ['Designer', 'Product Manager', 'Data Scientist']
-        elif user_role == 'Designer':
-            complement_roles = ['Software Engineer', 'Product Manager']
-        elif user_role == 'Product Manager':
-            complement_roles = ['Software Engineer', 'Designer']
-        elif user_role == 'Data Scientist':
-            complement_roles = ['Software Engineer', 'Product Manager', 'Designer']
-
-        scored = []
-        core_roles = {"Software Engineer", "Designer", "Product Manager", "Data Scientist", "DevOps Engineer", "Security Engineer"}
-
-        # Domain-driven role bonuses
-        domain_bonus = {}
-        if 'finance' in user_interest_toks:
-            domain_bonus['Finance & Operations'] = domain_bonus.get('Finance & Operations', 0) + 1.2
-            domain_bonus['Sales & Business Development'] = domain_bonus.get('Sales & Business Development', 0) + 0.6
-        if 'healthcare' in user_interest_toks:
-            domain_bonus['Designer'] = domain_bonus.get('Designer', 0) + 0.3
-            domain_bonus['Data Scientist'] = domain_bonus.get('Data Scientist', 0) + 0.3
-            domain_bonus['Software Engineer'] = domain_bonus.get('Software Engineer', 0) + 0.2
-        if 'ai' in user_interest_toks:
-            domain_bonus['Data Scientist'] = domain_bonus.get('Data Scientist', 0) + 0.6
-            domain_bonus['Software Engineer'] = domain_bonus.get('Software Engineer', 0) + 0.5
-            domain_bonus['Product Manager'] = domain_bonus.get('Product Manager', 0) + 0.2
-        if 'education' in user_interest_toks:
-            domain_bonus['Product Manager'] = domain_bonus.get('Product Manager', 0) + 0.4
-            domain_bonus['Designer'] = domain_bonus.get('Designer', 0) + 0.2
-        if 'security' in user_interest_toks:
-            domain_bonus['Security Engineer'] = domain_bonus.get('Security Engineer', 0) + 0.8
-            domain_bonus['Software Engineer'] = domain_bonus.get('Software Engineer', 0) + 0.3
-        if 'robotics' in user_interest_toks:
-            domain_bonus['Software Engineer'] = domain_bonus.get('Software Engineer', 0) + 0.6
-            domain_bonus['Data Scientist'] = domain_bonus.get('Data Scientist', 0) + 0.4
-        if results and results.get('metadatas') and len(results['metadatas']) > 0:
-            user_name_lower = (user_profile.get('name') or '').strip().lower()
-            for md in results['metadatas'][0]:
-                # Skip self-matches by name
-                try:
-                    cand_name = (md.get('name') or '').strip().lower()
-                    if user_name_lower and cand_name and cand_name == user_name_lower:
-                        continue
-                except Exception:
-                    pass
-                c_role = _canon_role(md.get('role', ''))
-                c_interest_toks = _norm_topics(set(_tokens(md.get('interests', ''))))
-                c_skills_toks = set(_tokens(md.get('skills', '')))
-                c_bio = (md.get('bio') or '').lower()
-
-                score = 0.0
-                
-                # ROLE MATCHING: Strongly prioritize complementary skills for team building
-                if c_role in target_roles:
-                    score += 10.0  # Explicitly requested role
-                elif c_role in complement_roles:
-                    score += 6.0   # Complementary role (KEY for team building)
-                elif c_role == user_role:
-                    score += 0.5   # Same role (less useful for a founder building a team)
-                else:
-                    score += 2.0   # Other roles (business, ops, etc.)
-
-                # DOMAIN OVERLAP: Match on shared interests/domain (critical for co-founders)
-                overlap = len(user_interest_toks & c_interest_toks)
-                if user_interest_toks:
-                    score += 3.0 * (overlap / max(1, len(user_interest_toks)))
-                if overlap == 0:
-                    score -= 1.0  # Penalize if no shared interests
-
-                # Domain-driven role bonus
-                score += domain_bonus.get(c_role, 0)
-
-                # Bio mention boost
-                for kw in user_interest_toks:
-                    if kw in c_bio:
-                        score += 0.3
-
-                # SKILLS DIVERSITY: Penalize skill overlap (we want different skills!)
-                if user_skills_toks and c_skills_toks:
-                    skill_overlap = len(user_skills_toks & c_skills_toks)
-                    total_skills = len(user_skills_toks | c_skills_toks)
-                    overlap_ratio = skill_overlap / max(1, total_skills)
-                    score -= 2.0 * overlap_ratio  # Penalize skill similarity
-
-                # Strong penalty for same role when building a team
-                if not target_roles and c_role == user_role:
-                    score -= 2.0  # You don't need another person with your exact role
-
-                scored.append((score, md, c_role))
-
-        # Sort and apply a category-aware selection for better demo diversity
-        scored.sort(key=lambda x: x[0], reverse=True)
+        # Deterministic re-ranker for better demo results (vectorized, see ranking.py)
+        ctx = build_rank_context(user_profile, target_roles)
+        user_role = ctx["user_role"]
+        complement_roles = ctx["complement_roles"]
+        # Scores are per candidate, so dropping exclude_ids after ranking keeps the same order
+        with metrics.stage("rerank"):
+            scored = score_candidates(cand_pool, ctx, features=feature_store.get)
 
+        # Apply a category-aware selection for better demo diversity (scored is already sorted)
         target_list = [md for s, md, r in scored if r in target_roles]
         complement_list = [md for s, md, r in scored if r in complement_roles]
         peer_list = [md for s, md, r in scored if r == user_role]
-        other_list = [md for s, md, r in scored if md not in target_list and md not in complement_list and md not in peer_list]
+        # Same as "md not in any list above", without the O(n^2) dict comparisons
+        other_list = [md for s, md, r in scored if r not in target_roles and r not in complement_roles and r != user_role]
 
         matches = []
         def _take(src, k):
@@ -496,7 +451,7 @@ def find_collaborators(user_profile):
                 if item in matches:
                     continue
                 matches.append(item)
-                if len(matches) >= 5:  # Stop at 5 total matches
+                if len(matches) >= limit:  # Stop at 5 total matches (plus headroom)
                     return
 
         # PRIORITIZE COMPLEMENTARY ROLES for team building
@@ -511,23 +466,36 @@ def find_collaborators(user_profile):
             _take(other_list, 1)         # Business/ops/marketing
             _take(peer_list, 1)          # Maybe 1 same role if they have unique skills
 
+        if matches:
+            result_cache.put(result_key, matches)
+            matches = _without_excluded(matches)[:5]
+            if matches:
+                return matches
+
+        # Fallbacks below aren't cached: unlike the ranking they don't skip the user's own
+        # name, so the user's next save could change them (see result_cache.saved)
+
         # Fallback: if re-ranker yields nothing but we have candidates, return top few raw
-        if not matches and cand_pool:
-            return cand_pool[:5]
+        if not matches and fallback_pool:
+            metrics.fallbacks.inc("raw_candidates")
+            return fallback_pool[:5]
 
         # Final fallback: fetch any available collaborators
         if not matches:
+            metrics.fallbacks.inc("available_scan")
             try:
                 raw = collection.get(where={"availability": {"$eq": "Available"}}, include=["metadatas"], limit=10)
-                if raw and raw.get('metadatas'):
-                    return raw['metadatas'][:5]
+                available = _without_excluded(raw['metadatas']) if raw and raw.get('metadatas') else []
+                if available:
+                    return available[:5]
             except Exception:
                 pass
 
         # Ultimate fallback: compute simple heuristic over all collaborators
         if not matches:
+            metrics.fallbacks.inc("heuristic_scan")
             try:
-                all_collabs = get_all_collaborators()
+                all_collabs = _without_excluded(get_all_collaborators())
                 user_name_lower = (user_profile.get('name') or '').strip().lower()
                 interests_join = ' '.join(user_profile.get('interests', [])).lower()
                 skills_join = ' '.join(user_profile.get('skills', [])).lower()
@@ -556,12 +524,13 @@ def find_collaborators(user_profile):
         return matches
     except Exception as e:
         print(f"Error finding collaborators: {e}")
+        metrics.fallbacks.inc("emergency")
         # Emergency fallback: return SOMETHING
         try:
             collection = chroma_client.get_collection(name="collaborators")
-            emergency = collection.get(limit=5, include=["metadatas"])
+            emergency = collection.get(limit=5 + len(exclude), include=["metadatas"])
             if emergency and emergency.get('metadatas'):
-                return emergency['metadatas'][:5]
+                return _without_excluded(emergency['metadatas'])[:5]
         except:
             pass
         return []
@@ -571,6 +540,7 @@ def find_collaborators(user_profile):
 # Database Query Helper Functions
 # ============================================================================
 
+@metrics.timed("team_build")
 def build_team_suggestions(user_profile, matches):
     """
     Build small team suggestions (2–3 people) from the candidate matches.
@@ -578,60 +548,12 @@ def build_team_suggestions(user_profile, matches):
     """
     try:
         # Determine user's own role from skills
-        skills_lower = ' '.join([s.lower() for s in user_profile.get('skills', [])])
-        if any(w in skills_lower for w in ['python', 'javascript', 'react', 'node', 'c++', 'java', 'backend', 'frontend', 'fullstack', 'devops']):
-            user_role = 'Software Engineer'
-        elif any(w in skills_lower for w in ['design', 'figma', 'ui', 'ux', 'sketch', 'adobe']):
-            user_role = 'Designer'
-        elif any(w in skills_lower for w in ['product', 'roadmap', 'pm', 'strategy', 'analytics']):
-            user_role = 'Product Manager'
-        elif any(w in skills_lower for w in ['data', 'ml', 'machine learning', 'analytics', 'sql', 'pytorch', 'tensorflow']):
-            user_role = 'Data Scientist'
-        else:
-            user_role = 'Other'
-
-        # Canonicalize roles helper
-        def _canon_role(raw: str) -> str:
-            if not raw:
-                return ''
-            s = str(raw).strip().lower()
-            direct = {
-                'software engineer': 'Software Engineer',
-                'engineer': 'Software Engineer',
-                'developer': 'Software Engineer',
-                'swe': 'Software Engineer',
-                'coder': 'Software Engineer',
-                'frontend': 'Software Engineer',
-                'backend': 'Software Engineer',
-                'fullstack': 'Software Engineer',
-                'full-stack': 'Software Engineer',
-                'ux': 'Designer',
-                'ui': 'Designer',
-                'ui/ux': 'Designer',
-                'designer': 'Designer',
-                'product manager': 'Product Manager',
-                'pm': 'Product Manager',
-                'product': 'Product Manager',
-                'data scientist': 'Data Scientist',
-                'ml engineer': 'Data Scientist',
-                'ai engineer': 'Data Scientist',
-            }
-            if s in direct:
-                return direct[s]
-            if any(k in s for k in ['engineer', 'developer', 'dev', 'coder']):
-                return 'Software Engineer'
-            if any(k in s for k in ['design', 'figma', 'ux', 'ui']):
-                return 'Designer'
-            if 'product' in s or s == 'pm':
-                return 'Product Manager'
-            if any(k in s for k in ['data', 'ml', 'machine learning', 'ai']):
-                return 'Data Scientist'
-            return (raw or '').strip()
+        user_role = infer_role_from_skills(user_profile.get('skills', []))
 
         # Bucket candidates by role (preserve match order from re-ranker)
         buckets = {}
         for md in matches:
-            r = _canon_role(md.get('role', '')) or 'Other'
+            r = feature_store.get(md).role or 'Other'
             buckets.setdefault(r, []).append(md)
 
         # Select complement roles based on user's own role
@@ -712,7 +634,7 @@ def build_team_suggestions(user_profile, matches):
             diverse_team = []
             used_roles = set()
             for match in matches[:5]:  # Look at top 5 matches
-                role = _canon_role(match.get('role', ''))
+                role = feature_store.get(match).role
                 if role not in used_roles and match not in suggestion[:2]:
                     diverse_team.append(match)
                     used_roles.add(role)
@@ -750,6 +672,43 @@ def get_all_collaborators():
         return []
 
 
+def iter_collaborators(role=None, fields=None, offset=0, limit=None, page_size=500):
+    """
+    Yield collaborator metadata page by page (one metadata-only collection.get per page),
+    so callers can stream the corpus without holding it in memory.
+    
+    Args:
+        role: Optional exact role filter
+        fields: Optional list of metadata keys to keep (projection)
+        offset: Rows to skip (in the stable order Chroma returns rows in)
+        limit: Max rows to yield (None = all)
+        page_size: Rows fetched from Chroma per round trip
+    """
+    collection = chroma_client.get_collection(name="collaborators")
+    where = {"role": {"$eq": role}} if role else None
+    remaining = limit
+    while remaining is None or remaining > 0:
+        n = page_size if remaining is None else min(page_size, remaining)
+        page = collection.get(where=where, limit=n, offset=offset, include=["metadatas"])
+        rows = page['metadatas'] or []
+        for metadata in rows:
+            yield {k: metadata[k] for k in fields if k in metadata} if fields else metadata
+        if len(rows) < n:
+            return
+        offset += len(rows)
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+def get_collaborators_page(role=None, fields=None, offset=0, limit=50):
+    """
+    One page of collaborators plus the offset of the next page (None when exhausted).
+    """
+    rows = list(iter_collaborators(role, fields, offset, limit + 1, page_size=limit + 1))
+    next_offset = offset + limit if len(rows) > limit else None
+    return rows[:limit], next_offset
+
+
 def get_collaborators_by_role(role):
     """
     Get all collaborators with a specific role.
@@ -803,23 +762,30 @@ def search_by_skills(skills_list):
         skills_list: List of skill strings like ["Python", "React"]
     """
     try:
+        # Repeated searches (in any order / case) hit the cache until the corpus changes
+        result_key = result_cache.skills_key(skills_list)
+        cached = result_cache.get(result_key)
+        if cached is not None:
+            return cached
+        
         collection = chroma_client.get_collection(name="collaborators")
         
         # Create query from skills
         query_text = ' '.join(skills_list)
         query_embedding = create_embedding(query_text)
         
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=5
-        )
+        with metrics.stage("vector_query"):
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=5
+            )
         
         matches = []
         if results and results['metadatas'] and len(results['metadatas'][0]) > 0:
             for metadata in results['metadatas'][0]:
                 matches.append(metadata)
         
-        return matches
+        return result_cache.put(result_key, matches)
     except Exception as e:
         print(f"Error searching by skills: {e}")
         return []
@@ -831,24 +797,80 @@ def get_database_stats():
     """
     try:
         collection = chroma_client.get_collection(name="collaborators")
-        all_collabs = get_all_collaborators()
         
-        # Count by role
-        role_counts = {}
-        for collab in all_collabs:
-            role = collab.get('role', 'Unknown')
-            role_counts[role] = role_counts.get(role, 0) + 1
+        # Counts are maintained incrementally; only a size mismatch triggers a rescan
+        corpus_stats.ensure_consistent(collection)
+        counts = corpus_stats.snapshot()
         
         return {
-            "total": collection.count(),
-            "by_role": role_counts
+            "total": counts["total"],
+            "by_role": counts["by_role"],
+            "by_availability": counts["by_availability"],
+            "embedding_cache": embedding_cache.stats() if embedding_cache is not None else None,
+            "feature_store": feature_store.stats(),
+            "result_cache": result_cache.stats()
         }
     except Exception as e:
         print(f"Error getting database stats: {e}")
         return {"total": 0, "by_role": {}}
 
 
-def save_user_profile(profile, availability_status="Available"):
+def new_user_id(profile):
+    """
+    ID a profile will be saved under (e.g. "user_1700000000_alex_3f9a1c").
+    The random suffix keeps two same-named users in the same second (e.g. the "User"
+    fallback name) from colliding, which made Chroma silently drop the second profile.
+    """
+    import uuid
+    return f"user_{int(time.time())}_{profile.get('name', 'unknown').lower().replace(' ', '_')}_{uuid.uuid4().hex[:6]}"
+
+
+def _profile_record(profile, user_id, availability_status):
+    """(searchable text, metadata) a profile is stored under."""
+    # Determine the user's role based on their skills
+    # This is what they ARE, not what they're looking for
+    user_role = infer_profile_role(profile.get('skills', []))
+    
+    # Create searchable text
+    searchable_text = _searchable_text(user_role, profile)
+    
+    # Create bio from interests and looking_for
+    interests_str = ', '.join(profile.get('interests', []))
+    looking_for = profile.get('looking_for', 'collaborators')
+    bio = f"Interested in {interests_str}. Looking for {looking_for} to collaborate with."
+    
+    # Prepare metadata
+    metadata = {
+        "id": user_id,
+        "name": profile.get('name', 'Unknown'),
+        "role": user_role,
+        "skills": ', '.join(profile.get('skills', [])),
+        "interests": ', '.join(profile.get('interests', [])),
+        "bio": bio,
+        "availability": availability_status,  # Can be "Available" or "In Team"
+        "looking_for": profile.get('looking_for', 'Collaborator'),
+        "team_id": "None"  # Will be set when they join a team
+    }
+    return searchable_text, metadata
+
+
+def _corpus_changed(saved_name=None):
+    """
+    Record a write made through this module. corpus_stats, the retriever, result_cache and
+    team_index have already applied it, so they stay in sync unless another process wrote in between;
+    cached search results are dropped (for a single new profile, all but that name's).
+    """
+    before, after = corpus_version.bump()
+    for watch in (corpus_stats.watch, retriever.watch, result_cache.watch, team_index.watch):
+        if watch is not None:
+            watch.advance(before, after)
+    if saved_name is None:
+        result_cache.bump()
+    else:
+        result_cache.saved(saved_name)
+
+
+def save_user_profile(profile, availability_status="Available", user_id=None, embeddings=None):
     """
     Save a new user profile to ChromaDB so they can be matched with others.
     
@@ -858,6 +880,8 @@ def save_user_profile(profile, availability_status="Available"):
     Args:
         profile: Dict with keys: name, skills, interests, looking_for
         availability_status: "Available" or "In Team" (default: "Available")
+        user_id: Pre-assigned ID (see new_user_id); generated if omitted
+        embeddings: Optional EmbeddingMemo shared with find_collaborators
     
     Returns:
         user_id: String ID of the saved user (e.g. "user_123")
@@ -866,63 +890,26 @@ def save_user_profile(profile, availability_status="Available"):
         collection = chroma_client.get_collection(name="collaborators")
         
         # Generate unique user ID
-        import time
-        user_id = f"user_{int(time.time())}_{profile.get('name', 'unknown').lower().replace(' ', '_')}"
-        
-        # Determine the user's role based on their skills
-        # This is what they ARE, not what they're looking for
-        skills_lower = ' '.join([s.lower() for s in profile.get('skills', [])])
-        
-        if any(word in skills_lower for word in ['python', 'javascript', 'react', 'node', 'c++', 'java', 'code', 'dev', 'backend', 'frontend']):
-            user_role = "Software Engineer"
-        elif any(word in skills_lower for word in ['design', 'figma', 'ui', 'ux', 'sketch', 'adobe']):
-            user_role = "Designer"
-        elif any(word in skills_lower for word in ['product', 'roadmap', 'pm', 'strategy', 'analytics']):
-            user_role = "Product Manager"
-        elif any(word in skills_lower for word in ['data', 'ml', 'machine learning', 'analytics', 'sql']):
-            user_role = "Data Scientist"
-        elif any(word in skills_lower for word in ['marketing', 'growth', 'seo', 'content']):
-            user_role = "Marketing & Growth"
-        elif any(word in skills_lower for word in ['sales', 'business', 'partnerships']):
-            user_role = "Sales & Business Development"
-        elif any(word in skills_lower for word in ['finance', 'accounting', 'fundraising']):
-            user_role = "Finance & Operations"
-        else:
-            user_role = "Other"
-        
-        # Create searchable text
-        searchable_text = f"{user_role} {' '.join(profile.get('skills', []))} {' '.join(profile.get('interests', []))}"
+        user_id = user_id or new_user_id(profile)
+        searchable_text, metadata = _profile_record(profile, user_id, availability_status)
         
         # Create embedding
-        embedding = create_embedding(searchable_text)
-        
-        # Create bio from interests and looking_for
-        interests_str = ', '.join(profile.get('interests', []))
-        looking_for = profile.get('looking_for', 'collaborators')
-        bio = f"Interested in {interests_str}. Looking for {looking_for} to collaborate with."
-        
-        # Prepare metadata
-        metadata = {
-            "id": user_id,
-            "name": profile.get('name', 'Unknown'),
-            "role": user_role,
-            "skills": ', '.join(profile.get('skills', [])),
-            "interests": ', '.join(profile.get('interests', [])),
-            "bio": bio,
-            "availability": availability_status,  # Can be "Available" or "In Team"
-            "looking_for": profile.get('looking_for', 'Collaborator'),
-            "team_id": "None"  # Will be set when they join a team
-        }
+        embedding = _embed(searchable_text, embeddings)
         
         # Add to ChromaDB
-        collection.add(
-            ids=[user_id],
-            embeddings=[embedding],
-            metadatas=[metadata],
-            documents=[searchable_text]
-        )
+        with metrics.stage("chroma_write"):
+            collection.add(
+                ids=[user_id],
+                embeddings=[embedding],
+                metadatas=[metadata],
+                documents=[searchable_text]
+            )
+        retriever.upsert([user_id], [embedding], [metadata])
+        feature_store.put(metadata)
+        corpus_stats.apply([metadata])
+        _corpus_changed(saved_name=metadata['name'])
         
-        print(f"✅ Saved user profile: {profile.get('name')} as {user_role} (ID: {user_id})")
+        print(f"✅ Saved user profile: {profile.get('name')} as {metadata['role']} (ID: {user_id})")
         return user_id
         
     except Exception as e:
@@ -932,46 +919,131 @@ def save_user_profile(profile, availability_status="Available"):
         return None
 
 
+def save_user_profiles(profiles, user_ids, availability_status="Available"):
+    """
+    Batch version of save_user_profile for bulk ingestion: one batched embedding call and
+    a single collection.add. IDs already in the collection are skipped, so re-running a
+    partially-applied batch is safe.
+    
+    Returns:
+        List of user IDs that were written, or None on failure
+    """
+    try:
+        collection = chroma_client.get_collection(name="collaborators")
+        existing = set(collection.get(ids=list(user_ids), include=[])['ids']) if user_ids else set()
+        
+        ids, documents, metadatas = [], [], []
+        for profile, user_id in zip(profiles, user_ids):
+            if user_id in existing or user_id in ids:
+                continue
+            searchable_text, metadata = _profile_record(profile, user_id, availability_status)
+            ids.append(user_id)
+            documents.append(searchable_text)
+            metadatas.append(metadata)
+        if not ids:
+            return []
+        
+        embeddings = create_embeddings(documents)
+        with metrics.stage("chroma_write"):
+            collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+        retriever.upsert(ids, embeddings, metadatas)
+        feature_store.put_many(metadatas)
+        corpus_stats.apply(metadatas)
+        _corpus_changed()
+        
+        print(f"✅ Saved {len(ids)} user profiles in one batch ({len(existing)} already present)")
+        return ids
+        
+    except Exception as e:
+        print(f"Error saving user profiles: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+# Serializes team membership changes so concurrent creates can't claim the same user
+_team_lock = threading.Lock()
+
+
 def create_team(user_ids, team_name="Unnamed Team"):
     """
     Form a team from multiple users. Marks them as "In Team" and assigns team_id.
     They will no longer appear in search results.
     
+    All members are read in one metadata-only get and written in one batched update;
+    if the update fails it is rolled back, so a team is never left half-formed.
+    
     Args:
         user_ids: List of user IDs to form a team
         team_name: Optional team name
     
     Returns:
-        team_id: String ID of the created team
+        Dict with team_id (None if fewer than two users could join, in which case nothing
+        is changed) and members: {user_id: "added" | "not_found" | "already_in_team" | "skipped"}.
+        None on error.
     """
     try:
         collection = chroma_client.get_collection(name="collaborators")
         import time
-        team_id = f"team_{int(time.time())}"
+        user_ids = list(dict.fromkeys(user_ids))
         
-        # Update each user's metadata
-        for user_id in user_ids:
-            # Get existing user
-            result = collection.get(ids=[user_id], include=["metadatas", "embeddings", "documents"])
-            if not result or not result['ids']:
-                print(f"⚠️  User {user_id} not found")
-                continue
+        with _team_lock:
+            team_index.ensure_fresh(collection)
+            team_id = f"team_{int(time.time())}"
+            suffix = 1
+            while team_index.members(team_id):
+                suffix += 1
+                team_id = f"team_{int(time.time())}_{suffix}"
             
-            # Update metadata
-            metadata = result['metadatas'][0]
-            metadata['availability'] = "In Team"
-            metadata['team_id'] = team_id
+            # One read for every member, metadata only
+            result = collection.get(ids=user_ids, include=["metadatas"])
+            found = dict(zip(result['ids'], result['metadatas']))
             
-            # Update in ChromaDB
-            collection.update(
-                ids=[user_id],
-                metadatas=[metadata]
-            )
+            outcomes, ids, originals, metadatas = {}, [], [], []
+            for user_id in user_ids:
+                metadata = found.get(user_id)
+                if metadata is None:
+                    print(f"⚠️  User {user_id} not found")
+                    outcomes[user_id] = "not_found"
+                    continue
+                if metadata.get('team_id', 'None') not in ('None', '', None):
+                    print(f"⚠️  User {user_id} is already in {metadata.get('team_id')}")
+                    outcomes[user_id] = "already_in_team"
+                    continue
+                originals.append(dict(metadata))
+                metadata = dict(metadata, availability="In Team", team_id=team_id)
+                ids.append(user_id)
+                metadatas.append(metadata)
+            
+            if len(ids) < 2:
+                for user_id in ids:
+                    outcomes[user_id] = "skipped"
+                print(f"⚠️  Team {team_name} not created: only {len(ids)} eligible member(s)")
+                return {"team_id": None, "team_name": team_name, "members": {u: outcomes[u] for u in user_ids}}
+            
+            # One batched write; undo it if it doesn't go through cleanly
+            try:
+                with metrics.stage("chroma_write"):
+                    collection.update(ids=ids, metadatas=metadatas)
+            except Exception:
+                try:
+                    collection.update(ids=ids, metadatas=originals)
+                except Exception as rollback_err:
+                    print(f"❌ Rollback of team {team_id} failed: {rollback_err}")
+                raise
             
+            retriever.update_metadatas(ids, metadatas)
+            feature_store.invalidate(ids)
+            team_index.set_team(team_id, ids)
+            corpus_stats.apply(metadatas)
+            _corpus_changed()
+        
+        for user_id, metadata in zip(ids, metadatas):
+            outcomes[user_id] = "added"
             print(f"✅ Added {metadata.get('name', user_id)} to {team_name}")
         
         print(f"🎉 Team created: {team_name} (ID: {team_id})")
-        return team_id
+        return {"team_id": team_id, "team_name": team_name, "members": {u: outcomes[u] for u in user_ids}}
         
     except Exception as e:
         print(f"Error creating team: {e}")
@@ -985,9 +1057,8 @@ def get_available_users():
     Get all users who are still available (not in a team yet).
     """
     try:
-        all_users = get_all_collaborators()
-        available = [u for u in all_users if u.get('availability') == 'Available']
-        return available
+        corpus_stats.ensure_consistent(chroma_client.get_collection(name="collaborators"))
+        return corpus_stats.available_users()
     except Exception as e:
         print(f"Error getting available users: {e}")
         return []
@@ -996,17 +1067,24 @@ def get_available_users():
 def get_teams():
     """
     Get all formed teams grouped by team_id.
+    Reads only team members (via the team index), in one metadata-only get.
     """
     try:
-        all_users = get_all_collaborators()
-        teams = {}
+        collection = chroma_client.get_collection(name="collaborators")
+        team_index.ensure_fresh(collection)
+        index = team_index.all()
+        member_ids = [uid for ids in index.values() for uid in ids]
+        if not member_ids:
+            return {}
+        
+        result = collection.get(ids=member_ids, include=["metadatas"])
+        by_id = dict(zip(result['ids'], result['metadatas']))
         
-        for user in all_users:
-            team_id = user.get('team_id', 'None')
-            if team_id != 'None':
-                if team_id not in teams:
-                    teams[team_id] = []
-                teams[team_id].append(user)
+        teams = {}
+        for team_id, ids in index.items():
+            members = [by_id[uid] for uid in ids if uid in by_id and by_id[uid].get('team_id') == team_id]
+            if members:
+                teams[team_id] = members
         
         return teams
     except Exception as e:
@@ -1020,31 +1098,42 @@ def dissolve_team(team_id):
     """
     try:
         collection = chroma_client.get_collection(name="collaborators")
-        all_users = get_all_collaborators()
-        
-        # Find team members
-        team_members = [u for u in all_users if u.get('team_id') == team_id]
-        
-        if not team_members:
-            print(f"⚠️  Team {team_id} not found")
-            return False
         
-        # Make each member available again
-        for member in team_members:
-            user_id = member.get('id')
-            result = collection.get(ids=[user_id], include=["metadatas"])
-            
-            if result and result['ids']:
-                metadata = result['metadatas'][0]
+        # Same lock as create_team, so the two read-modify-writes never interleave
+        with _team_lock:
+            # Find team members (teams formed by another worker are picked up by the rebuild)
+            team_index.ensure_fresh(collection)
+            member_ids = team_index.members(team_id)
+            if member_ids:
+                result = collection.get(ids=member_ids, include=["metadatas"])
+            else:
+                # Not indexed (e.g. the shared version file isn't writable): ask Chroma directly
+                result = collection.get(where={"team_id": team_id}, include=["metadatas"])
+            ids, metadatas = [], []
+            for user_id, metadata in zip(result['ids'], result['metadatas']):
+                if metadata.get('team_id') != team_id:
+                    continue
                 metadata['availability'] = "Available"
                 metadata['team_id'] = "None"
-                
-                collection.update(
-                    ids=[user_id],
-                    metadatas=[metadata]
-                )
-                
-                print(f"✅ {metadata.get('name', user_id)} is now available again")
+                ids.append(user_id)
+                metadatas.append(metadata)
+        
+            if not ids:
+                print(f"⚠️  Team {team_id} not found")
+                team_index.remove_team(team_id)
+                return False
+        
+            # Make every member available again in one batched update
+            with metrics.stage("chroma_write"):
+                collection.update(ids=ids, metadatas=metadatas)
+            retriever.update_metadatas(ids, metadatas)
+            feature_store.invalidate(ids)
+            team_index.remove_team(team_id)
+            corpus_stats.apply(metadatas)
+            _corpus_changed()
+        
+        for metadata in metadatas:
+            print(f"✅ {metadata.get('name', metadata.get('id'))} is now available again")
         
         print(f"🎉 Team {team_id} dissolved")
         return True
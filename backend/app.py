@@ -1,12 +1,26 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
 from dotenv import load_dotenv
 import logging
 import time
 import traceback
 import os
-import httpx
+import json
+import base64
+import binascii
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 import ai_core
+from slot_tracker import SlotTracker
+from slot_detector import SlotDetector
+from session_store import make_session_store, new_session
+from slack_dedupe import normalize_text, processed_messages, recent_texts
+from job_queue import JobQueue
+from slack_client import slack_client
+import slack_backfill
+import metrics
+import profiler
 
 # Load environment variables
 load_dotenv()
@@ -25,8 +39,8 @@ CORS(app, resources={
     r"/*": {
         "origins": ["http://localhost:3000", "http://127.0.0.1:3000"],
         "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type"],
-        "expose_headers": ["Content-Type"],
+        "allow_headers": ["Content-Type", "X-Profile-Token"],
+        "expose_headers": ["Content-Type", "Server-Timing", "X-Pipeline-Mode", "X-Profile-Capture"],
         "supports_credentials": False
     }
 })
@@ -35,47 +49,88 @@ CORS(app, resources={
 @app.before_request
 def log_request_info():
     """Log incoming request details."""
-    request.start_time = time.time()
+    request.start_time = time.perf_counter()
     logger.info(f"📥 {request.method} {request.path}")
 
 @app.after_request
 def log_response_info(response):
-    """Log response details and request duration."""
-    duration = time.time() - request.start_time
+    """Log response details and request duration (also recorded for /metrics)."""
+    duration = time.perf_counter() - request.start_time
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    metrics.http_request_seconds.observe(duration, request.method, route, str(response.status_code))
     logger.info(f"📤 {response.status_code} - {duration:.3f}s\n")
     return response
 
-# Store chat history per session (in production, use proper session management)
-chat_sessions = {}
-processed_slack_messages = set()  # (channel_id, message_ts)
-recent_text_cache = {}  # {(channel_id, normalized_text): last_ts}
+# Opt-in profiling: X-Profile-Token header or ?profile=<token> (PROFILE_TOKEN must be set)
+@app.before_request
+def start_request_profiler():
+    """Sample this request's stacks if it carries the profiling token and the cap allows it."""
+    supplied = request.headers.get("X-Profile-Token") or request.args.get("profile")
+    if not supplied or not profiler.token_matches(supplied):
+        return
+    if not profiler.capture_limiter.try_acquire():
+        g.profile_skipped = True
+        return
+    g.request_profiler = profiler.SamplingProfiler(threading.get_ident()).start()
+
+@app.after_request
+def finish_request_profiler(response):
+    """Write the collapsed stacks for a profiled request and name the file in X-Profile-Capture."""
+    sampler = g.pop("request_profiler", None)
+    if sampler is not None:
+        sampler.stop()
+        try:
+            label = f"{request.method}_{request.path}_{response.status_code}"
+            name = profiler.save_capture(sampler, label)
+            response.headers["X-Profile-Capture"] = name
+            logger.info(f"🔬 Profiled {request.path}: {sampler.samples} samples -> {name}")
+        except OSError as e:
+            logger.error(f"❌ Could not write profile capture: {e}")
+    elif g.pop("profile_skipped", False):
+        response.headers["X-Profile-Capture"] = "skipped (rate limit)"
+    return response
+
+@app.teardown_request
+def stop_request_profiler(exc):
+    """Never leave a sampler running if the request died before after_request."""
+    sampler = g.pop("request_profiler", None)
+    if sampler is not None:
+        sampler.stop()
+
+# /collaborators paging (?limit=&cursor=) and NDJSON streaming read size
+COLLABORATORS_DEFAULT_PAGE = 50
+COLLABORATORS_MAX_PAGE = 1000
+COLLABORATORS_STREAM_PAGE = 500
+
+# Chat history + slot state per session, LRU/TTL-evicted (SESSION_STORE=memory|sqlite)
+session_store = make_session_store()
+# Leftover chat words are one-off texts; keep them out of the persistent embedding cache
+slot_detector = SlotDetector(embed=lambda texts: ai_core.create_embeddings(texts, cache=False))
+TRIGGER_PHRASE = "Great, I have everything I need!"
+# /find-collaborators execution: "threaded" saves the new profile on a background worker
+# while matching runs; "sequential" keeps the original extract -> match -> suggest -> save order
+FIND_PIPELINE_MODE = os.getenv("FIND_PIPELINE_MODE", "threaded").strip().lower()
+save_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SAVE_WORKERS", "2")), thread_name_prefix="profile-save")
+pending_saves = {}  # {user_id: Future} profiles still being written
+failed_saves = OrderedDict()  # {user_id: None} background saves that failed, newest last
+FAILED_SAVES_MAX = 10000
+pending_saves_lock = threading.Lock()
+# How long a response / team creation waits for a background profile save
+SAVE_WAIT_SECONDS = float(os.getenv("SAVE_WAIT_SECONDS", "30"))
+# Load the model / Chroma / Groq client in the background when the server starts
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1").strip().lower() not in ("0", "false", "no")
 
 
 def _post_slack_thread_message(channel_id: str, thread_ts: str, text: str) -> bool:
     """Post a message to a Slack thread if SLACK_BOT_TOKEN is configured.
     Returns True on success, False otherwise. Never raises to avoid impacting MVP.
+    Goes through the pooled, rate-limited slack_client (keep-alive, retries on 429/5xx).
     """
     token = os.getenv('SLACK_BOT_TOKEN', '').strip()
     if not token:
         return False
     try:
-        resp = httpx.post(
-            'https://slack.com/api/chat.postMessage',
-            headers={
-                'Authorization': f'Bearer {token}',
-                'Content-Type': 'application/json'
-            },
-            json={
-                'channel': channel_id,
-                'thread_ts': thread_ts,
-                'text': text
-            },
-            timeout=8.0
-        )
-        ok = resp.json().get('ok', False)
-        if not ok:
-            logging.warning(f"Slack postMessage failed: {resp.text}")
-        return bool(ok)
+        return slack_client.post_message(token, channel_id, text, thread_ts=thread_ts)
     except Exception as e:
         logging.warning(f"Slack postMessage error: {e}")
         return False
@@ -135,6 +190,74 @@ def health():
     return jsonify({"status": "ok"})
 
 
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness: 200 once the embedding model, Chroma and Groq client are loaded, else 503."""
+    state = ai_core.readiness()
+    return jsonify(state), (200 if state["ready"] else 503)
+
+
+@app.route('/warmup', methods=['POST'])
+def warmup():
+    """Load everything now and run one dummy encode + query; returns per-step timings."""
+    result = ai_core.warmup()
+    logger.info(f"🔥 Warmup: {result['timings']}")
+    return jsonify(result), (200 if result["ok"] else 503)
+
+
+def start_warmup():
+    """Run ai_core.warmup() on a daemon thread so the server can accept requests meanwhile."""
+    thread = threading.Thread(target=ai_core.warmup, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _submit_profile_save(user_profile, user_id, embeddings):
+    """Queue save_user_profile on the background pool; the future is tracked until it finishes."""
+    future = save_executor.submit(ai_core.save_user_profile, user_profile, "Available", user_id, embeddings)
+    with pending_saves_lock:
+        pending_saves[user_id] = future
+
+    def _done(f):
+        saved = _save_succeeded(f)
+        with pending_saves_lock:
+            pending_saves.pop(user_id, None)
+            if not saved:
+                failed_saves[user_id] = None
+                while len(failed_saves) > FAILED_SAVES_MAX:
+                    failed_saves.popitem(last=False)
+        if not saved:
+            logger.error(f"❌ Background save failed for {user_id}: {f.exception()}")
+
+    future.add_done_callback(_done)
+    return future
+
+
+def _save_succeeded(future):
+    """True if a finished save future wrote the profile (save_user_profile returns None on failure)."""
+    return future.done() and future.exception() is None and future.result() is not None
+
+
+def _await_pending_saves(user_ids, timeout=SAVE_WAIT_SECONDS):
+    """
+    Block until any in-flight background saves for these users have been written.
+    Returns the ids whose save failed or didn't finish within `timeout`.
+    """
+    with pending_saves_lock:
+        futures = {u: pending_saves[u] for u in user_ids if u in pending_saves}
+        failed = [u for u in user_ids if u in failed_saves]
+    if futures:
+        logger.info(f"   ⏳ Waiting for {len(futures)} pending profile save(s)")
+        wait(futures.values(), timeout=timeout)
+    # Checked on the futures themselves: their done-callbacks may not have run yet
+    return failed + [u for u, f in futures.items() if not _save_succeeded(f) and u not in failed]
+
+
+def _server_timing(timings):
+    """Server-Timing header value from {stage: seconds}."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
 @app.route('/chat', methods=['POST'])
 def chat():
     """
@@ -157,44 +280,54 @@ def chat():
         logger.info(f"   User Message: {message[:100]}..." if len(message) > 100 else f"   User Message: {message}")
         
         # Get or create chat history for this session
-        if session_id not in chat_sessions:
+        session = session_store.get(session_id)
+        if session is None:
             logger.info(f"   Creating new session: {session_id}")
-            chat_sessions[session_id] = []
+            session = new_session()
         else:
-            logger.info(f"   Existing session with {len(chat_sessions[session_id])} messages")
+            logger.info(f"   Existing session with {len(session['history'])} messages")
         
-        chat_history = chat_sessions[session_id]
+        chat_history = session["history"]
+        slots = SlotTracker.from_dict(session.get("slots"))
         
+        # Local fast path: if the message (together with earlier turns) confidently names
+        # both skills and interests, trigger without calling Groq at all
+        detection = slot_detector.detect(message)
+        slots.merge({"skills": detection.skills, "interests": detection.interests})
+        if slots.filled:
+            slot_detector.record(True)
+            logger.info(f"   ⚡ Local slot detector filled skills={slots.skills}, interests={slots.interests}"
+                        f" (confidence {detection.skills_confidence}/{detection.interests_confidence})")
+            chat_history.append({"role": "user", "content": message})
+            chat_history.append({"role": "assistant", "content": TRIGGER_PHRASE})
+            session["slots"] = slots.to_dict()
+            session_store.put(session_id, session)
+            logger.info("   🎯 TRIGGER CONFIRMED - Proceeding to matching")
+            return jsonify({
+                "response": TRIGGER_PHRASE,
+                "is_trigger": True
+            })
+        slot_detector.record(False)
+
         # Get AI response
         logger.info("   🤖 Calling Groq API for chat response...")
-        ai_start = time.time()
+        ai_start = time.perf_counter()
         response = ai_core.get_chat_response(message, chat_history)
-        ai_duration = time.time() - ai_start
+        ai_duration = time.perf_counter() - ai_start
         logger.info(f"   ✅ Groq API response received in {ai_duration:.3f}s")
         logger.info(f"   AI Response: {response[:100]}..." if len(response) > 100 else f"   AI Response: {response}")
         
         # Determine trigger: exact phrase OR server-side extraction shows enough info (skills+interests)
-        phrase_trigger = "Great, I have everything I need!" in response
+        phrase_trigger = TRIGGER_PHRASE in response
         extracted_trigger = False
         try:
-            augmented_history = chat_history + [
-                {"role": "user", "content": message},
-                {"role": "assistant", "content": response}
-            ]
-            transcript_lines = []
-            for m in augmented_history:
-                role = m.get("role", "assistant")
-                prefix = "User" if role == "user" else "Assistant"
-                transcript_lines.append(f"{prefix}: {m.get('content', '')}")
-            transcript_str = "\n".join(transcript_lines)
-
-            extracted_profile = ai_core.extract_user_profile(transcript_str)
-            skills = extracted_profile.get("skills") or []
-            interests = extracted_profile.get("interests") or []
-            skills_ok = isinstance(skills, list) and len(skills) > 0 and skills != ["General"]
-            interests_ok = isinstance(interests, list) and len(interests) > 0 and interests != ["Collaboration"]
-            extracted_trigger = bool(skills_ok and interests_ok)
-            logger.info(f"   🔎 Auto-trigger check: skills_ok={skills_ok}, interests_ok={interests_ok}")
+            # Incremental extraction: only the newest user message is sent, and nothing at
+            # all once skills and interests have both been captured
+            last_assistant = chat_history[-1].get("content", "") if chat_history and chat_history[-1].get("role") == "assistant" else ""
+            called = slots.update(message, last_assistant, ai_core.extract_user_profile)
+            extracted_trigger = slots.filled
+            logger.info(f"   🔎 Auto-trigger check: skills={slots.skills}, interests={slots.interests}"
+                        f"{'' if called else ' (extraction skipped, slots filled)'}")
         except Exception as trigger_err:
             logger.warning(f"   ⚠️ Auto-trigger check failed: {trigger_err}")
             extracted_trigger = False
@@ -202,13 +335,14 @@ def chat():
         is_trigger = phrase_trigger or extracted_trigger
         if is_trigger:
             if not phrase_trigger:
-                response = "Great, I have everything I need!"
+                response = TRIGGER_PHRASE
             logger.info("   🎯 TRIGGER CONFIRMED - Proceeding to matching")
         
         # Update chat history
         chat_history.append({"role": "user", "content": message})
         chat_history.append({"role": "assistant", "content": response})
-        chat_sessions[session_id] = chat_history
+        session["slots"] = slots.to_dict()
+        session_store.put(session_id, session)
         
         logger.info(f"   ✅ Chat completed successfully")
         return jsonify({
@@ -252,22 +386,56 @@ def find_collaborators():
         chat_transcript = data.get('chat_transcript', '').strip()
         session_id = data.get('session_id', 'default')
         
+        threaded = FIND_PIPELINE_MODE == "threaded"
+        timings = {}
+        started = time.perf_counter()
+
+        t = time.perf_counter()
         user_profile = ai_core.extract_user_profile(chat_transcript)
-        matches = ai_core.find_collaborators(user_profile)
+        timings["extract"] = time.perf_counter() - t
+
+        # Matching and saving embed the same text when the user asks for their own role;
+        # the memo then computes it once
+        embeddings = ai_core.EmbeddingMemo()
+        user_id = ai_core.new_user_id(user_profile)
+        if threaded:
+            # Saving overlaps matching on a worker; the response still waits for it below
+            save_future = _submit_profile_save(user_profile, user_id, embeddings)
+
+        t = time.perf_counter()
+        matches = ai_core.find_collaborators(user_profile, embeddings=embeddings, exclude_ids=[user_id])
+        timings["match"] = time.perf_counter() - t
+
+        t = time.perf_counter()
         team_suggestions = ai_core.build_team_suggestions(user_profile, matches)
-        user_id = ai_core.save_user_profile(user_profile)
+        timings["suggest"] = time.perf_counter() - t
+
+        if threaded:
+            # Only hand out the id once the profile is stored (None on failure, as sequential)
+            t = time.perf_counter()
+            wait([save_future], timeout=SAVE_WAIT_SECONDS)
+            if not _save_succeeded(save_future):
+                user_id = None
+            timings["save_wait"] = time.perf_counter() - t
+        else:
+            t = time.perf_counter()
+            user_id = ai_core.save_user_profile(user_profile, user_id=user_id, embeddings=embeddings)
+            timings["save"] = time.perf_counter() - t
+        timings["total"] = time.perf_counter() - started
         
         # Clear session
-        if session_id in chat_sessions:
-            del chat_sessions[session_id]
+        session_store.delete(session_id)
         
         logger.info(f"   ✅ Found {len(matches)} matches, saved user {user_id}")
-        return jsonify({
+        response = jsonify({
             "your_profile": user_profile,
             "matches": matches,
             "user_id": user_id,  # Return the saved user ID
             "team_suggestions": team_suggestions
         })
+        response.headers["Server-Timing"] = _server_timing(timings)
+        response.headers["X-Pipeline-Mode"] = FIND_PIPELINE_MODE
+        return response
     except Exception as e:
         logger.error(f"❌ ERROR in /find-collaborators: {str(e)}")
         logger.error(traceback.format_exc())
@@ -286,14 +454,60 @@ def find_collaborators():
         return jsonify({"error": error_msg}), 500
 
 
+def _encode_cursor(offset):
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return int(base64.urlsafe_b64decode(padded.encode()).decode())
+
+
 @app.route('/collaborators', methods=['GET'])
 def get_collaborators():
     """
     Get all collaborators or filter by role.
     Query params: ?role=Software%20Engineer
+    
+    Pagination / streaming (optional):
+      ?limit=50                   page size (max 1000); response includes next_cursor
+      ?cursor=<next_cursor>       continue from a previous page
+      ?fields=id,name,role        only return these metadata fields
+      ?format=ndjson              stream one JSON object per line (also via Accept: application/x-ndjson);
+                                  rows are written as they are read, so memory stays flat
+    Without limit/cursor/format the full list is returned as before.
     """
     try:
         role = request.args.get('role')
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or None
+        limit_arg = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        ndjson = (request.args.get('format') == 'ndjson'
+                  or 'application/x-ndjson' in request.headers.get('Accept', ''))
+        
+        try:
+            offset = _decode_cursor(cursor) if cursor else 0
+            limit = int(limit_arg) if limit_arg else None
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            return jsonify({"error": "Invalid cursor or limit"}), 400
+        if offset < 0 or (limit is not None and not 1 <= limit <= COLLABORATORS_MAX_PAGE):
+            return jsonify({"error": f"limit must be between 1 and {COLLABORATORS_MAX_PAGE}"}), 400
+        
+        if ndjson:
+            logger.info(f"🔍 Streaming collaborators (role={role}, offset={offset}, limit={limit})")
+            rows = ai_core.iter_collaborators(role, fields, offset, limit, page_size=COLLABORATORS_STREAM_PAGE)
+            return Response(stream_with_context(json.dumps(r) + "\n" for r in rows),
+                            mimetype="application/x-ndjson")
+        
+        if limit is not None or cursor:
+            limit = limit or COLLABORATORS_DEFAULT_PAGE
+            logger.info(f"🔍 Getting collaborators page (role={role}, offset={offset}, limit={limit})")
+            collaborators, next_offset = ai_core.get_collaborators_page(role, fields, offset, limit)
+            return jsonify({
+                "count": len(collaborators),
+                "collaborators": collaborators,
+                "next_cursor": _encode_cursor(next_offset) if next_offset is not None else None
+            })
         
         if role:
             logger.info(f"🔍 Getting collaborators with role: {role}")
@@ -301,6 +515,8 @@ def get_collaborators():
         else:
             logger.info("🔍 Getting all collaborators")
             collaborators = ai_core.get_all_collaborators()
+        if fields:
+            collaborators = [{k: c[k] for k in fields if k in c} for c in collaborators]
         
         return jsonify({
             "count": len(collaborators),
@@ -353,6 +569,14 @@ def search_skills():
         return jsonify({"error": "Failed to search by skills"}), 500
 
 
+def _slack_ingest_authorized():
+    """Bearer token check shared by the Slack ingest endpoints (SLACK_INGEST_TOKEN)."""
+    authz = request.headers.get('Authorization', '')
+    token = authz.split('Bearer ' ,1)[1].strip() if 'Bearer ' in authz else ''
+    expected = os.getenv('SLACK_INGEST_TOKEN', '')
+    return bool(expected) and token == expected
+
+
 @app.route('/slack/ingest', methods=['POST'])
 def slack_ingest():
     """Ingest Slack channel messages via Composio. Minimal and isolated.
@@ -370,10 +594,7 @@ def slack_ingest():
     """
     try:
         # Simple bearer token verification (keeps MVP untouched)
-        authz = request.headers.get('Authorization', '')
-        token = authz.split('Bearer ' ,1)[1].strip() if 'Bearer ' in authz else ''
-        expected = os.getenv('SLACK_INGEST_TOKEN', '')
-        if not expected or token != expected:
+        if not _slack_ingest_authorized():
             return jsonify({"error": "Unauthorized"}), 401
 
         data = request.get_json(silent=True) or {}
@@ -393,9 +614,9 @@ def slack_ingest():
             if channel_id not in allow:
                 return jsonify({"ok": True, "skipped": True, "reason": "channel_not_allowed"})
 
-        # Idempotency: skip if we've already processed
+        # Idempotency: skip if we've already processed (keys expire after the idempotency window)
         key = (channel_id, message_ts)
-        if key in processed_slack_messages:
+        if key in processed_messages:
             return jsonify({"ok": True, "deduped": True})
 
         logger.info("🤖 Ingesting Slack intro from %s in %s", user_id or "unknown", channel_id)
@@ -406,7 +627,7 @@ def slack_ingest():
 
         # Save profile and compute matches
         saved_user_id = ai_core.save_user_profile(profile)
-        matches = ai_core.find_collaborators(profile) or []
+        matches = ai_core.find_collaborators(profile, exclude_ids=[saved_user_id] if saved_user_id else None) or []
 
         # Keep only top 3 for Slack summary
         top_matches = []
@@ -419,7 +640,7 @@ def slack_ingest():
             })
 
         # Mark processed
-        processed_slack_messages.add(key)
+        processed_messages.add(key)
 
         # Short summary for Composio to post in thread
         summary = {
@@ -442,12 +663,144 @@ def slack_ingest():
         return jsonify({"error": "Failed to ingest Slack message"}), 500
 
 
+# Backfill jobs run one at a time in the background (see slack_backfill.py)
+slack_backfill_queue = JobQueue("slack-backfill", slack_backfill.run_job, workers=1, maxsize=10)
+
+
+@app.route('/slack/backfill', methods=['POST'])
+def slack_backfill_start():
+    """Bulk-ingest historic Slack messages.
+
+    Body: JSONL, one Slack message per line ({"text", "channel_id", "message_ts", "user_id"}).
+    Query: ?job_id=<id> (optional; generated if omitted). POSTing an existing job_id with an
+    empty body resumes it from its checkpoint.
+
+    Auth: Send header Authorization: Bearer <SLACK_INGEST_TOKEN>
+    Returns 202 with the job_id; poll GET /slack/backfill/<job_id> for progress.
+    """
+    try:
+        if not _slack_ingest_authorized():
+            return jsonify({"error": "Unauthorized"}), 401
+
+        job_id = (request.args.get('job_id') or f"backfill_{int(time.time() * 1000)}").strip()
+        try:
+            job_id, data_path, checkpoint_path = slack_backfill.job_paths(job_id)
+        except ValueError:
+            return jsonify({"error": "Invalid job_id"}), 400
+
+        body = request.get_data(as_text=True) or ''
+        # Claim the job before touching its files: a queued or running job keeps its input
+        if not slack_backfill.claim_job(job_id):
+            status = slack_backfill.job_status(job_id) or "queued"
+            if body.strip():
+                return jsonify({"error": f"Job {job_id} is already {status}; its input can't be replaced"}), 409
+            return jsonify({"ok": True, "job_id": job_id, "status": status}), 202
+
+        submitted = False
+        try:
+            if body.strip():
+                with open(data_path, 'w') as f:
+                    f.write(body if body.endswith('\n') else body + '\n')
+                if os.path.exists(checkpoint_path):
+                    os.remove(checkpoint_path)
+            elif not os.path.exists(data_path):
+                return jsonify({"error": "Body must be JSONL (or resume an existing job_id)"}), 400
+
+            state = slack_backfill.load_checkpoint(checkpoint_path)
+            state["status"] = "queued"
+            slack_backfill.save_checkpoint(checkpoint_path, state)
+            submitted = slack_backfill_queue.submit(job_id)
+            if not submitted:
+                return jsonify({"error": "Too many backfill jobs queued"}), 503
+        finally:
+            if not submitted:
+                slack_backfill.release_job(job_id)
+
+        logger.info(f"📥 Queued Slack backfill job {job_id} (resuming at line {state['offset']})")
+        return jsonify({"ok": True, "job_id": job_id, "status": "queued", "offset": state["offset"]}), 202
+    except Exception as e:
+        logger.error("❌ ERROR in /slack/backfill: %s", e)
+        logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to start Slack backfill"}), 500
+
+
+@app.route('/slack/backfill/<job_id>', methods=['GET'])
+def slack_backfill_status(job_id):
+    """Progress of a backfill job (its checkpoint)."""
+    if not _slack_ingest_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+    try:
+        job_id, _, checkpoint_path = slack_backfill.job_paths(job_id)
+    except ValueError:
+        return jsonify({"error": "Invalid job_id"}), 400
+    if not os.path.exists(checkpoint_path):
+        return jsonify({"error": "Unknown job_id"}), 404
+    return jsonify(dict(slack_backfill.load_checkpoint(checkpoint_path), job_id=job_id))
+
+
+def _process_slack_event(job):
+    """Background worker for /slack/events: extract, save, match and reply in the thread."""
+    text, channel_id, message_ts = job["text"], job["channel_id"], job["message_ts"]
+    logger.info("📨 Slack event message from %s in %s", job.get("user_id") or "unknown", channel_id)
+
+    # Reuse pipeline
+    transcript = f"User: {text}"
+    profile = ai_core.extract_user_profile(transcript) or {}
+    saved_user_id = ai_core.save_user_profile(profile)
+    matches = ai_core.find_collaborators(profile, exclude_ids=[saved_user_id] if saved_user_id else None) or []
+
+    top_matches = []
+    for m in matches[:3]:
+        top_matches.append({
+            "name": m.get("name"),
+            "role": m.get("role"),
+            "score": m.get("score"),
+            "availability": m.get("availability")
+        })
+
+    # Optionally reply in Slack thread (guarded by SLACK_BOT_TOKEN)
+    summary_lines = [
+        f"✅ Profile added: *{(profile.get('role') or 'Unknown')}*",
+        f"• Skills: {', '.join(profile.get('skills') or []) or '—'}",
+        f"• Interests: {', '.join(profile.get('interests') or []) or '—'}",
+        "",
+    ]
+    if top_matches:
+        summary_lines.append("Top matches:")
+        for i, tm in enumerate(top_matches, start=1):
+            name = tm.get('name') or tm.get('role') or 'Candidate'
+            role = tm.get('role') or '—'
+            score = tm.get('score')
+            score_str = f" ({int(round(score))}%)" if isinstance(score, (int, float)) else ""
+            summary_lines.append(f"{i}) {name} — {role}{score_str}")
+    else:
+        summary_lines.append("No strong matches yet. Try adding 1–2 more skills or interests.")
+    summary_text = "\n".join(summary_lines)
+
+    _post_slack_thread_message(channel_id, message_ts, summary_text)
+
+
+def _run_slack_event(job):
+    """Queue handler: process one event; if that fails, forget its dedupe keys so Slack's retry runs."""
+    try:
+        _process_slack_event(job)
+    except Exception:
+        processed_messages.discard((job["channel_id"], job["message_ts"]))
+        recent_texts.discard(job["text_key"])
+        raise
+
+
+# Slack events are acked immediately and processed here (SLACK_WORKERS / SLACK_QUEUE_SIZE)
+slack_event_queue = JobQueue("slack-events", _run_slack_event)
+
+
 @app.route('/slack/events', methods=['POST'])
 def slack_events():
     """Slack Events API adapter.
 
     - Responds to URL verification by echoing the challenge
-    - For message events, reuses the same profile extraction + matching pipeline
+    - For message events, queues the profile extraction + matching pipeline on a
+      background worker and acks right away (Slack retries events not acked in ~3s)
     """
     try:
         data = request.get_json(silent=True) or {}
@@ -486,74 +839,31 @@ def slack_events():
 
                 # Idempotency
                 key = (channel_id, message_ts)
-                if key in processed_slack_messages:
+                if key in processed_messages:
                     return jsonify({"ok": True, "deduped": True})
 
-                # Soft dedupe: ignore identical text from same channel within 2 minutes
+                # Soft dedupe: ignore identical text from same channel within SLACK_TEXT_DEDUPE_SECONDS
+                text_key = (channel_id, normalize_text(text))
                 try:
-                    import time as _t
-                    norm = ' '.join(text.lower().split())
-                    tkey = (channel_id, norm)
-                    now = _t.time()
-                    last = recent_text_cache.get(tkey, 0)
-                    if now - last < 120:  # 2 minutes
+                    if recent_texts.check_and_add(text_key):
                         return jsonify({"ok": True, "deduped_text": True})
-                    recent_text_cache[tkey] = now
                 except Exception:
                     pass
 
-                logger.info("📨 Slack event message from %s in %s", user_id or "unknown", channel_id)
-
-                # Reuse pipeline
-                transcript = f"User: {text}"
-                profile = ai_core.extract_user_profile(transcript) or {}
-                saved_user_id = ai_core.save_user_profile(profile)
-                matches = ai_core.find_collaborators(profile) or []
-
-                top_matches = []
-                for m in matches[:3]:
-                    top_matches.append({
-                        "name": m.get("name"),
-                        "role": m.get("role"),
-                        "score": m.get("score"),
-                        "availability": m.get("availability")
-                    })
-
-                processed_slack_messages.add(key)
-
-                # Optionally reply in Slack thread (guarded by SLACK_BOT_TOKEN)
-                summary_lines = [
-                    f"✅ Profile added: *{(profile.get('role') or 'Unknown')}*",
-                    f"• Skills: {', '.join(profile.get('skills') or []) or '—'}",
-                    f"• Interests: {', '.join(profile.get('interests') or []) or '—'}",
-                    "",
-                ]
-                if top_matches:
-                    summary_lines.append("Top matches:")
-                    for i, tm in enumerate(top_matches, start=1):
-                        name = tm.get('name') or tm.get('role') or 'Candidate'
-                        role = tm.get('role') or '—'
-                        score = tm.get('score')
-                        score_str = f" ({int(round(score))}%)" if isinstance(score, (int, float)) else ""
-                        summary_lines.append(f"{i}) {name} — {role}{score_str}")
-                else:
-                    summary_lines.append("No strong matches yet. Try adding 1–2 more skills or interests.")
-                summary_text = "\n".join(summary_lines)
-
-                _post_slack_thread_message(channel_id, message_ts, summary_text)
-
-                return jsonify({
-                    "ok": True,
-                    "saved_user_id": saved_user_id,
-                    "profile": {
-                        "name": profile.get("name"),
-                        "role": profile.get("role"),
-                        "skills": profile.get("skills", []),
-                        "interests": profile.get("interests", []),
-                        "looking_for": profile.get("looking_for")
-                    },
-                    "top_matches": top_matches
-                })
+                # Claim the key now so Slack retries of a queued event are deduped too;
+                # _run_slack_event releases it again if processing fails
+                if processed_messages.check_and_add(key):
+                    return jsonify({"ok": True, "deduped": True})
+                if not slack_event_queue.submit({"text": text, "channel_id": channel_id, "message_ts": message_ts,
+                                                 "user_id": user_id, "text_key": text_key}):
+                    # Queue full: release the key and let Slack retry later
+                    processed_messages.discard(key)
+                    recent_texts.discard(text_key)
+                    logger.warning("   ⚠️ Slack event queue full, asking Slack to retry")
+                    return jsonify({"ok": False, "error": "busy"}), 503
+
+                logger.info("📨 Queued Slack event message from %s in %s", user_id or "unknown", channel_id)
+                return jsonify({"ok": True, "queued": True})
 
         # For other events, just ack
         return jsonify({"ok": True})
@@ -571,12 +881,40 @@ def get_stats():
     try:
         logger.info("📊 Getting database statistics")
         stats = ai_core.get_database_stats()
+        stats["slot_detector"] = slot_detector.stats()
+        stats["slack_queue"] = slack_event_queue.stats()
+        stats["slack_client"] = slack_client.stats()
+        stats["slack_dedupe"] = {
+            "messages": processed_messages.stats(),
+            "texts": recent_texts.stats()
+        }
         return jsonify(stats)
     except Exception as e:
         logger.error(f"❌ ERROR in /stats endpoint: {e}")
         return jsonify({"error": "Failed to retrieve statistics"}), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Stage latency histograms, find_collaborators fallback counters, result cache hits /
+    misses and per-route request latency in the Prometheus text format.
+    """
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.route('/sessions/stats', methods=['GET'])
+def get_session_stats():
+    """
+    Chat session store size, memory use and eviction counters.
+    """
+    try:
+        return jsonify(session_store.stats())
+    except Exception as e:
+        logger.error(f"❌ ERROR in /sessions/stats endpoint: {e}")
+        return jsonify({"error": "Failed to retrieve session statistics"}), 500
+
+
 @app.route('/team/create', methods=['POST'])
 def create_team():
     """Create a team from user IDs"""
@@ -588,16 +926,30 @@ def create_team():
         if not user_ids or len(user_ids) < 2:
             return jsonify({"error": "Need at least 2 user IDs to form a team"}), 400
         
-        team_id = ai_core.create_team(user_ids, team_name)
-        
-        if team_id:
+        # A user who just searched may still be being written in the background; a member
+        # whose profile never got stored fails the request instead of silently dropping out
+        unsaved = _await_pending_saves(user_ids)
+        if unsaved:
             return jsonify({
-                "message": f"Team '{team_name}' created successfully",
-                "team_id": team_id,
-                "members": user_ids
-            })
-        else:
+                "error": "Some users' profiles were not saved",
+                "unsaved_user_ids": unsaved
+            }), 409
+        result = ai_core.create_team(user_ids, team_name)
+        
+        if result is None:
             return jsonify({"error": "Failed to create team"}), 500
+        if not result["team_id"]:
+            return jsonify({
+                "error": "Need at least 2 available users to form a team",
+                "member_results": result["members"]
+            }), 400
+        
+        return jsonify({
+            "message": f"Team '{team_name}' created successfully",
+            "team_id": result["team_id"],
+            "members": [u for u, outcome in result["members"].items() if outcome == "added"],
+            "member_results": result["members"]
+        })
             
     except Exception as e:
         logger.error(f"❌ ERROR in /team/create: {e}")
@@ -650,13 +1002,21 @@ if __name__ == '__main__':
     logger.info("   Debug Mode: True")
     logger.info("   Endpoints:")
     logger.info("      GET  /health")
+    logger.info("      GET  /health/ready")
+    logger.info("      POST /warmup")
     logger.info("      POST /chat")
     logger.info("      POST /find-collaborators")
     logger.info("      POST /slack/ingest")
     logger.info("      POST /slack/events")
+    logger.info("      POST /slack/backfill")
     logger.info("      GET  /collaborators")
     logger.info("      GET  /collaborators/<id>")
     logger.info("      POST /search/skills")
     logger.info("      GET  /stats")
+    logger.info("      GET  /sessions/stats")
+    logger.info("      GET  /metrics")
     logger.info("="*80 + "\n")
+    # With the debug reloader, only warm up the child process that actually serves requests
+    if WARMUP_ON_START and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_warmup()
     app.run(debug=True, port=5001)
@@ -0,0 +1,291 @@
+"""
+Offline benchmark for the matching pipeline: extract -> find_collaborators -> build_team_suggestions.
+
+Runs without a Groq key: ai_core.client is swapped for the deterministic StubGroqClient
+(groq_stub.py). For each corpus size, synthetic profiles from generate_profiles are
+seeded into a throwaway Chroma directory, then a fixed set of synthetic transcripts is
+pushed through the pipeline. Every stage is timed per query:
+
+  extract      ai_core.extract_user_profile (stubbed LLM call + JSON parsing)
+  embed        query embedding inside find_collaborators
+  retrieve     retriever.query_tiers (Chroma or in-memory numpy, see RETRIEVAL_BACKEND)
+  rank         vectorized re-ranker (ranking.score_candidates)
+  find         find_collaborators end to end
+  suggest      build_team_suggestions
+  pipeline     extract + find + suggest
+
+and reported as p50/p95/p99/mean latency plus throughput. Results are written as JSON;
+pass --baseline to compare against an earlier run and fail on p95 regressions.
+
+The search result cache (result_cache.py) is off by default, since the warmup queries
+would otherwise turn the first measured queries into cache hits; --result-cache turns it on.
+
+Run with: python bench_pipeline.py [--sizes 1000,10000,100000] [--queries 200]
+                                   [--out bench_pipeline.json] [--baseline OLD.json]
+                                   [--stub-embeddings] [--groq-latency-ms 0] [--result-cache]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+# Seeding drops the collection, so always point Chroma and the team index at a scratch
+# directory (and skip the embedding cache unless asked). Must happen before ai_core /
+# seed_db read their config.
+_BENCH_DIR = tempfile.mkdtemp(prefix="synergy_bench_")
+os.environ["CHROMA_PATH"] = os.path.join(_BENCH_DIR, "chroma_db")
+os.environ["TEAM_INDEX_PATH"] = os.path.join(_BENCH_DIR, "team_index.json")
+os.environ.setdefault("EMBED_CACHE_PATH", "")
+
+import numpy as np
+
+import ai_core
+import seed_db
+from generate_profiles import generate_profile
+from groq_stub import StubGroqClient
+
+SIZES = [1000, 10000, 100000]
+STAGES = ["extract", "embed", "retrieve", "rank", "find", "suggest", "pipeline"]
+EMBEDDING_DIM = 384
+
+
+class HashEmbedder:
+    """
+    Deterministic bag-of-words hashing embedder with the SentenceTransformer.encode shape.
+    Used with --stub-embeddings to measure everything except the model itself.
+    """
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+
+    def _vector(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            vec[h % self.dim] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def encode(self, texts, batch_size=None, show_progress_bar=False, **kwargs):
+        if isinstance(texts, str):
+            return self._vector(texts)
+        return np.stack([self._vector(t) for t in texts]) if texts else np.zeros((0, self.dim), dtype=np.float32)
+
+
+class StageTimer:
+    """Collects per-stage latency samples; `wrap` times every call of a function."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - start)
+        return timed
+
+    def record(self, stage, seconds):
+        self.samples[stage].append(seconds)
+
+    def clear(self):
+        self.samples.clear()
+
+    def summary(self):
+        out = {}
+        for stage in STAGES:
+            values = self.samples.get(stage)
+            if not values:
+                continue
+            ms = np.array(values) * 1000.0
+            total = float(np.sum(values))
+            out[stage] = {
+                "count": len(values),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                "mean_ms": round(float(np.mean(ms)), 3),
+                "ops_per_sec": round(len(values) / total, 1) if total > 0 else None,
+            }
+        return out
+
+
+def make_transcripts(n, seed=42):
+    """Synthetic single-message intros, fixed for a given seed."""
+    rng_state = random.getstate()
+    random.seed(seed)
+    try:
+        transcripts = []
+        for i in range(n):
+            p = generate_profile(i)
+            transcripts.append(
+                f"User: I'm {p['name']}, a {p['role']} working with {', '.join(p['skills'])}. "
+                f"Interested in {', '.join(p['interests'])}. {p['bio']}"
+            )
+        return transcripts
+    finally:
+        random.setstate(rng_state)
+
+
+def cleanup():
+    """Remove the scratch Chroma directory."""
+    shutil.rmtree(_BENCH_DIR, ignore_errors=True)
+
+
+def iter_corpus(size, seed=7):
+    random.seed(seed)
+    for i in range(size):
+        yield generate_profile(i)
+
+
+def install_instrumentation(timer):
+    """Time the stages inside find_collaborators by wrapping the module-level hooks it calls."""
+    ai_core.create_embedding = timer.wrap("embed", ai_core.create_embedding)
+    ai_core.score_candidates = timer.wrap("rank", ai_core.score_candidates)
+    ai_core.retriever.query_tiers = timer.wrap("retrieve", ai_core.retriever.query_tiers)
+
+
+def run_size(size, transcripts, timer, warmup_queries):
+    print(f"\n🌱 Seeding {size} synthetic profiles...")
+    seed_stats = seed_db.seed_database(profiles=iter_corpus(size))
+    if seed_stats is None:
+        raise SystemExit(f"❌ Seeding {size} profiles failed")
+    if hasattr(ai_core.retriever, "load"):
+        ai_core.retriever.load()
+
+    def one(transcript, record):
+        start = time.perf_counter()
+        t = time.perf_counter()
+        profile = ai_core.extract_user_profile(transcript)
+        extract_s = time.perf_counter() - t
+        t = time.perf_counter()
+        matches = ai_core.find_collaborators(profile)
+        find_s = time.perf_counter() - t
+        t = time.perf_counter()
+        ai_core.build_team_suggestions(profile, matches)
+        suggest_s = time.perf_counter() - t
+        if record:
+            timer.record("extract", extract_s)
+            timer.record("find", find_s)
+            timer.record("suggest", suggest_s)
+            timer.record("pipeline", time.perf_counter() - start)
+        return len(matches)
+
+    for transcript in transcripts[:warmup_queries]:
+        one(transcript, record=False)
+    timer.clear()
+
+    empty = 0
+    wall = time.perf_counter()
+    for transcript in transcripts:
+        empty += one(transcript, record=True) == 0
+    wall = time.perf_counter() - wall
+
+    stages = timer.summary()
+    timer.clear()
+    return {
+        "seed": {k: round(v, 3) if isinstance(v, float) else v for k, v in seed_stats.items()},
+        "queries": len(transcripts),
+        "empty_results": empty,
+        "wall_seconds": round(wall, 3),
+        "queries_per_sec": round(len(transcripts) / wall, 1) if wall > 0 else None,
+        "stages": stages,
+    }
+
+
+def print_table(size, result):
+    print(f"\n📊 {size} profiles — {result['queries_per_sec']} queries/sec")
+    print(f"{'stage':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'ops/sec':>10}")
+    for stage, s in result["stages"].items():
+        print(f"{stage:>10} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f} "
+              f"{s['mean_ms']:>9.3f} {s['ops_per_sec'] or 0:>10.1f}")
+
+
+def compare(results, baseline_path, tolerance):
+    """Print p95 deltas against a previous run; return the list of regressions beyond `tolerance`."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    print(f"\n🔍 Compared with {baseline_path} (p95, tolerance {tolerance:.0%})")
+    for size, result in results["sizes"].items():
+        old_stages = baseline.get("sizes", {}).get(size, {}).get("stages", {})
+        for stage, s in result["stages"].items():
+            old = old_stages.get(stage)
+            if not old or not old.get("p95_ms"):
+                continue
+            ratio = s["p95_ms"] / old["p95_ms"]
+            flag = "❌" if ratio > 1 + tolerance else "✅"
+            print(f"  {flag} {size:>7} {stage:>10}: {old['p95_ms']:.3f} -> {s['p95_ms']:.3f} ms ({ratio - 1:+.1%})")
+            if ratio > 1 + tolerance:
+                regressions.append((size, stage, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline matching-pipeline benchmark (stubbed Groq)")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in SIZES), help="comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=200, help="measured queries per corpus size")
+    parser.add_argument("--warmup-queries", type=int, default=10, help="unmeasured queries run first")
+    parser.add_argument("--out", default="bench_pipeline.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", default=None, help="earlier results JSON to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--stub-embeddings", action="store_true", help="hashing embedder instead of the model")
+    parser.add_argument("--groq-latency-ms", type=float, default=0.0, help="latency injected into stubbed Groq calls")
+    parser.add_argument("--result-cache", action="store_true", help="keep the search result cache on")
+    args = parser.parse_args()
+
+    ai_core.client = StubGroqClient(latency_ms=args.groq_latency_ms)
+    if args.stub_embeddings:
+        ai_core.embedding_model = seed_db.embedding_model = HashEmbedder()
+    if not args.result_cache:
+        ai_core.result_cache.max_entries = 0
+
+    timer = StageTimer()
+    install_instrumentation(timer)
+    transcripts = make_transcripts(args.queries)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "retrieval_backend": ai_core.retriever.name,
+            "retrieval_mode": getattr(ai_core.retriever, "mode", None),
+            "stub_embeddings": args.stub_embeddings,
+            "groq_latency_ms": args.groq_latency_ms,
+            "result_cache": args.result_cache,
+            "queries": args.queries,
+        },
+        "sizes": {},
+    }
+    try:
+        for size in sizes:
+            result = run_size(size, transcripts, timer, args.warmup_queries)
+            results["sizes"][str(size)] = result
+            print_table(size, result)
+    finally:
+        cleanup()
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {args.out}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            sys.exit(f"❌ {len(regressions)} stage(s) regressed beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
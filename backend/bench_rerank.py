@@ -0,0 +1,84 @@
+"""
+Micro-benchmark for the find_collaborators re-ranker.
+Compares the vectorized scorer (deriving features per call, and with precomputed
+features from a FeatureStore) against the reference loop on synthetic candidates, and
+checks that all of them produce exactly the same scores and order.
+
+Run with: python bench_rerank.py [repeats]
+"""
+
+import random
+import sys
+import time
+
+from generate_profiles import generate_profile
+from feature_store import FeatureStore
+from ranking import build_rank_context, candidate_features, score_candidates, score_candidates_reference
+
+SIZES = [5, 20, 50, 500, 5000]
+
+USERS = [
+    ({"name": "Sarah", "skills": ["Python", "React", "UI/UX"], "interests": ["HealthTech", "AI"]}, ["Software Engineer"]),
+    ({"name": "Alex", "skills": ["Figma", "Prototyping"], "interests": ["FinTech", "Security"]}, []),
+    ({"name": "Priya", "skills": ["SQL", "Analytics"], "interests": ["EdTech", "Robotics", "Climate Tech"]}, ["Designer", "Data Scientist"]),
+]
+
+
+def make_candidates(n):
+    """Metadata rows shaped like the ones stored in Chroma."""
+    rows = []
+    for i in range(n):
+        p = generate_profile(i)
+        rows.append({
+            "id": p["id"],
+            "name": p["name"],
+            "role": p["role"],
+            "skills": ", ".join(p["skills"]),
+            "interests": ", ".join(p["interests"]),
+            "bio": p["bio"],
+            "availability": p["availability"],
+            "team_id": "None"
+        })
+    return rows
+
+
+def _time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(repeats=5):
+    random.seed(7)
+    print(f"{'n':>6} {'loop ms':>10} {'vector ms':>10} {'w/ store':>10} {'speedup':>8}  identical")
+    for n in SIZES:
+        cands = make_candidates(n)
+        # Features precomputed once per candidate, as at profile-write time
+        store = FeatureStore()
+        store.put_many(cands)
+        loop_total = vec_total = cached_total = 0.0
+        identical = True
+        for profile, target_roles in USERS:
+            ctx = build_rank_context(profile, target_roles)
+            ref = score_candidates_reference(cands, ctx)
+            vec = score_candidates(cands, ctx, features=candidate_features)
+            cached = score_candidates(cands, ctx, features=store.get)
+            expected = [(s, md["id"], r) for s, md, r in ref]
+            identical &= expected == [(s, md["id"], r) for s, md, r in vec]
+            identical &= expected == [(s, md["id"], r) for s, md, r in cached]
+            loop_total += _time(lambda: score_candidates_reference(cands, ctx), repeats)
+            vec_total += _time(lambda: score_candidates(cands, ctx, features=candidate_features), repeats)
+            cached_total += _time(lambda: score_candidates(cands, ctx, features=store.get), repeats)
+        loop_ms = 1000 * loop_total / len(USERS)
+        vec_ms = 1000 * vec_total / len(USERS)
+        cached_ms = 1000 * cached_total / len(USERS)
+        print(f"{n:>6} {loop_ms:>10.3f} {vec_ms:>10.3f} {cached_ms:>10.3f} {loop_ms / cached_ms:>7.1f}x  {identical}")
+        if not identical:
+            raise SystemExit("❌ Vectorized scores differ from the reference loop")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,143 @@
+"""
+Micro-benchmark for role canonicalization.
+Times the compiled RoleMatcher paths in roles.py against the keyword cascades they
+replaced (copied below as the baseline) and checks both give the same answers.
+
+Run with: python bench_roles.py [iterations]
+"""
+
+import random
+import sys
+import time
+
+from generate_profiles import INTERESTS, ROLES
+from roles import ROLE_LABELS, SKILL_ROLES, PROFILE_ROLES, canon_role, infer_profile_role, infer_role_from_skills
+
+
+# ---------------------------------------------------------------------------
+# Baseline: the nested cascades previously inlined in ai_core
+# ---------------------------------------------------------------------------
+
+def legacy_canon_role(raw):
+    if not raw:
+        return ''
+    s = str(raw).strip().lower()
+    direct = {
+        'software engineer': 'Software Engineer', 'engineer': 'Software Engineer',
+        'developer': 'Software Engineer', 'swe': 'Software Engineer', 'coder': 'Software Engineer',
+        'frontend': 'Software Engineer', 'backend': 'Software Engineer', 'fullstack': 'Software Engineer',
+        'full-stack': 'Software Engineer', 'ux': 'Designer', 'ui': 'Designer', 'ui/ux': 'Designer',
+        'designer': 'Designer', 'product manager': 'Product Manager', 'pm': 'Product Manager',
+        'product': 'Product Manager', 'data scientist': 'Data Scientist', 'ml engineer': 'Data Scientist',
+        'ai engineer': 'Data Scientist', 'finance expert': 'Finance & Operations',
+        'marketing': 'Marketing & Growth', 'growth': 'Marketing & Growth',
+        'sales': 'Sales & Business Development', 'business development': 'Sales & Business Development',
+        'biz dev': 'Sales & Business Development', 'finance': 'Finance & Operations',
+        'operations': 'Finance & Operations', 'ops': 'Finance & Operations',
+    }
+    if s in direct:
+        return direct[s]
+    if any(k in s for k in ['engineer', 'developer', 'dev', 'coder']):
+        return 'Software Engineer'
+    if any(k in s for k in ['design', 'figma', 'ux', 'ui']):
+        return 'Designer'
+    if 'product' in s or s == 'pm':
+        return 'Product Manager'
+    if any(k in s for k in ['data', 'ml', 'machine learning', 'ai']):
+        return 'Data Scientist'
+    if any(k in s for k in ['marketing', 'growth']):
+        return 'Marketing & Growth'
+    if any(k in s for k in ['sales', 'business', 'partnership']):
+        return 'Sales & Business Development'
+    if any(k in s for k in ['finance', 'operation', 'ops']):
+        return 'Finance & Operations'
+    return raw.strip()
+
+
+def legacy_skill_role(skills):
+    skills_lower = ' '.join([s.lower() for s in skills])
+    if any(w in skills_lower for w in ['python', 'javascript', 'react', 'node', 'c++', 'java', 'backend', 'frontend', 'fullstack', 'devops']):
+        return 'Software Engineer'
+    elif any(w in skills_lower for w in ['design', 'figma', 'ui', 'ux', 'sketch', 'adobe']):
+        return 'Designer'
+    elif any(w in skills_lower for w in ['product', 'roadmap', 'pm', 'strategy', 'analytics']):
+        return 'Product Manager'
+    elif any(w in skills_lower for w in ['data', 'ml', 'machine learning', 'analytics', 'sql', 'pytorch', 'tensorflow']):
+        return 'Data Scientist'
+    return 'Other'
+
+
+def legacy_profile_role(skills):
+    skills_lower = ' '.join([s.lower() for s in skills])
+    if any(word in skills_lower for word in ['python', 'javascript', 'react', 'node', 'c++', 'java', 'code', 'dev', 'backend', 'frontend']):
+        return "Software Engineer"
+    elif any(word in skills_lower for word in ['design', 'figma', 'ui', 'ux', 'sketch', 'adobe']):
+        return "Designer"
+    elif any(word in skills_lower for word in ['product', 'roadmap', 'pm', 'strategy', 'analytics']):
+        return "Product Manager"
+    elif any(word in skills_lower for word in ['data', 'ml', 'machine learning', 'analytics', 'sql']):
+        return "Data Scientist"
+    elif any(word in skills_lower for word in ['marketing', 'growth', 'seo', 'content']):
+        return "Marketing & Growth"
+    elif any(word in skills_lower for word in ['sales', 'business', 'partnerships']):
+        return "Sales & Business Development"
+    elif any(word in skills_lower for word in ['finance', 'accounting', 'fundraising']):
+        return "Finance & Operations"
+    return "Other"
+
+
+# ---------------------------------------------------------------------------
+
+def role_inputs():
+    labels = list(ROLES) + list(ROLE_LABELS.direct) + [
+        'Collaborator', 'Any', 'ML Engineer ', 'Growth Marketer', 'Ops lead', 'Biz Dev',
+        'Frontend Developer', 'Hardware Engineer', 'Founder', 'Business Analyst', 'CFO',
+        'Partnerships Manager', 'UX Researcher', 'AI researcher', 'Other', '',
+    ]
+    return labels + [l.upper() for l in labels if l]
+
+
+def skill_inputs():
+    pools = [skills for role in ROLES.values() for skills in role["skills"]]
+    topics = [t for group in INTERESTS.values() for t in group]
+    extra = [["Fundraising", "Accounting"], ["SEO", "Content"], ["Partnerships"], ["General"], ["C++", "Embedded"]]
+    rng = random.Random(3)
+    mixed = [rng.sample(topics, 2) + rng.choice(pools)[:1] for _ in range(40)]
+    return pools + extra + mixed
+
+
+def _bench(label, fn, inputs, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for x in inputs:
+            fn(x)
+    per_call = (time.perf_counter() - start) / (iterations * len(inputs))
+    print(f"  {label:<34} {per_call * 1e6:8.3f} µs/call")
+    return per_call
+
+
+def run(iterations=200):
+    roles_in, skills_in = role_inputs(), skill_inputs()
+
+    checks = [
+        ("canon_role", legacy_canon_role, canon_role, roles_in),
+        ("infer_role_from_skills", legacy_skill_role, infer_role_from_skills, skills_in),
+        ("infer_profile_role", legacy_profile_role, infer_profile_role, skills_in),
+    ]
+    for name, old, new, inputs in checks:
+        mismatches = [x for x in inputs if old(x) != new(x)]
+        if mismatches:
+            raise SystemExit(f"❌ {name} differs from the legacy cascade on {mismatches[:3]}")
+
+    for name, old, new, inputs in checks:
+        print(f"{name} ({len(inputs)} distinct inputs):")
+        before = _bench("before (keyword cascade)", old, inputs, iterations)
+        for matcher in (ROLE_LABELS, SKILL_ROLES, PROFILE_ROLES):
+            matcher.match.cache_clear()
+        cold = _bench("after, cold LRU (1 pass)", new, inputs, 1)
+        warm = _bench("after, warm LRU", new, inputs, iterations)
+        print(f"  speedup: {before / cold:.1f}x cold, {before / warm:.1f}x warm")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
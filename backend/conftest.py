@@ -0,0 +1,79 @@
+"""
+Shared pytest setup. Runs before any test module imports ai_core / app, so every piece of
+persisted state (Chroma, corpus version, team index, caches, backfill jobs) goes to a
+scratch directory, and the embedding model and Groq are replaced by offline stand-ins.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+
+_TEST_DIR = tempfile.mkdtemp(prefix="synergy_test_")
+os.environ["CHROMA_PATH"] = os.path.join(_TEST_DIR, "chroma_db")
+os.environ["TEAM_INDEX_PATH"] = os.path.join(_TEST_DIR, "chroma_db", "team_index.json")
+os.environ["CORPUS_VERSION_PATH"] = os.path.join(_TEST_DIR, "chroma_db", "corpus_version")
+os.environ["EMBED_CACHE_PATH"] = ""
+os.environ["SLACK_BACKFILL_DIR"] = os.path.join(_TEST_DIR, "slack_backfill")
+os.environ["PROFILE_DIR"] = os.path.join(_TEST_DIR, "profiles")
+os.environ["WARMUP_ON_START"] = "0"
+
+
+class HashEmbedder:
+    """Deterministic bag-of-words embedder with the SentenceTransformer.encode shape."""
+
+    dim = 64
+
+    def _vector(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            vec[h % self.dim] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def encode(self, texts, batch_size=None, show_progress_bar=False, **kwargs):
+        if isinstance(texts, str):
+            return self._vector(texts)
+        return np.stack([self._vector(t) for t in texts]) if texts else np.zeros((0, self.dim), dtype=np.float32)
+
+
+PROFILES = [
+    {"name": "Ada", "skills": ["Python", "Django"], "interests": ["HealthTech"], "looking_for": "Designer"},
+    {"name": "Ben", "skills": ["Figma", "UI/UX"], "interests": ["HealthTech"], "looking_for": "Software Engineer"},
+    {"name": "Cleo", "skills": ["Figma", "Sketch"], "interests": ["FinTech"], "looking_for": "Software Engineer"},
+    {"name": "Dev", "skills": ["Roadmapping", "Agile"], "interests": ["HealthTech"], "looking_for": "Designer"},
+    {"name": "Eli", "skills": ["SQL", "Machine Learning"], "interests": ["Climate"], "looking_for": "Collaborator"},
+    {"name": "Fay", "skills": ["React", "TypeScript"], "interests": ["EdTech"], "looking_for": "Designer"},
+    {"name": "Gus", "skills": ["Sales", "Negotiation"], "interests": ["HealthTech"], "looking_for": "Software Engineer"},
+    {"name": "Hana", "skills": ["Illustrator", "Branding"], "interests": ["HealthTech"], "looking_for": "Product Manager"},
+]
+
+
+@pytest.fixture
+def corpus():
+    """ai_core over a freshly seeded scratch collection of PROFILES (ids user_0..user_7)."""
+    import ai_core
+    from groq_stub import StubGroqClient
+
+    ai_core.embedding_model = HashEmbedder()
+    ai_core.client = StubGroqClient()
+    try:
+        ai_core.chroma_client.delete_collection(name="collaborators")
+    except Exception:
+        pass
+    collection = ai_core.chroma_client.create_collection(name="collaborators")
+    ai_core.feature_store.clear()
+    ai_core.team_index.clear()
+    ai_core.result_cache.bump()
+    ai_core.corpus_version.bump()
+    ai_core.save_user_profiles(PROFILES, [f"user_{i}" for i in range(len(PROFILES))])
+    ai_core.corpus_stats.reconcile(collection)
+    yield ai_core
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_TEST_DIR, ignore_errors=True)
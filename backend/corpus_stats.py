@@ -0,0 +1,96 @@
+"""
+Materialized role / availability counters and the set of available users.
+
+/stats and /users/available used to pull every row out of Chroma per request. Instead,
+ai_core applies each metadata write (save, create_team, dissolve_team) here as a delta,
+and a full reconcile against Chroma runs on startup, or whenever another process wrote
+to the collection (e.g. seed_db.py, or a team formed by another worker): detected through
+the shared corpus version, with the collection size as a backstop.
+"""
+
+import threading
+from collections import Counter
+
+from corpus_version import corpus_version
+
+
+class CorpusStats:
+    """Thread-safe role/availability counters plus {id: metadata} for available users."""
+
+    def __init__(self):
+        self._rows = {}  # {collab_id: (role, availability)}
+        self._available = {}  # {collab_id: metadata} for availability == "Available"
+        self.by_role = Counter()
+        self.by_availability = Counter()
+        self._lock = threading.Lock()
+        self.reconciles = 0
+        self.watch = corpus_version.watch()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _apply_locked(self, md):
+        collab_id = md.get('id')
+        if not collab_id:
+            return
+        old = self._rows.get(collab_id)
+        if old is not None:
+            self.by_role[old[0]] -= 1
+            self.by_availability[old[1]] -= 1
+            if not self.by_role[old[0]]:
+                del self.by_role[old[0]]
+            if not self.by_availability[old[1]]:
+                del self.by_availability[old[1]]
+        role = md.get('role', 'Unknown')
+        availability = md.get('availability', 'Unknown')
+        self._rows[collab_id] = (role, availability)
+        self.by_role[role] += 1
+        self.by_availability[availability] += 1
+        if availability == 'Available':
+            self._available[collab_id] = dict(md)
+        else:
+            self._available.pop(collab_id, None)
+
+    def apply(self, metadatas):
+        """Record new or updated metadata rows."""
+        with self._lock:
+            for md in metadatas:
+                self._apply_locked(md)
+
+    def reconcile(self, collection):
+        """Rebuild everything from one metadata-only scan of the collection."""
+        version = corpus_version.current()
+        result = collection.get(include=["metadatas"])
+        with self._lock:
+            self._rows = {}
+            self._available = {}
+            self.by_role = Counter()
+            self.by_availability = Counter()
+            for collab_id, md in zip(result['ids'], result['metadatas']):
+                self._apply_locked(dict(md or {}, id=(md or {}).get('id') or collab_id))
+            self.reconciles += 1
+        self.watch.synced(version)
+        return len(self._rows)
+
+    def ensure_consistent(self, collection):
+        """Reconcile if another process wrote since our last sync, or the size drifted."""
+        stale, _ = self.watch.stale()
+        if stale or collection.count() != len(self._rows):
+            self.reconcile(collection)
+
+    def available_users(self):
+        with self._lock:
+            return [dict(md) for md in self._available.values()]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "total": len(self._rows),
+                "by_role": dict(self.by_role),
+                "by_availability": dict(self.by_availability),
+                "available": len(self._available)
+            }
+
+
+# Process-wide counters maintained by ai_core
+corpus_stats = CorpusStats()
@@ -0,0 +1,103 @@
+"""
+Cross-process version counter for the collaborators collection.
+
+In-memory views of the collection (corpus_stats, the numpy retriever, result_cache) are
+kept current by applying each write made through ai_core as a delta. Writes made by
+another process (seed_db.py, a second app worker) never reach those deltas, and some of
+them leave the row count unchanged (a same-size reseed, team create / dissolve), so a
+count comparison can't detect them.
+
+Every write therefore bumps an integer stored in CORPUS_VERSION_PATH next to the Chroma
+data. Each view holds a VersionWatch with the version it has caught up to. A local
+writer advances the watches of the views it updated; any other difference means another
+process wrote, and the view rebuilds from Chroma.
+
+Config (env):
+  CORPUS_VERSION_PATH  version file (default <CHROMA_PATH>/corpus_version, "" = this process only)
+"""
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: bumps from two processes at the same instant may race
+    fcntl = None
+
+CORPUS_VERSION_PATH = os.getenv("CORPUS_VERSION_PATH", os.path.join(os.getenv("CHROMA_PATH", "./chroma_db"), "corpus_version"))
+
+
+class CorpusVersion:
+    """Monotonic write counter shared by every process using the same Chroma directory."""
+
+    def __init__(self, path=CORPUS_VERSION_PATH):
+        self.path = path
+        self._local = 0
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def current(self):
+        """Latest version written by any process."""
+        return self._read() if self.path else self._local
+
+    def bump(self):
+        """Record one write; returns (before, after)."""
+        with self._lock:
+            if not self.path:
+                before = self._local
+            else:
+                try:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    with open(f"{self.path}.lock", "a") as lock_file:
+                        if fcntl is not None:
+                            fcntl.flock(lock_file, fcntl.LOCK_EX)
+                        before = self._read()
+                        # Readers never see a half-written file
+                        tmp = f"{self.path}.{os.getpid()}.tmp"
+                        with open(tmp, "w") as f:
+                            f.write(str(before + 1))
+                        os.replace(tmp, self.path)
+                except OSError as e:
+                    print(f"⚠️  Could not persist corpus version: {e}")
+                    before = self._local
+            self._local = before + 1
+            return before, before + 1
+
+    def watch(self):
+        return VersionWatch(self)
+
+
+class VersionWatch:
+    """The corpus version one in-memory view has caught up to."""
+
+    def __init__(self, version):
+        self._version = version
+        self._lock = threading.Lock()
+        self.seen = None
+
+    def stale(self):
+        """(stale, current version): stale when a write this view hasn't applied happened."""
+        current = self._version.current()
+        with self._lock:
+            return current != self.seen, current
+
+    def synced(self, version):
+        """The view was rebuilt from a collection at `version` (read before rebuilding)."""
+        with self._lock:
+            self.seen = version
+
+    def advance(self, before, after):
+        """A local write this view already applied moved the version from `before` to `after`."""
+        with self._lock:
+            if self.seen == before:
+                self.seen = after
+
+
+# Process-wide handle on the shared counter
+corpus_version = CorpusVersion()
@@ -0,0 +1,188 @@
+"""
+Persistent, content-addressed cache for sentence embeddings.
+
+Vectors are keyed by sha256(model name + normalized text) and stored as float32
+blobs in a small SQLite file that lives outside ./chroma_db, so wiping and
+re-seeding the vector store does not pay for inference again.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "./embedding_cache.sqlite3")
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "200000"))
+
+# SQLite caps the number of bound parameters per statement
+_SQL_CHUNK = 500
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different strings share a cache entry."""
+    return ' '.join(str(text or '').split())
+
+
+def cache_key(model_name, text):
+    """Content address for an embedding: hash of the model name plus normalized text."""
+    payload = f"{model_name}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Size-bounded SQLite store of embeddings with LRU eviction and hit/miss counters.
+    Safe to share between threads of one process; multiple processes may open the same file.
+    """
+
+    def __init__(self, model_name, path=EMBED_CACHE_PATH, max_entries=EMBED_CACHE_MAX_ENTRIES):
+        self.model_name = model_name
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        # Row count kept by triggers in the same transaction as each insert / delete, so the
+        # eviction check is one-row read instead of a COUNT(*) scan, and stays right when
+        # several processes write the file
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embedding_count (n INTEGER NOT NULL)")
+            if self._conn.execute("SELECT COUNT(*) FROM embedding_count").fetchone()[0] == 0:
+                self._conn.execute("INSERT INTO embedding_count (n) SELECT COUNT(*) FROM embeddings")
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS embeddings_count_insert AFTER INSERT ON embeddings"
+                " BEGIN UPDATE embedding_count SET n = n + 1; END"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS embeddings_count_delete AFTER DELETE ON embeddings"
+                " BEGIN UPDATE embedding_count SET n = n - 1; END"
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def get_many(self, keys):
+        """Return {key: vector} for the keys that are cached, refreshing their LRU stamp."""
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(keys), _SQL_CHUNK):
+                part = keys[i:i + _SQL_CHUNK]
+                marks = ','.join('?' * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", part
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, k) for k in found]
+                )
+        return found
+
+    def put_many(self, items):
+        """Store (key, vector) pairs and evict the least recently used rows if over capacity."""
+        if not items:
+            return
+        now = time.time()
+        rows = [(k, np.asarray(v, dtype=np.float32).tobytes(), now) for k, v in items]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # An upsert (not INSERT OR REPLACE) so a re-stored key doesn't fire the count triggers
+                self._conn.executemany(
+                    "INSERT INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET vector = excluded.vector, last_used = excluded.last_used",
+                    rows
+                )
+                self._evict_locked()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _count_locked(self):
+        return self._conn.execute("SELECT n FROM embedding_count").fetchone()[0]
+
+    def _evict_locked(self):
+        count = self._count_locked()
+        if count <= self.max_entries:
+            return
+        # Trim to 90% so we don't evict on every single insert once full
+        excess = count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            " SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (excess,)
+        )
+        self.evictions += excess
+
+    def encode(self, texts, encode_fn):
+        """
+        Return embeddings for `texts`, calling `encode_fn(list_of_texts) -> list_of_vectors`
+        only for the texts that are not cached yet.
+        """
+        keys = [cache_key(self.model_name, t) for t in texts]
+        found = self.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        miss_count = sum(1 for k in keys if k not in found)
+        with self._lock:
+            self.hits += len(keys) - miss_count
+            self.misses += miss_count
+
+        if missing:
+            vectors = encode_fn(list(missing.values()))
+            fresh = list(zip(missing.keys(), vectors))
+            self.put_many(fresh)
+            for key, vec in fresh:
+                found[key] = np.asarray(vec, dtype=np.float32).tolist()
+
+        return [found[k] for k in keys]
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current on-disk size."""
+        with self._lock:
+            entries = self._count_locked()
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "evictions": self.evictions
+            }
+
+
+def open_cache(model_name):
+    """Open the shared cache, or return None when EMBED_CACHE_PATH is set to an empty string."""
+    if not EMBED_CACHE_PATH:
+        return None
+    try:
+        return EmbeddingCache(model_name)
+    except Exception as e:
+        print(f"⚠️  Embedding cache disabled: {e}")
+        return None
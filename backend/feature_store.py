@@ -0,0 +1,76 @@
+"""
+In-memory store of precomputed per-candidate ranking features, keyed by collaborator id.
+
+Features (canonical role, interned topic/skill ids, lowercased bio) are computed once
+when a profile is written through ai_core and reused by every search. The store lives
+in this process only, so rows written by another process (e.g. seed_db.py, which runs
+separately) are filled in lazily the first time a search sees them. Each entry
+remembers the raw fields it was derived from, so a re-seeded id with different content
+is recomputed.
+"""
+
+import threading
+
+from ranking import candidate_features
+
+
+def _fingerprint(md):
+    return (md.get('role'), md.get('interests'), md.get('skills'), md.get('bio'))
+
+
+class FeatureStore:
+    """Thread-safe {collab_id: CandidateFeatures} cache with hit/miss counters."""
+
+    def __init__(self):
+        self._entries = {}  # {collab_id: (fingerprint, CandidateFeatures)}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, md):
+        """Compute and store features for a metadata row; returns them."""
+        feats = candidate_features(md)
+        collab_id = md.get('id')
+        if collab_id:
+            with self._lock:
+                self._entries[collab_id] = (_fingerprint(md), feats)
+        return feats
+
+    def put_many(self, metadatas):
+        for md in metadatas:
+            self.put(md)
+
+    def get(self, md):
+        """Features for a metadata row, computing (and caching) them on a miss."""
+        entry = self._entries.get(md.get('id'))
+        if entry is not None and entry[0] == _fingerprint(md):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return self.put(md)
+
+    def invalidate(self, ids):
+        """Drop cached features for these ids (recomputed on next access)."""
+        with self._lock:
+            for collab_id in ids:
+                self._entries.pop(collab_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+# Process-wide store used by ai_core (seed_db only clears it when seeding in-process)
+feature_store = FeatureStore()
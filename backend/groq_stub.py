@@ -0,0 +1,126 @@
+"""
+Deterministic, offline stand-in for the Groq client used by benchmarks and load tests.
+
+Shaped like `groq.Groq`: `client.chat.completions.create(model=..., messages=..., ...)`
+returns an object with `.choices[0].message.content`. JSON-mode calls (profile extraction)
+return the generate_profiles skills, interests and roles that literally appear in the
+prompt, so a turn that only says "Hi, I'm Dana" extracts nothing, just like the real
+model would; plain chat calls get a short question or the trigger phrase.
+
+Latency can be injected to model the real API: a fixed `latency_ms` plus uniform
+`jitter_ms`, optionally per model.
+
+Usage:
+    import ai_core
+    from groq_stub import StubGroqClient
+    ai_core.client = StubGroqClient(latency_ms=150)
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from generate_profiles import INTERESTS, ROLES
+
+TRIGGER_PHRASE = "Great, I have everything I need!"
+FOLLOW_UPS = ["What skills do you have?", "What domains interest you most?", "What role do you need?"]
+
+_ROLE_NAMES = sorted(ROLES)
+_SKILLS = sorted({s for role in ROLES.values() for combo in role["skills"] for s in combo})
+_INTERESTS = sorted({i for topics in INTERESTS.values() for i in topics})
+
+
+def _term_pattern(terms):
+    # Longest first so "React Native" wins over "React"; no letters/digits on either side
+    alternation = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+    return re.compile(rf"(?<![\w])({alternation})(?![\w])", re.IGNORECASE)
+
+
+_SKILL_RE = _term_pattern(_SKILLS)
+_INTEREST_RE = _term_pattern(_INTERESTS)
+_ROLE_RE = _term_pattern(_ROLE_NAMES)
+_CANON = {t.lower(): t for t in _SKILLS + _INTERESTS + _ROLE_NAMES}
+_NAME_RE = re.compile(r"\b(?:I'm|I am|my name is)\s+([A-Z][a-z]+)")
+_LOOKING_RE = re.compile(r"looking for an?\s+(.+)", re.IGNORECASE)
+
+
+def _seed(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _find(pattern, text):
+    return list(dict.fromkeys(_CANON[m.lower()] for m in pattern.findall(text)))
+
+
+def _transcript(prompt):
+    """The conversation part of ai_core's extraction prompt (its instructions name example skills)."""
+    if "Conversation or Intro:" in prompt:
+        prompt = prompt.split("Conversation or Intro:", 1)[1].split("Return ONLY valid JSON", 1)[0]
+    return prompt
+
+
+def stub_profile(text):
+    """Extraction result for `text`: only vocabulary terms that actually occur in it."""
+    text = _transcript(text)
+    name = _NAME_RE.search(text)
+    looking = _LOOKING_RE.search(text)
+    roles = _find(_ROLE_RE, looking.group(1)) if looking else []
+    return {
+        "name": name.group(1) if name else "",
+        "skills": _find(_SKILL_RE, text),
+        "interests": _find(_INTEREST_RE, text),
+        "looking_for": roles[0] if roles else "",
+    }
+
+
+class _Completions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def create(self, model=None, messages=None, response_format=None, **kwargs):
+        return self._owner._complete(model, messages or [], response_format)
+
+
+class StubGroqClient:
+    """Drop-in replacement for `ai_core.client` with injectable latency and call counters."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, model_latency_ms=None, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.model_latency_ms = dict(model_latency_ms or {})
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = {}
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    def _delay(self, model):
+        base = self.model_latency_ms.get(model, self.latency_ms)
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+        if base + jitter > 0:
+            time.sleep((base + jitter) / 1000.0)
+
+    def _complete(self, model, messages, response_format):
+        with self._lock:
+            self.calls[model] = self.calls.get(model, 0) + 1
+        self._delay(model)
+
+        prompt = messages[-1]["content"] if messages else ""
+        if response_format and response_format.get("type") == "json_object":
+            content = json.dumps(stub_profile(prompt))
+        else:
+            # Chat: finish once the user has said enough, otherwise ask one follow-up
+            user_turns = [m for m in messages if m.get("role") == "user"]
+            if len(user_turns) >= 2 or len(prompt.split()) >= 12:
+                content = TRIGGER_PHRASE
+            else:
+                content = FOLLOW_UPS[_seed(prompt) % len(FOLLOW_UPS)]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def stats(self):
+        with self._lock:
+            return {"calls": dict(self.calls), "latency_ms": self.latency_ms, "jitter_ms": self.jitter_ms}
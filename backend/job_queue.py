@@ -0,0 +1,134 @@
+"""
+Bounded in-process job queue with a fixed pool of worker threads.
+
+Used by /slack/events so the handler can ack Slack immediately (Slack retries events not
+acked within ~3s) while extraction, matching and the thread reply run in the background.
+When the queue is full, submit() refuses the job instead of blocking the request thread.
+
+Config (env):
+  SLACK_WORKERS     worker threads for Slack events (default 2)
+  SLACK_QUEUE_SIZE  max queued events before new ones are rejected (default 100)
+"""
+
+import os
+import queue
+import threading
+import time
+import traceback
+
+SLACK_WORKERS = int(os.getenv("SLACK_WORKERS", "2"))
+SLACK_QUEUE_SIZE = int(os.getenv("SLACK_QUEUE_SIZE", "100"))
+
+
+class _Timing:
+    """Count / total / max of a duration series, in seconds."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 2),
+            "last_ms": round(self.last * 1000, 2)
+        }
+
+
+class JobQueue:
+    """Fixed worker pool draining a bounded FIFO; `handler(job)` is called once per job."""
+
+    def __init__(self, name, handler, workers=SLACK_WORKERS, maxsize=SLACK_QUEUE_SIZE):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.maxsize = maxsize
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_progress = 0
+        self.max_depth = 0
+        self.wait = _Timing()
+        self.processing = _Timing()
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"{self.name}-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, job):
+        """Queue a job; returns False (and counts a rejection) if the queue is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((time.perf_counter(), job))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def _run(self):
+        while True:
+            enqueued_at, job = self._queue.get()
+            started = time.perf_counter()
+            with self._lock:
+                self.wait.observe(started - enqueued_at)
+                self.in_progress += 1
+            ok = True
+            try:
+                self.handler(job)
+            except Exception as e:
+                ok = False
+                print(f"❌ {self.name} job failed: {e}")
+                traceback.print_exc()
+            finally:
+                with self._lock:
+                    self.in_progress -= 1
+                    self.processing.observe(time.perf_counter() - started)
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                self._queue.task_done()
+
+    def join(self):
+        """Block until every queued job has been processed (tests / shutdown)."""
+        self._queue.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "depth": self._queue.qsize(),
+                "max_depth": self.max_depth,
+                "capacity": self.maxsize,
+                "in_progress": self.in_progress,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "wait": self.wait.as_dict(),
+                "processing": self.processing.as_dict()
+            }
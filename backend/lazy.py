@@ -0,0 +1,58 @@
+"""
+Lazily-initialized singletons for expensive clients (embedding model, Chroma, Groq).
+
+A LazySingleton is a drop-in proxy: attribute access (`embedding_model.encode(...)`,
+`chroma_client.get_collection(...)`) builds the real object on first use, once, under a
+lock. Importing a module that declares them is therefore cheap, and readiness can be
+reported per component without forcing initialization.
+"""
+
+import threading
+import time
+
+
+class LazySingleton:
+    """Proxy that creates `factory()` on first use and forwards attribute access to it."""
+
+    def __init__(self, name, factory):
+        self._name = name
+        self._factory = factory
+        self._obj = None
+        self._lock = threading.RLock()
+        self.init_seconds = None
+        self.error = None
+
+    def get(self):
+        """The underlying object, creating it if needed."""
+        obj = self._obj
+        if obj is None:
+            with self._lock:
+                if self._obj is None:
+                    start = time.perf_counter()
+                    try:
+                        self._obj = self._factory()
+                    except Exception as e:
+                        self.error = f"{type(e).__name__}: {e}"
+                        raise
+                    self.init_seconds = time.perf_counter() - start
+                    self.error = None
+                    print(f"⚙️  Initialized {self._name} in {self.init_seconds:.2f}s")
+                obj = self._obj
+        return obj
+
+    @property
+    def ready(self):
+        return self._obj is not None
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "init_seconds": round(self.init_seconds, 3) if self.init_seconds is not None else None,
+            "error": self.error
+        }
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
+
+    def __repr__(self):
+        return f"<LazySingleton {self._name} ({'ready' if self.ready else 'not loaded'})>"
@@ -0,0 +1,342 @@
+"""
+Load generator: replays realistic /chat -> /find-collaborators conversations against the app.
+
+Sessions are built from the generate_profiles vocabularies (names, roles, skills,
+interests). Some users say everything in one message; the rest answer over a few turns
+until the backend triggers matching. Sessions arrive open-loop (Poisson) at each rate in
+--rates, so a slow backend shows up as queueing delay instead of quietly lowering the
+offered load.
+
+Transports:
+  testclient  Flask test client, in this process (no sockets; measures the app itself)
+  socket      the app served by a threaded werkzeug server on localhost, driven over HTTP
+  --url URL   an already running backend (its own Groq client and database are used)
+
+For the in-process transports, ai_core.client is the StubGroqClient (groq_stub.py) with
+injectable latency, and a synthetic corpus is seeded into a scratch Chroma directory.
+
+Reported per rate step:
+  - offered vs achieved sessions/sec
+  - queueing delay (scheduled arrival -> session actually started) p50/p95/p99
+  - per-endpoint requests, latency p50/p95/p99 and error rate
+The saturation throughput is the highest achieved rate of a step that kept up with its
+offered load (>= 95% achieved, < 1% errors). Achieved rate includes draining the last
+sessions, so keep --duration long compared to one conversation.
+
+Run with: python load_chat.py [--rates 1,2,4,8,16] [--duration 20] [--transport testclient|socket]
+                              [--url http://localhost:5001] [--groq-latency-ms 150] [--out load_chat.json]
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Importing the benchmark points Chroma / the team index at its scratch directory
+# before ai_core and app read their config
+import bench_pipeline
+from bench_pipeline import HashEmbedder, iter_corpus
+from generate_profiles import FIRST_NAMES, INTERESTS, ROLES
+from groq_stub import StubGroqClient
+
+RATES = [1, 2, 4, 8, 16]
+ENDPOINTS = ["/chat", "/find-collaborators"]
+EXTRACT_MODEL = "llama-3.3-70b-versatile"
+# A step "keeps up" if it achieved this share of the offered rate with fewer errors than this
+KEEP_UP_RATIO = 0.95
+MAX_ERROR_RATE = 0.01
+
+
+def build_session(rng, one_shot_ratio):
+    """List of user messages for one conversation."""
+    role = rng.choice(sorted(ROLES))
+    skills = rng.choice(ROLES[role]["skills"])
+    topics = [rng.choice(INTERESTS[cat]) for cat in rng.sample(sorted(INTERESTS), k=2)]
+    looking_for = rng.choice(sorted(r for r in ROLES if r != role))
+    name = rng.choice(FIRST_NAMES)
+    if rng.random() < one_shot_ratio:
+        return [f"I'm {name}, a {role.lower()} working with {', '.join(skills)}. "
+                f"Interested in {' and '.join(topics)}, looking for a {looking_for.lower()}."]
+    return [
+        f"Hi, I'm {name}",
+        f"I mostly work with {', '.join(skills[:3])}",
+        f"I'm into {' and '.join(topics)}",
+        f"Looking for a {looking_for.lower()}",
+    ]
+
+
+class Stats:
+    """Thread-safe per-endpoint latency/status samples plus session queueing delays."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.queue_delay = []
+        self.sessions_done = 0
+        self.sessions_failed = 0
+
+    def request(self, endpoint, seconds, status):
+        with self._lock:
+            self.latency[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+            if not (200 <= status < 300):
+                self.errors[endpoint] += 1
+
+    def session(self, queue_delay, ok):
+        with self._lock:
+            self.queue_delay.append(queue_delay)
+            self.sessions_done += 1
+            self.sessions_failed += not ok
+
+
+def _pct(values):
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    ms = np.array(values) * 1000.0
+    return {f"p{q}_ms": round(float(np.percentile(ms, q)), 3) for q in (50, 95, 99)}
+
+
+class TestClientTransport:
+    """Flask test client, one per thread."""
+
+    def __init__(self, app):
+        self._app = app
+        self._local = threading.local()
+
+    def post(self, path, payload):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self._app.test_client()
+        resp = client.post(path, json=payload)
+        return resp.status_code, resp.get_json(silent=True) or {}
+
+    def close(self):
+        pass
+
+
+class HttpTransport:
+    """Pooled keep-alive HTTP client against a base URL."""
+
+    def __init__(self, base_url, max_connections):
+        import httpx
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.Client(
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    def post(self, path, payload):
+        resp = self._client.post(f"{self.base_url}{path}", json=payload)
+        try:
+            body = resp.json()
+        except ValueError:
+            body = {}
+        return resp.status_code, body
+
+    def close(self):
+        self._client.close()
+
+
+def serve_locally(app):
+    """Serve `app` on a free localhost port with a threaded werkzeug server; returns (server, url)."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name="load-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def run_session(transport, stats, session_id, messages, scheduled, think_s):
+    """Drive one conversation; returns when matching finished or a request failed."""
+    ok = True
+    started = time.perf_counter()
+    transcript = []
+    try:
+        for i, message in enumerate(messages):
+            if i and think_s:
+                time.sleep(think_s)
+            t = time.perf_counter()
+            status, body = transport.post("/chat", {"message": message, "session_id": session_id})
+            stats.request("/chat", time.perf_counter() - t, status)
+            if status != 200:
+                ok = False
+                return
+            transcript.append(f"User: {message}")
+            transcript.append(f"Assistant: {body.get('response', '')}")
+            if body.get("is_trigger"):
+                break
+
+        t = time.perf_counter()
+        status, body = transport.post("/find-collaborators", {
+            "chat_transcript": "\n".join(transcript),
+            "session_id": session_id,
+        })
+        stats.request("/find-collaborators", time.perf_counter() - t, status)
+        ok = status == 200 and bool(body.get("matches"))
+    except Exception as e:
+        stats.request("transport", 0.0, 599)
+        print(f"⚠️  Session {session_id} failed: {e}", file=sys.stderr)
+        ok = False
+    finally:
+        stats.session(started - scheduled, ok)
+
+
+def run_step(transport, rate, duration, max_sessions, one_shot_ratio, think_s, seed):
+    """Offer `rate` sessions/sec for `duration` seconds, then wait for the backlog to drain."""
+    rng = random.Random(seed)
+    stats = Stats()
+    offered = 0
+    start = time.perf_counter()
+    next_arrival = start
+    with ThreadPoolExecutor(max_workers=max_sessions, thread_name_prefix="load") as pool:
+        while True:
+            next_arrival += rng.expovariate(rate)
+            if next_arrival - start > duration:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            messages = build_session(rng, one_shot_ratio)
+            pool.submit(run_session, transport, stats, f"load_{seed}_{offered}", messages, next_arrival, think_s)
+            offered += 1
+    elapsed = time.perf_counter() - start
+
+    endpoints = {}
+    for endpoint in ENDPOINTS + (["transport"] if stats.latency.get("transport") else []):
+        samples = stats.latency.get(endpoint, [])
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "error_rate": round(stats.errors[endpoint] / len(samples), 4) if samples else 0.0,
+            "statuses": dict(stats.statuses[endpoint]),
+            **_pct(samples),
+        }
+    achieved = stats.sessions_done / elapsed if elapsed > 0 else 0.0
+    failed_rate = stats.sessions_failed / stats.sessions_done if stats.sessions_done else 0.0
+    return {
+        "offered_rate": rate,
+        "sessions": offered,
+        "elapsed_seconds": round(elapsed, 3),
+        "achieved_rate": round(achieved, 2),
+        "session_error_rate": round(failed_rate, 4),
+        "queue_delay": _pct(stats.queue_delay),
+        "endpoints": endpoints,
+        "kept_up": offered > 0 and achieved >= KEEP_UP_RATIO * offered / duration and failed_rate < MAX_ERROR_RATE,
+    }
+
+
+def print_step(step):
+    q = step["queue_delay"]
+    print(f"\n🚦 offered {step['offered_rate']}/s -> achieved {step['achieved_rate']}/s "
+          f"({step['sessions']} sessions, {step['session_error_rate']:.1%} failed) "
+          f"{'✅' if step['kept_up'] else '❌ saturated'}")
+    print(f"   queue delay p50/p95/p99: {q['p50_ms']} / {q['p95_ms']} / {q['p99_ms']} ms")
+    for endpoint, s in step["endpoints"].items():
+        print(f"   {endpoint:<20} {s['requests']:>6} req  p50 {s['p50_ms']} ms  p95 {s['p95_ms']} ms  "
+              f"p99 {s['p99_ms']} ms  errors {s['error_rate']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay chat sessions against the Synergy backend")
+    parser.add_argument("--rates", default=",".join(str(r) for r in RATES), help="comma-separated sessions/sec steps")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of arrivals per step")
+    parser.add_argument("--max-sessions", type=int, default=64, help="concurrent sessions (client threads)")
+    parser.add_argument("--one-shot-ratio", type=float, default=0.3, help="share of users who say everything at once")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="pause between a user's chat turns")
+    parser.add_argument("--transport", choices=["testclient", "socket"], default="testclient")
+    parser.add_argument("--url", default=None, help="drive an already running backend instead")
+    parser.add_argument("--corpus", type=int, default=1000, help="synthetic profiles seeded for in-process runs")
+    parser.add_argument("--stub-embeddings", action="store_true", help="hashing embedder instead of the model")
+    parser.add_argument("--groq-latency-ms", type=float, default=0.0, help="latency of every stubbed Groq call")
+    parser.add_argument("--groq-jitter-ms", type=float, default=0.0, help="uniform extra latency per call")
+    parser.add_argument("--extract-latency-ms", type=float, default=None, help="override for extraction calls")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="load_chat.json", help="where to write the JSON report")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's request logging")
+    args = parser.parse_args()
+
+    server = backend = None
+    if not args.verbose:
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+    try:
+        if args.url:
+            transport = HttpTransport(args.url, args.max_sessions)
+            target = args.url
+        else:
+            import ai_core
+            import seed_db
+            import app as backend
+
+            model_latency = {EXTRACT_MODEL: args.extract_latency_ms} if args.extract_latency_ms is not None else None
+            ai_core.client = StubGroqClient(args.groq_latency_ms, args.groq_jitter_ms, model_latency, seed=args.seed)
+            if args.stub_embeddings:
+                ai_core.embedding_model = seed_db.embedding_model = HashEmbedder()
+            if not args.verbose:
+                logging.getLogger(backend.__name__).setLevel(logging.WARNING)
+            print(f"🌱 Seeding {args.corpus} synthetic profiles...")
+            if seed_db.seed_database(profiles=iter_corpus(args.corpus)) is None:
+                raise SystemExit("❌ Seeding failed")
+            if args.transport == "socket":
+                server, target = serve_locally(backend.app)
+                transport = HttpTransport(target, args.max_sessions)
+            else:
+                transport, target = TestClientTransport(backend.app), "testclient"
+
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "target": target,
+                "duration": args.duration,
+                "max_sessions": args.max_sessions,
+                "one_shot_ratio": args.one_shot_ratio,
+                "think_ms": args.think_ms,
+                "groq_latency_ms": None if args.url else args.groq_latency_ms,
+                "groq_jitter_ms": None if args.url else args.groq_jitter_ms,
+                "extract_latency_ms": None if args.url else args.extract_latency_ms,
+                "stub_embeddings": args.stub_embeddings,
+            },
+            "steps": [],
+        }
+        # ai_core prints per-query notes; keep the report readable unless asked
+        devnull = open(os.devnull, "w")
+        for i, rate in enumerate(float(r) for r in args.rates.split(",") if r.strip()):
+            with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull):
+                step = run_step(transport, rate, args.duration, args.max_sessions,
+                                args.one_shot_ratio, args.think_ms / 1000.0, args.seed + i)
+            report["steps"].append(step)
+            print_step(step)
+        transport.close()
+        devnull.close()
+    finally:
+        if server is not None:
+            server.shutdown()
+        if backend is not None:
+            # Let background profile saves finish before the scratch database goes away
+            with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(sys.stdout if args.verbose else quiet):
+                backend.save_executor.shutdown(wait=True)
+        bench_pipeline.cleanup()
+
+    kept_up = [s["achieved_rate"] for s in report["steps"] if s["kept_up"]]
+    report["saturation_sessions_per_sec"] = max(kept_up) if kept_up else None
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📈 Saturation throughput: {report['saturation_sessions_per_sec']} sessions/sec")
+    print(f"💾 Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
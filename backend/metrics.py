@@ -0,0 +1,222 @@
+"""
+In-process latency histograms and counters, rendered in the Prometheus text format.
+
+Stages are timed with the monotonic perf_counter:
+
+    with metrics.stage("llm_extract"):
+        response = client.chat.completions.create(...)
+
+METRICS_SAMPLE_RATE controls how many stage timings are recorded (1.0 = all, 0.1 = one in
+ten, 0 = off). When a timing isn't sampled, `stage()` hands back a shared no-op context
+manager, so the instrumented code pays one function call and a comparison. Counters
+(e.g. fallbacks taken) are always recorded; they are a single locked increment.
+
+Served by GET /metrics in app.py.
+"""
+
+import functools
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+
+METRICS_SAMPLE_RATE = float(os.getenv("METRICS_SAMPLE_RATE", "1.0"))
+
+# Seconds; spans in-memory re-ranks (~0.1ms) up to slow LLM calls (~10s)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label-value tuple."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # {label values: [bucket counts..., +Inf count, sum]}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *labelvalues):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += seconds
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labelvalues, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter, one series per label-value tuple."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        with self._lock:
+            return self._values.get(labelvalues, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+
+class Registry:
+    """Named metrics rendered together for /metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class _StageTimer:
+    __slots__ = ("_stage", "_start")
+
+    def __init__(self, stage):
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stage_seconds.observe(time.perf_counter() - self._start, self._stage)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+registry = Registry()
+stage_seconds = registry.histogram(
+    "synergy_stage_duration_seconds",
+    "Time spent in each pipeline stage (llm_chat, llm_extract, embed_encode, vector_query, rerank, team_build, chroma_write).",
+    ("stage",))
+fallbacks = registry.counter(
+    "synergy_find_fallbacks_total",
+    "Fallback paths taken by find_collaborators.",
+    ("kind",))
+# Exported at 0 from the start so rate() works before the first fallback
+FALLBACK_KINDS = ("availability_only_tier", "unfiltered_tier", "query_error", "raw_candidates",
+                  "available_scan", "heuristic_scan", "emergency")
+for _kind in FALLBACK_KINDS:
+    fallbacks.inc(_kind, amount=0)
+result_cache = registry.counter(
+    "synergy_result_cache_requests_total",
+    "Search result cache lookups by function and outcome (hit / miss).",
+    ("cache", "result"))
+for _cache in ("search_by_skills", "find_collaborators"):
+    for _result in ("hit", "miss"):
+        result_cache.inc(_cache, _result, amount=0)
+http_request_seconds = registry.histogram(
+    "synergy_http_request_duration_seconds",
+    "HTTP request latency by route and status.",
+    ("method", "route", "status"))
+
+
+def stage(name):
+    """Context manager timing `name` into stage_seconds (a no-op when not sampled)."""
+    rate = METRICS_SAMPLE_RATE
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return _NOOP
+    return _StageTimer(name)
+
+
+def timed(name):
+    """Decorator form of stage() for timing a whole function."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_sample_rate(rate):
+    global METRICS_SAMPLE_RATE
+    METRICS_SAMPLE_RATE = max(0.0, min(1.0, float(rate)))
+
+
+def render():
+    return registry.render()
@@ -0,0 +1,166 @@
+"""
+Opt-in per-request sampling profiler that writes flamegraph-ready collapsed stacks.
+
+A request is profiled only when it carries the shared token, either as an
+`X-Profile-Token` header or a `?profile=<token>` query flag, and PROFILE_TOKEN is set
+(profiling is off without it). While the request runs, a sampler thread snapshots the
+request thread's stack (plus background threads whose name starts with one of
+PROFILE_THREAD_PREFIXES, e.g. the profile-save workers) every PROFILE_INTERVAL_MS. The
+samples are written as collapsed stacks, one `frame;frame;frame count` line per unique
+stack, ready for flamegraph.pl or speedscope.
+
+Safe to leave enabled:
+  - at most PROFILE_MAX_PER_MINUTE captures per minute (others run unprofiled)
+  - PROFILE_DIR keeps only the newest PROFILE_MAX_FILES captures
+
+Config (env):
+  PROFILE_TOKEN            shared secret; unset = profiling disabled
+  PROFILE_DIR              where captures go (default ./profiles)
+  PROFILE_MAX_FILES        captures kept before the oldest are deleted (default 200)
+  PROFILE_MAX_PER_MINUTE   capture cap (default 6)
+  PROFILE_INTERVAL_MS      sampling interval (default 1)
+  PROFILE_THREAD_PREFIXES  comma-separated thread-name prefixes also sampled (default profile-save)
+"""
+
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+PROFILE_MAX_PER_MINUTE = int(os.getenv("PROFILE_MAX_PER_MINUTE", "6"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+PROFILE_THREAD_PREFIXES = tuple(p.strip() for p in os.getenv("PROFILE_THREAD_PREFIXES", "profile-save").split(",") if p.strip())
+
+
+# Leaf frames of a background worker that is just waiting for work
+_IDLE_LEAVES = {("thread.py", "_worker"), ("threading.py", "wait"), ("queue.py", "get")}
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of a set of threads on a background thread until stopped."""
+
+    def __init__(self, thread_id, interval_ms=PROFILE_INTERVAL_MS, thread_prefixes=PROFILE_THREAD_PREFIXES):
+        self.thread_id = thread_id
+        self.interval = max(0.0001, interval_ms / 1000.0)
+        self.thread_prefixes = thread_prefixes
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.started = None
+        self.elapsed = None
+
+    def _targets(self):
+        targets = {self.thread_id: None}
+        if self.thread_prefixes:
+            for t in threading.enumerate():
+                if t.ident != self.thread_id and t.name.startswith(self.thread_prefixes):
+                    targets[t.ident] = t.name
+        return targets
+
+    def _sample(self):
+        frames = sys._current_frames()
+        for tid, name in self._targets().items():
+            frame = frames.get(tid)
+            if frame is None:
+                continue
+            if name and (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_LEAVES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if name:
+                stack.append(f"[{name}]")
+            stack.reverse()
+            self.stacks[";".join(stack)] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def collapsed(self):
+        """Collapsed-stack text (flamegraph.pl / speedscope input)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class CaptureLimiter:
+    """Allows at most `max_per_minute` captures in any sliding 60s window."""
+
+    def __init__(self, max_per_minute=PROFILE_MAX_PER_MINUTE):
+        self.max_per_minute = max_per_minute
+        self._times = deque()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def try_acquire(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._times and now - self._times[0] >= 60:
+                self._times.popleft()
+            if len(self._times) >= self.max_per_minute:
+                self.rejected += 1
+                return False
+            self._times.append(now)
+            self.allowed += 1
+            return True
+
+
+def token_matches(supplied, token=None):
+    """Constant-time check of a supplied token against PROFILE_TOKEN (never matches when unset)."""
+    token = PROFILE_TOKEN if token is None else token
+    if not token or not supplied:
+        return False
+    # compare_digest only takes ASCII str, so compare bytes: a non-ASCII ?profile= is just a mismatch
+    return hmac.compare_digest(str(supplied).encode("utf-8", "surrogatepass"), token.encode("utf-8", "surrogatepass"))
+
+
+def save_capture(profiler, label, directory=PROFILE_DIR, max_files=PROFILE_MAX_FILES):
+    """Write one capture, then delete the oldest files beyond `max_files`. Returns the filename."""
+    os.makedirs(directory, exist_ok=True)
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in label).strip("_") or "request"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}_{int(time.time() * 1000) % 1000:03d}_{safe}_{profiler.elapsed * 1000:.0f}ms.collapsed"
+    path = os.path.join(directory, name)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(profiler.collapsed())
+    os.replace(tmp, path)
+
+    captures = sorted(
+        (e for e in os.scandir(directory) if e.name.endswith(".collapsed")),
+        key=lambda e: e.stat().st_mtime
+    )
+    for old in captures[:max(0, len(captures) - max_files)]:
+        try:
+            os.remove(old.path)
+        except OSError:
+            pass
+    return name
+
+
+# Process-wide capture cap shared by every request
+capture_limiter = CaptureLimiter()
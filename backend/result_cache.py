@@ -0,0 +1,178 @@
+"""
+In-process LRU cache of search results (search_by_skills, find_collaborators).
+
+Entries are keyed by the normalized query, so "Python, React" and "react, python" share
+one entry: skills and interests are lowercased, whitespace-collapsed, de-duplicated and
+sorted; roles are the canonical labels find_collaborators already filters on. Every key
+also carries the cache's version, which ai_core bumps on each write that can change a
+result (save_user_profile(s), create_team, dissolve_team, seed_db reseeding). Writes by
+other processes are picked up from the shared corpus version (corpus_version.py) when
+the next key is built. A bump drops all entries, and a result computed while a write
+landed is not stored, so a hit is never older than the last write.
+
+One exception: saving a single profile (saved()) keeps the find_collaborators entries of
+searchers with the same name, because ranking skips candidates named like the searcher.
+Every app caller saves the searcher's own profile around its search, so without this a
+repeated query would always find its entry dropped by its own previous save.
+
+Config (env):
+  RESULT_CACHE_MAX_ENTRIES  entries kept before the least recently used is evicted
+                            (default 1024, 0 disables the cache)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import metrics
+from corpus_version import corpus_version
+
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024"))
+
+
+def normalize_terms(values):
+    """Order- and case-insensitive form of a list of skills / interests / roles."""
+    if isinstance(values, str):
+        values = [values]
+    terms = {' '.join(str(v).lower().split()) for v in values or []}
+    terms.discard('')
+    return tuple(sorted(terms))
+
+
+def _copy(value):
+    # Callers may annotate the metadata dicts they get back; never hand out the cached ones
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+def _owner(name):
+    return (name or '').strip().lower()
+
+
+class ResultCache:
+    """Thread-safe, size-bounded LRU of {(version, kind, owner, normalized query): result}."""
+
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES):
+        self.max_entries = max(0, int(max_entries))
+        self.version = 0
+        # Name whose entries survived the latest saves, and how many saves that was
+        self._spared = ('', 0)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.watch = corpus_version.watch()
+        self.watch.synced(corpus_version.current())
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def _version_for(self, owner):
+        # Saves by `owner` itself didn't invalidate its entries; call with the lock held
+        name, saves = self._spared
+        return self.version - saves if owner and owner == name else self.version
+
+    def _current_version(self, owner=None):
+        # Another process wrote since we last looked: everything cached may be stale
+        stale, shared = self.watch.stale()
+        if stale:
+            self.bump()
+            self.watch.synced(shared)
+        with self._lock:
+            return self._version_for(owner)
+
+    def skills_key(self, skills):
+        return (self._current_version(), "search_by_skills", None, normalize_terms(skills))
+
+    def collaborators_key(self, profile, roles_needed, looking_for):
+        """Key for find_collaborators; `roles_needed` / `looking_for` are already canonicalized."""
+        # Ranking skips the user's own profile by name, so the name is part of the query
+        owner = _owner(profile.get('name'))
+        return (self._current_version(owner), "find_collaborators", owner, (
+            normalize_terms(roles_needed),
+            (looking_for or '').strip().lower(),
+            normalize_terms(profile.get('skills', [])),
+            normalize_terms(profile.get('interests', [])),
+        ))
+
+    def get(self, key):
+        """Cached result for `key` (a copy), or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        metrics.result_cache.inc(key[1], "miss" if value is None else "hit")
+        return None if value is None else _copy(value)
+
+    def put(self, key, value):
+        """Store `value` under `key` unless the corpus changed since the key was made; returns `value`."""
+        if not self.enabled:
+            return value
+        with self._lock:
+            if key[0] != self._version_for(key[2]):
+                return value
+            self._entries[key] = _copy(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def bump(self):
+        """Mark the corpus as changed: every cached result is dropped."""
+        with self._lock:
+            self.version += 1
+            self._spared = ('', 0)
+            self._entries.clear()
+            self.invalidations += 1
+
+    def saved(self, name):
+        """
+        One profile named `name` was added: drop every entry except the find_collaborators
+        results of searchers with that name, which ranking already kept it out of.
+        """
+        owner = _owner(name)
+        if not owner:
+            return self.bump()
+        with self._lock:
+            self.version += 1
+            spared_name, saves = self._spared
+            self._spared = (owner, saves + 1 if spared_name == owner else 1)
+            for key in [k for k in self._entries if k[2] != owner]:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+# Process-wide cache shared by every request
+result_cache = ResultCache()
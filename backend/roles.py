@@ -0,0 +1,147 @@
+"""
+Role canonicalization shared by every ai_core call site.
+
+A RoleMatcher compiles an ordered list of (role, keywords) rules into one trie-shaped
+regex and memoizes results per input string, replacing the nested `any(k in s ...)`
+cascades. Semantics are unchanged: a direct lookup wins, otherwise the highest-priority
+rule with any keyword occurring as a substring wins.
+"""
+
+import re
+from functools import lru_cache
+
+
+def _trie_regex(words):
+    """Regex matching any of `words`, factored by common prefix and preferring the longest."""
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node):
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ''
+        body = alts[0] if len(alts) == 1 else '(?:' + '|'.join(alts) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return emit(trie)
+
+
+class RoleMatcher:
+    """First-matching-rule keyword classifier compiled into a single regex, with an LRU."""
+
+    def __init__(self, rules, direct=None, cache_size=4096):
+        self.rules = [(role, list(keywords)) for role, keywords in rules]
+        self.direct = dict(direct or {})
+        # Keyword -> index of the first (highest-priority) rule that lists it
+        first_rule = {}
+        for idx, (_, keywords) in enumerate(self.rules):
+            for kw in keywords:
+                first_rule.setdefault(kw, idx)
+        # Every keyword matching at one position is a prefix of the longest one matching
+        # there, so fold each keyword's prefixes into its rule index up front
+        self._rule_of = {
+            kw: min(idx for other, idx in first_rule.items() if kw.startswith(other))
+            for kw in first_rule
+        }
+        # Zero-width lookahead so matches starting at every position are seen
+        self._pattern = re.compile('(?=(' + _trie_regex(first_rule) + '))') if first_rule else None
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, text):
+        """Role for an already-lowercased string, or None if nothing matches."""
+        if text in self.direct:
+            return self.direct[text]
+        if self._pattern is None:
+            return None
+        hits = self._pattern.findall(text)
+        if not hits:
+            return None
+        return self.rules[min(map(self._rule_of.__getitem__, hits))][0]
+
+
+# Free-text role labels ("looking_for", roles_needed, stored roles) -> DB roles
+ROLE_LABELS = RoleMatcher(
+    direct={
+        'software engineer': 'Software Engineer',
+        'engineer': 'Software Engineer',
+        'developer': 'Software Engineer',
+        'swe': 'Software Engineer',
+        'coder': 'Software Engineer',
+        'frontend': 'Software Engineer',
+        'backend': 'Software Engineer',
+        'fullstack': 'Software Engineer',
+        'full-stack': 'Software Engineer',
+        'ux': 'Designer',
+        'ui': 'Designer',
+        'ui/ux': 'Designer',
+        'designer': 'Designer',
+        'product manager': 'Product Manager',
+        'pm': 'Product Manager',
+        'product': 'Product Manager',
+        'data scientist': 'Data Scientist',
+        'ml engineer': 'Data Scientist',
+        'ai engineer': 'Data Scientist',
+        'finance expert': 'Finance & Operations',
+        'marketing': 'Marketing & Growth',
+        'growth': 'Marketing & Growth',
+        'sales': 'Sales & Business Development',
+        'business development': 'Sales & Business Development',
+        'biz dev': 'Sales & Business Development',
+        'finance': 'Finance & Operations',
+        'operations': 'Finance & Operations',
+        'ops': 'Finance & Operations',
+    },
+    rules=[
+        ('Software Engineer', ['engineer', 'developer', 'dev', 'coder']),
+        ('Designer', ['design', 'figma', 'ux', 'ui']),
+        ('Product Manager', ['product']),
+        ('Data Scientist', ['data', 'ml', 'machine learning', 'ai']),
+        ('Marketing & Growth', ['marketing', 'growth']),
+        ('Sales & Business Development', ['sales', 'business', 'partnership']),
+        ('Finance & Operations', ['finance', 'operation', 'ops']),
+    ]
+)
+
+# A searching user's own role, inferred from their skills (used for complementarity)
+SKILL_ROLES = RoleMatcher(rules=[
+    ('Software Engineer', ['python', 'javascript', 'react', 'node', 'c++', 'java', 'backend', 'frontend', 'fullstack', 'devops']),
+    ('Designer', ['design', 'figma', 'ui', 'ux', 'sketch', 'adobe']),
+    ('Product Manager', ['product', 'roadmap', 'pm', 'strategy', 'analytics']),
+    ('Data Scientist', ['data', 'ml', 'machine learning', 'analytics', 'sql', 'pytorch', 'tensorflow']),
+])
+
+# The role a saved profile is stored under (what they ARE), inferred from their skills
+PROFILE_ROLES = RoleMatcher(rules=[
+    ('Software Engineer', ['python', 'javascript', 'react', 'node', 'c++', 'java', 'code', 'dev', 'backend', 'frontend']),
+    ('Designer', ['design', 'figma', 'ui', 'ux', 'sketch', 'adobe']),
+    ('Product Manager', ['product', 'roadmap', 'pm', 'strategy', 'analytics']),
+    ('Data Scientist', ['data', 'ml', 'machine learning', 'analytics', 'sql']),
+    ('Marketing & Growth', ['marketing', 'growth', 'seo', 'content']),
+    ('Sales & Business Development', ['sales', 'business', 'partnerships']),
+    ('Finance & Operations', ['finance', 'accounting', 'fundraising']),
+])
+
+
+def canon_role(raw: str) -> str:
+    """Canonicalize role labels to match our DB roles (unknown labels pass through stripped)."""
+    if not raw:
+        return ''
+    return ROLE_LABELS.match(str(raw).strip().lower()) or str(raw).strip()
+
+
+def _skills_text(skills):
+    return ' '.join([s.lower() for s in skills or []])
+
+
+def infer_role_from_skills(skills):
+    """The user's own role for complementarity: one of the four core roles, or 'Other'."""
+    return SKILL_ROLES.match(_skills_text(skills)) or 'Other'
+
+
+def infer_profile_role(skills):
+    """The role a new profile is saved under, or 'Other'."""
+    return PROFILE_ROLES.match(_skills_text(skills)) or 'Other'
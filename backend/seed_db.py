@@ -1,16 +1,45 @@
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 import json
+import os
+import time
+import argparse
+from itertools import islice
+from embedding_cache import open_cache
+from feature_store import feature_store
+from team_index import team_index
+from result_cache import result_cache
+from corpus_version import corpus_version
+from lazy import LazySingleton
 
-# Initialize embedding model
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+# Seeding knobs (can also be passed on the command line)
+SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", "64"))
+SEED_CHUNK_SIZE = int(os.getenv("SEED_CHUNK_SIZE", "1000"))
+SEED_WORKERS = int(os.getenv("SEED_WORKERS", "0"))
 
-# Initialize ChromaDB client (disable telemetry to avoid noisy PostHog errors)
-chroma_client = chromadb.PersistentClient(
-    path="./chroma_db",
-    settings=Settings(anonymized_telemetry=False)
-)
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+CHROMA_PATH = os.getenv("CHROMA_PATH", "./chroma_db")
+
+
+def _load_embedding_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+
+def _open_chroma():
+    import chromadb
+    from chromadb.config import Settings
+    # Disable telemetry to avoid noisy PostHog errors
+    return chromadb.PersistentClient(
+        path=CHROMA_PATH,
+        settings=Settings(anonymized_telemetry=False)
+    )
+
+
+# Model and Chroma are loaded on first use, so importing the seed data stays cheap
+embedding_model = LazySingleton("embedding_model", _load_embedding_model)
+chroma_client = LazySingleton("chroma_client", _open_chroma)
+
+# Persistent embedding cache shared with ai_core (None if disabled)
+embedding_cache = open_cache(EMBEDDING_MODEL_NAME)
 
 # Fake collaborators data
 collaborators = [
@@ -1056,11 +1085,79 @@ collaborators.extend([
 
 def create_embedding(text):
     """Create embedding for text."""
-    return embedding_model.encode(text).tolist()
+    return create_embeddings([text])[0]
+
+
+def create_embeddings(texts, batch_size=SEED_BATCH_SIZE, pool=None):
+    """
+    Create embeddings for a list of texts in as few encode calls as possible.
+    Cached texts are skipped; when a multi-process pool is given, the remaining
+    batches are spread across its workers.
+    """
+    if not texts:
+        return []
+
+    def _encode(batch):
+        if pool is not None:
+            vectors = embedding_model.encode_multi_process(batch, pool, batch_size=batch_size)
+        else:
+            vectors = embedding_model.encode(batch, batch_size=batch_size, show_progress_bar=False)
+        return vectors.tolist()
+
+    if embedding_cache is None:
+        return _encode(texts)
+    return embedding_cache.encode(texts, _encode)
+
+
+def _searchable_text(collab):
+    """Text that gets embedded for a seeded profile."""
+    return f"{collab['role']} {' '.join(collab['skills'])} {' '.join(collab['interests'])} {collab['bio']}"
+
+
+def _seed_metadata(collab):
+    """Chroma metadata for a seeded profile."""
+    return {
+        "id": collab["id"],
+        "name": collab["name"],
+        "role": collab["role"],
+        "skills": ", ".join(collab.get("skills", [])),
+        "interests": ", ".join(collab.get("interests", [])),
+        "bio": collab["bio"],
+        "availability": "Available",  # All mock users start as available
+        "team_id": "None"  # Not in any team initially
+    }
+
 
+def _iter_chunks(items, size):
+    """Yield lists of at most `size` items without materializing the whole input."""
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
 
-def seed_database():
-    """Seed ChromaDB with fake collaborators."""
+
+def seed_database(profiles=None, batch_size=SEED_BATCH_SIZE, chunk_size=SEED_CHUNK_SIZE, workers=SEED_WORKERS):
+    """
+    Seed ChromaDB with fake collaborators.
+
+    Profiles are embedded in batches and written to Chroma one chunk at a time,
+    so memory stays bounded by `chunk_size` even for very large (or generated) inputs.
+
+    Args:
+        profiles: Iterable of profile dicts (defaults to the built-in `collaborators` list)
+        batch_size: Number of texts per SentenceTransformer.encode batch
+        chunk_size: Number of profiles embedded and added to Chroma per round
+        workers: Size of the multi-process encode pool (0 = encode in this process)
+
+    Returns:
+        Dict with the seeded count, elapsed seconds and throughput, or None on failure
+    """
+    if profiles is None:
+        profiles = collaborators
+
+    pool = None
     try:
         # Delete existing collection if it exists
         try:
@@ -1068,58 +1165,68 @@ def seed_database():
         except:
             pass
         
+        feature_store.clear()
+        team_index.clear()
+        corpus_version.bump()
+        result_cache.bump()
+
         # Create new collection
         collection = chroma_client.create_collection(
             name="collaborators",
             metadata={"description": "Collaborator profiles"}
         )
-        
-        # Prepare data for insertion
-        ids = []
-        embeddings = []
-        metadatas = []
-        documents = []
-        
-        for collab in collaborators:
-            # Create searchable text from profile
-            searchable_text = f"{collab['role']} {' '.join(collab['skills'])} {' '.join(collab['interests'])} {collab['bio']}"
-            
-            # Create embedding
-            embedding = create_embedding(searchable_text)
-            
-            # Prepare data
-            ids.append(collab['id'])
-            embeddings.append(embedding)
-            metadatas.append({
-                "id": collab["id"],
-                "name": collab["name"],
-                "role": collab["role"],
-                "skills": ", ".join(collab.get("skills", [])),
-                "interests": ", ".join(collab.get("interests", [])),
-                "bio": collab["bio"],
-                "availability": "Available",  # All mock users start as available
-                "team_id": "None"  # Not in any team initially
-            })
-            documents.append(searchable_text)
-        
-        # Add to collection
-        collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            metadatas=metadatas,
-            documents=documents
-        )
-        
-        print(f"✅ Successfully seeded {len(collaborators)} collaborators to ChromaDB")
+
+        if workers and workers > 0:
+            pool = embedding_model.start_multi_process_pool(target_devices=["cpu"] * workers)
+            print(f"🧵 Started encode pool with {workers} workers")
+
+        seeded = 0
+        start = time.perf_counter()
+        for chunk in _iter_chunks(profiles, max(1, chunk_size)):
+            documents = [_searchable_text(collab) for collab in chunk]
+            embeddings = create_embeddings(documents, batch_size=batch_size, pool=pool)
+            metadatas = [_seed_metadata(collab) for collab in chunk]
+
+            collection.add(
+                ids=[collab['id'] for collab in chunk],
+                embeddings=embeddings,
+                metadatas=metadatas,
+                documents=documents
+            )
+            seeded += len(chunk)
+        # Searches that ran mid-seed saw a partial corpus
+        corpus_version.bump()
+        result_cache.bump()
+        elapsed = time.perf_counter() - start
+        rate = seeded / elapsed if elapsed > 0 else 0.0
+
+        print(f"✅ Successfully seeded {seeded} collaborators to ChromaDB")
+        print(f"⚡ Embedded and stored {seeded} profiles in {elapsed:.2f}s ({rate:.1f} profiles/sec)")
+        if embedding_cache is not None:
+            cache_stats = embedding_cache.stats()
+            print(f"🗄️  Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                  f"({cache_stats['entries']} entries on disk)")
         
         # Verify
         count = collection.count()
         print(f"📊 Collection now contains {count} items")
+
+        return {"count": seeded, "seconds": elapsed, "profiles_per_sec": rate}
         
     except Exception as e:
         print(f"❌ Error seeding database: {e}")
+        return None
+    finally:
+        if pool is not None:
+            embedding_model.stop_multi_process_pool(pool)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed ChromaDB with collaborator profiles")
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE, help="texts per encode batch")
+    parser.add_argument("--chunk-size", type=int, default=SEED_CHUNK_SIZE, help="profiles per collection.add")
+    parser.add_argument("--workers", type=int, default=SEED_WORKERS, help="multi-process encode workers (0 = off)")
+    args = parser.parse_args()
+
     print("🌱 Seeding database...")
-    seed_database()
\ No newline at end of file
+    seed_database(batch_size=args.batch_size, chunk_size=args.chunk_size, workers=args.workers)
@@ -0,0 +1,225 @@
+"""
+Chat session storage for /chat.
+
+A session is a JSON-serializable dict: {"history": [{"role", "content"}, ...], "slots": {...}}.
+Stores evict sessions idle for longer than a TTL and the least-recently-used ones beyond
+a size limit, and cap each session's history so long conversations can't grow without
+bound (the slot tracker keeps what was extracted from trimmed turns).
+
+Two backends:
+  MemorySessionStore  in-process OrderedDict (default, single worker)
+  SqliteSessionStore  a SQLite file shared by every worker process on the host
+
+Config (env):
+  SESSION_STORE               "memory" (default) or "sqlite"
+  SESSION_DB_PATH             SQLite file for the sqlite backend (default ./sessions.sqlite3)
+  SESSION_MAX                 max live sessions before LRU eviction (default 10000)
+  SESSION_TTL_SECONDS         idle time before a session expires (default 3600)
+  SESSION_MAX_MESSAGES        history messages kept per session (default 40)
+  SESSION_MAX_CHARS           history characters kept per session, ~4 chars/token (default 16000)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").strip().lower()
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "./sessions.sqlite3")
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", "40"))
+SESSION_MAX_CHARS = int(os.getenv("SESSION_MAX_CHARS", "16000"))
+
+
+def new_session():
+    return {"history": [], "slots": {}}
+
+
+def trim_history(history, max_messages=SESSION_MAX_MESSAGES, max_chars=SESSION_MAX_CHARS):
+    """Drop the oldest messages until the history fits both caps; returns how many were dropped."""
+    dropped = 0
+    total = sum(len(m.get("content", "")) for m in history)
+    while history and (len(history) > max_messages or total > max_chars):
+        total -= len(history.pop(0).get("content", ""))
+        dropped += 1
+    return dropped
+
+
+class MemorySessionStore:
+    """In-process LRU + TTL session store with approximate memory accounting."""
+
+    backend = "memory"
+
+    def __init__(self, max_sessions=SESSION_MAX, ttl_seconds=SESSION_TTL_SECONDS,
+                 max_messages=SESSION_MAX_MESSAGES, max_chars=SESSION_MAX_CHARS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.max_chars = max_chars
+        self._sessions = OrderedDict()  # {session_id: (last_used, size_bytes, session)}, oldest first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+        self.trimmed_messages = 0
+
+    def _expire_locked(self, now):
+        # Entries are kept in last-used order, so expired ones are all at the front
+        while self._sessions:
+            session_id, (last_used, size, _) = next(iter(self._sessions.items()))
+            if now - last_used <= self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+            self._bytes -= size
+            self.expired += 1
+
+    def get(self, session_id):
+        """The session (refreshing its TTL), or None if unknown or expired."""
+        now = time.time()
+        with self._lock:
+            self._expire_locked(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (now, entry[1], entry[2])
+            self._sessions.move_to_end(session_id)
+            return entry[2]
+
+    def put(self, session_id, session):
+        """Store a session, trimming its history to the per-session caps."""
+        self.trimmed_messages += trim_history(session.get("history", []), self.max_messages, self.max_chars)
+        size = len(json.dumps(session))
+        now = time.time()
+        with self._lock:
+            old = self._sessions.pop(session_id, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._sessions[session_id] = (now, size, session)
+            self._bytes += size
+            self._expire_locked(now)
+            while len(self._sessions) > self.max_sessions:
+                _, (_, evicted_size, _) = self._sessions.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evicted += 1
+
+    def delete(self, session_id):
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def stats(self):
+        with self._lock:
+            self._expire_locked(time.time())
+            sessions = len(self._sessions)
+            messages = sum(len(s.get("history", [])) for _, _, s in self._sessions.values())
+            return {
+                "backend": self.backend,
+                "sessions": sessions,
+                "messages": messages,
+                "bytes": self._bytes,
+                "avg_bytes_per_session": round(self._bytes / sessions) if sessions else 0,
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "max_messages": self.max_messages,
+                "max_chars": self.max_chars,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "trimmed_messages": self.trimmed_messages
+            }
+
+
+class SqliteSessionStore(MemorySessionStore):
+    """Same semantics as MemorySessionStore, persisted in a SQLite file shared across processes."""
+
+    backend = "sqlite"
+
+    def __init__(self, path=SESSION_DB_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY, data TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_used ON sessions(last_used)")
+        self._conn.commit()
+
+    def _expire_locked(self, now):
+        cur = self._conn.execute("DELETE FROM sessions WHERE last_used < ?", (now - self.ttl_seconds,))
+        self.expired += cur.rowcount
+
+    def get(self, session_id):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE id = ? AND last_used >= ?",
+                (session_id, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE sessions SET last_used = ? WHERE id = ?", (now, session_id))
+            self._conn.commit()
+            return json.loads(row[0])
+
+    def put(self, session_id, session):
+        self.trimmed_messages += trim_history(session.get("history", []), self.max_messages, self.max_chars)
+        data = json.dumps(session)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, size, last_used) VALUES (?, ?, ?, ?)",
+                (session_id, data, len(data), now)
+            )
+            self._expire_locked(now)
+            count = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            if count > self.max_sessions:
+                cur = self._conn.execute(
+                    "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_sessions,)
+                )
+                self.evicted += cur.rowcount
+            self._conn.commit()
+
+    def delete(self, session_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            self._expire_locked(time.time())
+            self._conn.commit()
+            sessions, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions"
+            ).fetchone()
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            "sessions": sessions,
+            "bytes": total_bytes,
+            "avg_bytes_per_session": round(total_bytes / sessions) if sessions else 0,
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+            "max_messages": self.max_messages,
+            "max_chars": self.max_chars,
+            # Counters below are for this process only
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "trimmed_messages": self.trimmed_messages
+        }
+
+
+def make_session_store(backend=SESSION_STORE):
+    """Session store for SESSION_STORE, falling back to memory if SQLite can't be opened."""
+    if backend == "sqlite":
+        try:
+            return SqliteSessionStore()
+        except Exception as e:
+            print(f"⚠️  Session DB unavailable ({e}); keeping sessions in memory")
+    return MemorySessionStore()
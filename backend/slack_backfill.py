@@ -0,0 +1,221 @@
+"""
+Bulk backfill of historic Slack intro messages.
+
+Reads JSONL (one Slack message per line: text, channel_id|channel, message_ts|ts,
+user_id|user) and ingests it in batches:
+  - messages already seen (idempotency store or already in Chroma) are skipped
+  - profile extraction runs with bounded concurrency
+  - each batch is embedded in one call and written with a single collection.add
+  - a checkpoint (next line offset + running totals) is written after every batch,
+    so an interrupted job resumes where it stopped
+
+Profiles get deterministic IDs (slack_<channel>_<ts>), which makes re-running a batch
+after a crash harmless.
+
+Run with: python slack_backfill.py messages.jsonl [--checkpoint FILE] [--concurrency N] [--batch-size N]
+
+Config (env):
+  SLACK_BACKFILL_CONCURRENCY  parallel extraction calls (default 4)
+  SLACK_BACKFILL_BATCH_SIZE   messages embedded/written per batch (default 64)
+  SLACK_BACKFILL_DIR          where the /slack/backfill endpoint keeps uploads + checkpoints
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import ai_core
+from slack_dedupe import processed_messages
+
+SLACK_BACKFILL_CONCURRENCY = int(os.getenv("SLACK_BACKFILL_CONCURRENCY", "4"))
+SLACK_BACKFILL_BATCH_SIZE = int(os.getenv("SLACK_BACKFILL_BATCH_SIZE", "64"))
+SLACK_BACKFILL_DIR = os.getenv("SLACK_BACKFILL_DIR", "./slack_backfill")
+
+
+def parse_message(line):
+    """Normalized {text, channel_id, message_ts, user_id} for one JSONL line, or None if unusable."""
+    try:
+        raw = json.loads(line)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(raw, dict) or raw.get("bot_id") or raw.get("subtype"):
+        return None
+    msg = {
+        "text": (raw.get("text") or "").strip(),
+        "channel_id": (raw.get("channel_id") or raw.get("channel") or "").strip(),
+        "message_ts": str(raw.get("message_ts") or raw.get("ts") or "").strip(),
+        "user_id": (raw.get("user_id") or raw.get("user") or "").strip(),
+    }
+    if not msg["text"] or not msg["channel_id"] or not msg["message_ts"]:
+        return None
+    return msg
+
+
+def slack_user_id(msg):
+    return f"slack_{msg['channel_id']}_{msg['message_ts'].replace('.', '_')}"
+
+
+def load_checkpoint(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"offset": 0, "ingested": 0, "deduped": 0, "skipped": 0, "failed": 0, "status": "new"}
+
+
+def save_checkpoint(path, state):
+    """Write atomically so a crash mid-write never corrupts the checkpoint."""
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _extract(msg):
+    # A failed extraction must not be stored as the placeholder profile and marked
+    # processed: count it as failed so a re-run retries the message
+    try:
+        return ai_core.extract_user_profile(f"User: {msg['text']}", raise_errors=True) or {}
+    except Exception as e:
+        print(f"⚠️  Extraction failed for {msg['channel_id']}/{msg['message_ts']}: {e}")
+        return None
+
+
+def backfill(lines, checkpoint_path=None, concurrency=SLACK_BACKFILL_CONCURRENCY,
+             batch_size=SLACK_BACKFILL_BATCH_SIZE):
+    """
+    Ingest an iterable of JSONL lines, resuming from `checkpoint_path` if it exists.
+    Returns the final checkpoint state (offset, ingested, deduped, skipped, failed, seconds).
+    """
+    state = load_checkpoint(checkpoint_path)
+    state["status"] = "running"
+    state.pop("error", None)
+    start = time.perf_counter()
+    offset = state["offset"]
+    lines = islice(iter(lines), offset, None)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="backfill") as pool:
+        while True:
+            batch_lines = list(islice(lines, max(1, batch_size)))
+            if not batch_lines:
+                break
+
+            batch, seen = [], set()
+            for line in batch_lines:
+                msg = parse_message(line)
+                if msg is None:
+                    state["skipped"] += 1
+                    continue
+                key = (msg["channel_id"], msg["message_ts"])
+                if key in seen or key in processed_messages:
+                    state["deduped"] += 1
+                    continue
+                seen.add(key)
+                batch.append(msg)
+
+            profiles = list(pool.map(_extract, batch))
+            ok = [(m, p) for m, p in zip(batch, profiles) if p is not None]
+            state["failed"] += len(batch) - len(ok)
+            if ok:
+                user_ids = [slack_user_id(m) for m, _ in ok]
+                written = ai_core.save_user_profiles([p for _, p in ok], user_ids)
+                if written is None:
+                    # Leave the checkpoint at the start of this batch so a resume retries it
+                    raise RuntimeError("batched write to Chroma failed")
+                state["ingested"] += len(written)
+                state["deduped"] += len(ok) - len(written)
+                for m, _ in ok:
+                    processed_messages.add((m["channel_id"], m["message_ts"]))
+
+            offset += len(batch_lines)
+            state["offset"] = offset
+            state["seconds"] = round(state.get("seconds", 0) + time.perf_counter() - start, 3)
+            start = time.perf_counter()
+            save_checkpoint(checkpoint_path, state)
+            print(f"📥 Backfill: {offset} lines read, {state['ingested']} ingested, "
+                  f"{state['deduped']} deduped, {state['skipped']} skipped, {state['failed']} failed")
+
+    state["status"] = "done"
+    save_checkpoint(checkpoint_path, state)
+    return state
+
+
+def job_paths(job_id):
+    """
+    (job id, uploaded JSONL, checkpoint) for an endpoint-submitted backfill job. The id
+    comes back reduced to [A-Za-z0-9_-], the form its files are named by; use it for
+    claims and status too, so "x!" and "x" are the same job rather than two sharing files.
+    """
+    safe = "".join(ch for ch in job_id if ch.isascii() and (ch.isalnum() or ch in "-_"))
+    if not safe:
+        raise ValueError("invalid job_id")
+    os.makedirs(SLACK_BACKFILL_DIR, exist_ok=True)
+    return (safe,
+            os.path.join(SLACK_BACKFILL_DIR, f"{safe}.jsonl"),
+            os.path.join(SLACK_BACKFILL_DIR, f"{safe}.checkpoint.json"))
+
+
+# Jobs queued or executing in this process, and the subset executing right now
+# (a "running" checkpoint may be left by a crash, so checkpoints can't answer this)
+pending_jobs = set()
+active_jobs = set()
+_jobs_lock = threading.Lock()
+
+
+def claim_job(job_id):
+    """Reserve `job_id` for one queued run; False if it is already queued or running."""
+    with _jobs_lock:
+        if job_id in pending_jobs:
+            return False
+        pending_jobs.add(job_id)
+        return True
+
+
+def release_job(job_id):
+    """Give up a claim (the job finished, or was never queued)."""
+    with _jobs_lock:
+        pending_jobs.discard(job_id)
+        active_jobs.discard(job_id)
+
+
+def job_status(job_id):
+    with _jobs_lock:
+        return "running" if job_id in active_jobs else "queued" if job_id in pending_jobs else None
+
+
+def run_job(job_id):
+    """Run (or resume) a claimed endpoint-submitted job from its stored JSONL file."""
+    job_id, data_path, checkpoint_path = job_paths(job_id)
+    with _jobs_lock:
+        active_jobs.add(job_id)
+    try:
+        with open(data_path) as f:
+            return backfill(f, checkpoint_path)
+    except Exception as e:
+        print(f"❌ Backfill job {job_id} failed: {e}")
+        state = load_checkpoint(checkpoint_path)
+        state["status"] = "error"
+        state["error"] = str(e)
+        save_checkpoint(checkpoint_path, state)
+        return state
+    finally:
+        release_job(job_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill Slack intro messages from JSONL")
+    parser.add_argument("path", help="JSONL file, one Slack message per line")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default: <path>.checkpoint.json)")
+    parser.add_argument("--concurrency", type=int, default=SLACK_BACKFILL_CONCURRENCY, help="parallel extraction calls")
+    parser.add_argument("--batch-size", type=int, default=SLACK_BACKFILL_BATCH_SIZE, help="messages per embed/write batch")
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint or f"{args.path}.checkpoint.json"
+    with open(args.path) as f:
+        result = backfill(f, checkpoint, concurrency=args.concurrency, batch_size=args.batch_size)
+    print(f"✅ Backfill finished: {json.dumps(result)}")
@@ -0,0 +1,209 @@
+"""
+Pooled Slack Web API client for posting thread replies.
+
+One process-wide httpx.Client keeps connections alive (and speaks HTTP/2 when the `h2`
+package is installed), so replies stop paying a TLS handshake each. Posts are paced per
+channel by a token bucket (Slack allows roughly one message per second per channel) and
+retried with exponential backoff on transport errors and 5xx; 429s and `ratelimited`
+responses wait for the server's Retry-After. A channel's bucket is dropped once it has
+refilled completely (a fresh bucket would be identical), so the number of buckets tracks
+recently active channels rather than every channel ever posted to.
+
+Config (env):
+  SLACK_API_BASE_URL     Web API base URL (default https://slack.com/api)
+  SLACK_POST_RATE        sustained posts per second per channel (default 1.0)
+  SLACK_POST_BURST       posts allowed back-to-back per channel (default 3)
+  SLACK_POST_RETRIES     retries after the first attempt (default 3)
+  SLACK_POST_TIMEOUT     per-request timeout in seconds (default 8)
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+SLACK_API_BASE_URL = os.getenv("SLACK_API_BASE_URL", "https://slack.com/api").rstrip("/")
+SLACK_POST_RATE = float(os.getenv("SLACK_POST_RATE", "1.0"))
+SLACK_POST_BURST = float(os.getenv("SLACK_POST_BURST", "3"))
+SLACK_POST_RETRIES = int(os.getenv("SLACK_POST_RETRIES", "3"))
+SLACK_POST_TIMEOUT = float(os.getenv("SLACK_POST_TIMEOUT", "8"))
+
+# Never sleep longer than this for one Retry-After / backoff step
+MAX_RETRY_WAIT = 30.0
+# How often idle (fully refilled) per-channel buckets are swept
+BUCKET_SWEEP_SECONDS = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token, returning how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0 or self.rate <= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def is_full(self, now):
+        """True once the bucket has refilled to `burst`, i.e. it holds no pacing state."""
+        with self._lock:
+            if self.rate <= 0:
+                return True
+            return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+    def penalize(self, seconds):
+        """Push the bucket into debt, e.g. after the server asked us to back off."""
+        with self._lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class SlackClient:
+    """Thread-safe chat.postMessage sender with keep-alive pooling, pacing and retries."""
+
+    def __init__(self, base_url=SLACK_API_BASE_URL, rate=SLACK_POST_RATE, burst=SLACK_POST_BURST,
+                 retries=SLACK_POST_RETRIES, timeout=SLACK_POST_TIMEOUT, backoff_base=0.5, http2=None):
+        self.base_url = base_url.rstrip("/")
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.http2 = HTTP2_AVAILABLE if http2 is None else (http2 and HTTP2_AVAILABLE)
+        self._client = httpx.Client(
+            http2=self.http2,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+        )
+        self._buckets = {}
+        self._swept_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.buckets_evicted = 0
+        self.posts = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.rate_limited = 0
+        self.throttle_seconds = 0.0
+
+    def _bucket(self, channel_id):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._swept_at >= BUCKET_SWEEP_SECONDS:
+                self._swept_at = now
+                idle = [c for c, b in self._buckets.items() if b.is_full(now)]
+                for c in idle:
+                    del self._buckets[c]
+                self.buckets_evicted += len(idle)
+            bucket = self._buckets.get(channel_id)
+            if bucket is None:
+                bucket = self._buckets[channel_id] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def _count(self, field, amount=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def _backoff(self, attempt):
+        return min(MAX_RETRY_WAIT, self.backoff_base * (2 ** attempt) * (0.5 + random.random() / 2))
+
+    @staticmethod
+    def _retry_after(resp, default):
+        try:
+            return min(MAX_RETRY_WAIT, max(0.0, float(resp.headers.get("Retry-After", default))))
+        except (TypeError, ValueError):
+            return default
+
+    def post_message(self, token, channel_id, text, thread_ts=None):
+        """
+        Post a message (optionally into a thread). Returns True on success, False otherwise;
+        never raises.
+        """
+        self._count("posts")
+        bucket = self._bucket(channel_id)
+        payload = {"channel": channel_id, "text": text}
+        if thread_ts:
+            payload["thread_ts"] = thread_ts
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json; charset=utf-8"}
+
+        for attempt in range(self.retries + 1):
+            self._count("throttle_seconds", bucket.acquire())
+            # Backoff to sleep before the next attempt; rate-limit waits go through the bucket
+            # instead so every sender on that channel honours them
+            backoff = 0.0
+            try:
+                resp = self._client.post(f"{self.base_url}/chat.postMessage", headers=headers, json=payload)
+                if resp.status_code == 429:
+                    self._count("rate_limited")
+                    bucket.penalize(self._retry_after(resp, self._backoff(attempt)))
+                elif resp.status_code >= 500:
+                    backoff = self._backoff(attempt)
+                else:
+                    body = resp.json()
+                    if body.get("ok"):
+                        self._count("succeeded")
+                        return True
+                    if body.get("error") == "ratelimited":
+                        self._count("rate_limited")
+                        bucket.penalize(self._retry_after(resp, self._backoff(attempt)))
+                    else:
+                        # Permanent API errors (channel_not_found, not_in_channel, ...) aren't retried
+                        logger.warning(f"Slack postMessage failed: {resp.text}")
+                        break
+            except (httpx.TransportError, ValueError) as e:
+                logger.warning(f"Slack postMessage error: {e}")
+                backoff = self._backoff(attempt)
+
+            if attempt < self.retries:
+                self._count("retried")
+                if backoff:
+                    time.sleep(backoff)
+        self._count("failed")
+        return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "http2": self.http2,
+                "posts": self.posts,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "retried": self.retried,
+                "rate_limited": self.rate_limited,
+                "throttle_seconds": round(self.throttle_seconds, 3),
+                "channels": len(self._buckets),
+                "buckets_evicted": self.buckets_evicted
+            }
+
+    def close(self):
+        self._client.close()
+
+
+# Process-wide client used for Slack thread replies
+slack_client = SlackClient()
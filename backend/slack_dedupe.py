@@ -0,0 +1,107 @@
+"""
+Time-windowed key sets for Slack idempotency and soft text dedupe.
+
+A RotatingKeySet spreads keys over a fixed ring of time buckets. Adding puts a key in the
+current bucket; lookups check every live bucket (O(buckets), i.e. O(1)); once a bucket is
+older than the window it is dropped wholesale. A key is therefore remembered for at least
+`window_seconds` and at most one bucket span longer. Keys are stored as 64-bit hashes and
+each bucket has a hard cap, so memory stays bounded even when traffic spikes (a full
+bucket rotates early, shortening the effective window rather than growing).
+
+Config (env):
+  SLACK_IDEMPOTENCY_WINDOW_SECONDS  how long (channel, ts) keys are remembered (default 3600)
+  SLACK_TEXT_DEDUPE_SECONDS         identical-text window per channel (default 120)
+  SLACK_DEDUPE_MAX_KEYS             cap on keys held by each set (default 100000)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+SLACK_IDEMPOTENCY_WINDOW_SECONDS = float(os.getenv("SLACK_IDEMPOTENCY_WINDOW_SECONDS", "3600"))
+SLACK_TEXT_DEDUPE_SECONDS = float(os.getenv("SLACK_TEXT_DEDUPE_SECONDS", "120"))
+SLACK_DEDUPE_MAX_KEYS = int(os.getenv("SLACK_DEDUPE_MAX_KEYS", "100000"))
+
+
+class RotatingKeySet:
+    """Set of recently-seen keys that forgets them after a time window."""
+
+    def __init__(self, window_seconds, buckets=8, max_keys=SLACK_DEDUPE_MAX_KEYS):
+        self.window_seconds = window_seconds
+        self.span = window_seconds / buckets
+        self.max_buckets = buckets + 1  # the partially-filled current bucket plus a full window
+        self.max_keys_per_bucket = max(1, max_keys // self.max_buckets)
+        self._buckets = deque()  # (bucket_epoch, set of key hashes), oldest first
+        self._lock = threading.Lock()
+        self.rotations = 0
+        self.early_rotations = 0
+
+    def _rotate_locked(self, now):
+        epoch = int(now // self.span) if self.span > 0 else 0
+        oldest_live = epoch - self.max_buckets + 1
+        while self._buckets and self._buckets[0][0] < oldest_live:
+            self._buckets.popleft()
+        if not self._buckets or self._buckets[-1][0] < epoch:
+            self._buckets.append((epoch, set()))
+            self.rotations += 1
+        elif len(self._buckets[-1][1]) >= self.max_keys_per_bucket:
+            # Over capacity: start a fresh bucket now and drop the oldest if needed
+            self._buckets.append((self._buckets[-1][0], set()))
+            self.early_rotations += 1
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popleft()
+        return self._buckets[-1][1]
+
+    def __contains__(self, key):
+        h = hash(key)
+        with self._lock:
+            self._rotate_locked(time.time())
+            return any(h in keys for _, keys in self._buckets)
+
+    def add(self, key):
+        h = hash(key)
+        with self._lock:
+            self._rotate_locked(time.time()).add(h)
+
+    def check_and_add(self, key):
+        """True if the key was already present; otherwise remembers it and returns False."""
+        h = hash(key)
+        with self._lock:
+            current = self._rotate_locked(time.time())
+            if any(h in keys for _, keys in self._buckets):
+                return True
+            current.add(h)
+            return False
+
+    def discard(self, key):
+        """Forget a key (e.g. when the work it guarded could not be started)."""
+        h = hash(key)
+        with self._lock:
+            for _, keys in self._buckets:
+                keys.discard(h)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(keys) for _, keys in self._buckets)
+
+    def stats(self):
+        with self._lock:
+            self._rotate_locked(time.time())
+            return {
+                "keys": sum(len(keys) for _, keys in self._buckets),
+                "buckets": len(self._buckets),
+                "window_seconds": self.window_seconds,
+                "max_keys": self.max_keys_per_bucket * self.max_buckets,
+                "rotations": self.rotations,
+                "early_rotations": self.early_rotations
+            }
+
+
+def normalize_text(text):
+    return ' '.join((text or '').lower().split())
+
+
+# Shared by /slack/ingest and /slack/events
+processed_messages = RotatingKeySet(SLACK_IDEMPOTENCY_WINDOW_SECONDS)  # (channel_id, message_ts)
+recent_texts = RotatingKeySet(SLACK_TEXT_DEDUPE_SECONDS)  # (channel_id, normalized_text)
@@ -0,0 +1,248 @@
+"""
+Local fast-path detector for the skills/interests slots in /chat.
+
+Many opening messages already name concrete skills and domains ("Python/React, into
+HealthTech/AI"). This matches them against the generator vocabularies
+(generate_profiles.ROLES skills, INTERESTS topics) and the ranking topic aliases,
+with an optional embedding lookup for near-misses (spelling variants, unlisted
+frameworks). Every match carries a confidence; only matches at or above the
+threshold are trusted, everything else is left to the LLM extraction.
+
+Config (env):
+  SLOT_DETECTOR_THRESHOLD   minimum confidence for a match to count (default 0.8)
+  SLOT_DETECTOR_EMBEDDINGS  1 to enable the embedding lookup (default 0, dictionary only)
+"""
+
+import os
+import re
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from generate_profiles import INTERESTS, ROLES
+from ranking import TOPIC_ALIASES
+from slot_tracker import PLACEHOLDER_INTERESTS, PLACEHOLDER_SKILLS
+
+SLOT_DETECTOR_THRESHOLD = float(os.getenv("SLOT_DETECTOR_THRESHOLD", "0.8"))
+SLOT_DETECTOR_EMBEDDINGS = os.getenv("SLOT_DETECTOR_EMBEDDINGS", "0").strip() not in ("", "0", "false", "no")
+
+# Common skills users name that the generator pools don't list
+EXTRA_SKILLS = [
+    "React", "React Native", "Next.js", "Java", "C++", "C#", "Node", "Flutter", "iOS", "Android",
+    "Backend", "Frontend", "Full-stack", "Fullstack", "DevOps", "AWS", "GCP", "Azure",
+    "Machine Learning", "Data Science", "Product Management", "UX", "UI", "UI/UX", "Product Design",
+]
+
+# Vocabulary entries that are also everyday words; matched, but never trusted on their own
+AMBIGUOUS_TERMS = {
+    "go", "r", "room", "combine", "swift", "rails", "phoenix", "spark", "sketch", "closing",
+    "training", "growth", "community", "metrics", "layout", "messaging", "influence",
+    "engagement", "activation", "retention", "alignment", "pricing", "composition",
+    "rendering", "demos", "experiments", "automation", "documentation", "communication",
+    "outreach", "outbound", "referrals", "monitoring", "onboarding", "playbooks",
+    "positioning", "illustration", "personas", "transformers", "alliances",
+    "travel", "music", "policy", "diversity", "democracy", "fitness", "wellness",
+    "fin", "ed", "machine", "agents", "health",
+}
+AMBIGUOUS_CONFIDENCE = 0.5
+
+# Clause cues: skills after a "seeking" cue belong to looking_for, anything after a
+# negation is dropped
+SEEK_CUES = re.compile(r"\b(?:need|needs|needed|looking for|seeking|searching for|hire|hiring|want(?:s|ed)? (?:a|an|someone)|find (?:a|an|someone))\b")
+NEGATION_CUES = re.compile(r"\b(?:not|no|don't|dont|never|without|isn't|aren't)\b")
+CLAUSE_SPLIT = re.compile(r"[.;!?\n]+|,\s*but\b|\bbut\b")
+WORD = re.compile(r"[a-z][a-z0-9+#.\-]*[a-z0-9+#]|[a-z]")
+
+STOPWORDS = {
+    "the", "and", "for", "with", "into", "about", "what", "who", "that", "this", "have", "has",
+    "are", "was", "were", "been", "you", "your", "our", "their", "they", "them", "not", "but",
+    "can", "could", "would", "should", "will", "just", "also", "very", "really", "some", "any",
+    "like", "love", "want", "need", "looking", "someone", "anyone", "team", "build", "building",
+    "work", "working", "startup", "project", "idea", "experience", "years", "know", "sure",
+    "role", "help", "hey", "hello", "thanks", "from", "here", "there", "more", "much", "lot",
+    "good", "great", "new", "make", "making", "using", "use", "used", "doing", "did", "does",
+    "i'm", "im", "i've", "it's", "am", "is", "be", "to", "of", "in", "on", "at", "a", "an",
+}
+
+Detection = namedtuple("Detection", ["skills", "interests", "skills_confidence", "interests_confidence", "confident"])
+
+
+def _variants(term):
+    """Lowercased surface forms a vocabulary term is matched under."""
+    low = term.lower()
+    out = {low, low.replace("-", " ")}
+    if low.endswith(".js"):
+        out.add(low[:-3])
+    return {v for v in out if v}
+
+
+def _vocabulary():
+    """{surface form: (slot, display value)} for every skill, topic and topic alias."""
+    vocab = {}
+    skills = [s for role in ROLES.values() for group in role["skills"] for s in group] + EXTRA_SKILLS
+    for skill in skills:
+        if skill.lower() in PLACEHOLDER_SKILLS or skill.lower() in PLACEHOLDER_INTERESTS:
+            continue
+        for v in _variants(skill):
+            vocab.setdefault(v, ("skills", skill))
+    for topic in (t for group in INTERESTS.values() for t in group):
+        if topic.lower() in PLACEHOLDER_INTERESTS:
+            continue
+        for v in _variants(topic):
+            # Topics win over identically-named skills ("Analytics", "Social Media")
+            vocab[v] = ("interests", topic)
+    for alias in TOPIC_ALIASES:
+        # Aliases keep the user's own spelling; ranking normalizes them later
+        vocab.setdefault(alias, ("interests", None))
+    return vocab
+
+
+class SlotDetector:
+    """Dictionary + embedding slot detector with hit-rate counters."""
+
+    def __init__(self, threshold=SLOT_DETECTOR_THRESHOLD, embed=None, max_embed_tokens=12):
+        self.threshold = threshold
+        self.embed = embed
+        self.max_embed_tokens = max_embed_tokens
+        self.vocab = _vocabulary()
+        phrases = sorted(self.vocab, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"(?<![\w+#])(" + "|".join(re.escape(p) for p in phrases) + r")(?![\w+#]|\.\w)"
+        )
+        self._vocab_matrix = None  # lazily embedded vocabulary, rows L2-normalized
+        self._vocab_rows = []
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.local_hits = 0
+        self.fallbacks = 0
+        self.dictionary_matches = 0
+        self.embedding_matches = 0
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def _dictionary_matches(self, clause, original):
+        seeking = SEEK_CUES.search(clause)
+        negated = NEGATION_CUES.search(clause)
+        matches, spans = [], []
+        for m in self._pattern.finditer(clause):
+            if negated and negated.start() < m.start():
+                continue
+            slot, display = self.vocab[m.group(1)]
+            if slot == "skills" and seeking and seeking.start() < m.start():
+                continue
+            value = display or original[m.start():m.end()]
+            conf = AMBIGUOUS_CONFIDENCE if m.group(1) in AMBIGUOUS_TERMS else 1.0
+            matches.append((slot, value, conf))
+            spans.append((m.start(), m.end()))
+        return matches, spans
+
+    def _leftover_tokens(self, clause, spans):
+        """Content words not covered by a dictionary match, candidates for the embedding lookup."""
+        if NEGATION_CUES.search(clause) or SEEK_CUES.search(clause):
+            return []
+        out = []
+        for m in WORD.finditer(clause):
+            if any(s <= m.start() < e for s, e in spans):
+                continue
+            tok = m.group(0)
+            if len(tok) >= 3 and tok not in STOPWORDS and not tok.isdigit():
+                out.append(tok)
+        return out
+
+    def _ensure_vocab_matrix(self):
+        if self._vocab_matrix is not None:
+            return
+        with self._lock:
+            if self._vocab_matrix is not None:
+                return
+            rows = sorted({(slot, display) for slot, display in self.vocab.values() if display})
+            vectors = np.asarray(self.embed([display for _, display in rows]), dtype=np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+            self._vocab_rows = rows
+            self._vocab_matrix = vectors
+
+    def _embedding_matches(self, tokens):
+        if not tokens or self.embed is None:
+            return []
+        tokens = list(dict.fromkeys(tokens))[:self.max_embed_tokens]
+        self._ensure_vocab_matrix()
+        vectors = np.asarray(self.embed(tokens), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        sims = vectors @ self._vocab_matrix.T
+        best = sims.argmax(axis=1)
+        matches = []
+        for i, j in enumerate(best):
+            sim = float(sims[i, j])
+            if sim >= self.threshold:
+                slot, display = self._vocab_rows[j]
+                matches.append((slot, display, sim))
+        return matches
+
+    def detect(self, message):
+        """
+        Find skills and interests named in one message. Only matches at or above the
+        threshold are returned; `confident` means both slots were found.
+        """
+        self.messages += 1
+        text = (message or "").lower()
+        found = []
+        leftovers = []
+        # Clause offsets are kept aligned with the original so surface forms keep their casing
+        pos = 0
+        for part in CLAUSE_SPLIT.split(text):
+            start = text.find(part, pos) if part else pos
+            pos = start + len(part)
+            original = (message or "")[start:pos]
+            matches, spans = self._dictionary_matches(part, original)
+            found.extend(matches)
+            leftovers.extend(self._leftover_tokens(part, spans))
+        self.dictionary_matches += sum(1 for _, _, c in found if c >= self.threshold)
+
+        if SLOT_DETECTOR_EMBEDDINGS and self.embed is not None and leftovers:
+            try:
+                emb = self._embedding_matches(leftovers)
+                self.embedding_matches += len(emb)
+                found.extend(emb)
+            except Exception as e:
+                print(f"⚠️  Slot detector embedding lookup failed: {e}")
+
+        slots = {"skills": [], "interests": []}
+        conf = {"skills": 0.0, "interests": 0.0}
+        for slot, value, c in found:
+            conf[slot] = max(conf[slot], c)
+            if c >= self.threshold and value not in slots[slot]:
+                slots[slot].append(value)
+        return Detection(
+            skills=slots["skills"],
+            interests=slots["interests"],
+            skills_confidence=round(conf["skills"], 4),
+            interests_confidence=round(conf["interests"], 4),
+            confident=bool(slots["skills"]) and bool(slots["interests"])
+        )
+
+    # ------------------------------------------------------------------
+    # Counters
+    # ------------------------------------------------------------------
+
+    def record(self, resolved_locally):
+        """Count whether a chat turn was triggered locally or fell back to the LLM."""
+        if resolved_locally:
+            self.local_hits += 1
+        else:
+            self.fallbacks += 1
+
+    def stats(self):
+        total = self.local_hits + self.fallbacks
+        return {
+            "threshold": self.threshold,
+            "embeddings": bool(SLOT_DETECTOR_EMBEDDINGS and self.embed is not None),
+            "messages": self.messages,
+            "local_hits": self.local_hits,
+            "fallbacks": self.fallbacks,
+            "hit_rate": round(self.local_hits / total, 4) if total else 0.0,
+            "dictionary_matches": self.dictionary_matches,
+            "embedding_matches": self.embedding_matches
+        }
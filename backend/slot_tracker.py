@@ -0,0 +1,68 @@
+"""
+Per-session slot tracking for /chat.
+
+Instead of re-extracting a profile from the whole transcript on every turn, each
+session keeps the skills and interests found so far and only the newest user
+message (plus the question it answers) is sent for extraction. Once both slots are
+filled no further extraction calls are made.
+"""
+
+# Defaults extract_user_profile fills in when it finds nothing
+PLACEHOLDER_SKILLS = {"general"}
+PLACEHOLDER_INTERESTS = {"collaboration"}
+
+
+def _merge(current, new, placeholders):
+    seen = {x.lower() for x in current}
+    for item in new or []:
+        if not isinstance(item, str):
+            continue
+        item = item.strip()
+        if item and item.lower() not in placeholders and item.lower() not in seen:
+            current.append(item)
+            seen.add(item.lower())
+
+
+class SlotTracker:
+    """Accumulated skills/interests for one chat session."""
+
+    def __init__(self, skills=None, interests=None, extractions=0):
+        self.skills = list(skills or [])
+        self.interests = list(interests or [])
+        self.extractions = extractions
+
+    @property
+    def filled(self):
+        return bool(self.skills) and bool(self.interests)
+
+    def merge(self, profile):
+        """Fold an extracted (partial) profile into the slots, ignoring placeholder values."""
+        profile = profile or {}
+        skills = profile.get("skills")
+        interests = profile.get("interests")
+        _merge(self.skills, skills if isinstance(skills, list) else [], PLACEHOLDER_SKILLS)
+        _merge(self.interests, interests if isinstance(interests, list) else [], PLACEHOLDER_INTERESTS)
+
+    def update(self, message, last_assistant, extract):
+        """
+        Extract from the newest user message (with the assistant question it answers, for
+        context) and merge the result. Skips the call entirely once both slots are filled.
+        Returns True if an extraction call was made.
+        """
+        if self.filled:
+            return False
+        lines = []
+        if last_assistant:
+            lines.append(f"Assistant: {last_assistant}")
+        lines.append(f"User: {message}")
+        self.merge(extract("\n".join(lines)))
+        self.extractions += 1
+        return True
+
+    def to_dict(self):
+        return {"skills": self.skills, "interests": self.interests, "extractions": self.extractions}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(data.get("skills"), data.get("interests"), data.get("extractions", 0))
@@ -0,0 +1,101 @@
+"""
+team_id -> member ids reverse index.
+
+Lets get_teams / dissolve_team touch only team members instead of scanning every
+collaborator. The index is persisted as JSON next to the Chroma data and rebuilt from
+Chroma (the source of truth) on startup, so it can't drift across restarts, and again
+whenever another process wrote to the collection (a team formed or dissolved by another
+worker, a reseed), detected through the shared corpus version.
+"""
+
+import json
+import os
+import threading
+
+from corpus_version import corpus_version
+
+TEAM_INDEX_PATH = os.getenv("TEAM_INDEX_PATH", os.path.join(os.getenv("CHROMA_PATH", "./chroma_db"), "team_index.json"))
+
+
+class TeamIndex:
+    """Thread-safe {team_id: [member ids]} map with atomic JSON persistence."""
+
+    def __init__(self, path=TEAM_INDEX_PATH):
+        self.path = path
+        self._teams = {}
+        self._lock = threading.Lock()
+        self.watch = corpus_version.watch()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                teams = json.load(f)
+            with self._lock:
+                self._teams = {t: list(ids) for t, ids in teams.items()}
+        except (OSError, ValueError):
+            pass
+
+    def _save_locked(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._teams, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not persist team index: {e}")
+
+    def rebuild(self, collection):
+        """Rebuild from Chroma: one metadata-only get filtered to rows that have a team."""
+        version = corpus_version.current()
+        result = collection.get(where={"team_id": {"$ne": "None"}}, include=["metadatas"])
+        teams = {}
+        for user_id, md in zip(result["ids"], result["metadatas"]):
+            team_id = (md or {}).get("team_id")
+            if team_id and team_id != "None":
+                teams.setdefault(team_id, []).append(user_id)
+        with self._lock:
+            self._teams = teams
+            self._save_locked()
+        self.watch.synced(version)
+        return len(teams)
+
+    def ensure_fresh(self, collection):
+        """Rebuild if another process wrote since the index was last synced."""
+        stale, _ = self.watch.stale()
+        if stale:
+            self.rebuild(collection)
+
+    def members(self, team_id):
+        with self._lock:
+            return list(self._teams.get(team_id, []))
+
+    def all(self):
+        with self._lock:
+            return {t: list(ids) for t, ids in self._teams.items()}
+
+    def set_team(self, team_id, member_ids):
+        with self._lock:
+            self._teams[team_id] = list(member_ids)
+            self._save_locked()
+
+    def remove_team(self, team_id):
+        with self._lock:
+            removed = self._teams.pop(team_id, None)
+            self._save_locked()
+            return removed
+
+    def clear(self):
+        with self._lock:
+            self._teams = {}
+            self._save_locked()
+
+    def __len__(self):
+        return len(self._teams)
+
+
+# Process-wide index shared by ai_core and seed_db
+team_index = TeamIndex()
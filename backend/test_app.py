@@ -0,0 +1,70 @@
+"""
+Flask-level tests for app.py through the test client (no running server needed).
+Runs offline against the scratch collection from conftest.py.
+Run with: pytest test_app.py -v
+"""
+
+import pytest
+
+TRANSCRIPT = "I'm Zed, I know Python and Flask, into HealthTech, looking for a Designer."
+
+
+@pytest.fixture
+def client(corpus):
+    import app
+    app.app.config["TESTING"] = True
+    return app.app.test_client()
+
+
+def test_find_collaborators_returns_a_saved_user_id(client, corpus):
+    body = client.post("/find-collaborators", json={"chat_transcript": TRANSCRIPT, "session_id": "s1"}).get_json()
+    assert body["user_id"]
+    assert corpus.get_collaborator_by_id(body["user_id"]) is not None
+    assert body["user_id"] not in [m["id"] for m in body["matches"]]
+
+
+def test_failed_background_save_is_not_handed_out(client, corpus, monkeypatch):
+    import app
+    monkeypatch.setattr(app, "FIND_PIPELINE_MODE", "threaded")
+    monkeypatch.setattr(corpus, "save_user_profile", lambda *args, **kwargs: None)
+    body = client.post("/find-collaborators", json={"chat_transcript": TRANSCRIPT, "session_id": "s1"}).get_json()
+    assert body["user_id"] is None
+    assert body["matches"]
+
+
+def test_team_create_rejects_ids_whose_save_failed(client, corpus, monkeypatch):
+    import app
+    monkeypatch.setitem(app.failed_saves, "user_lost", None)
+    response = client.post("/team/create", json={"user_ids": ["user_0", "user_1", "user_lost"]})
+    assert response.status_code == 409
+    assert response.get_json()["unsaved_user_ids"] == ["user_lost"]
+    assert corpus.get_teams() == {}
+
+
+def _slack_event(ts, text="I know Python, into HealthTech"):
+    return {"type": "event_callback", "event": {"type": "message", "channel": "CEVENTS", "ts": ts,
+                                                "user": "U1", "text": text}}
+
+
+def test_failed_slack_event_releases_its_dedupe_keys(client, monkeypatch):
+    import app
+    calls = []
+
+    def process(job):
+        calls.append(job["message_ts"])
+        if len(calls) == 1:
+            raise RuntimeError("Groq down")
+
+    monkeypatch.setattr(app, "_process_slack_event", process)
+    assert client.post("/slack/events", json=_slack_event("1.0")).get_json()["queued"]
+    app.slack_event_queue.join()
+
+    # Slack's retry of the failed event is processed, not deduped
+    assert client.post("/slack/events", json=_slack_event("1.0")).get_json()["queued"]
+    app.slack_event_queue.join()
+    assert calls == ["1.0", "1.0"]
+
+    # Once it succeeded, a retry and the same text under a new ts are both deduped
+    assert client.post("/slack/events", json=_slack_event("1.0")).get_json()["deduped"]
+    assert client.post("/slack/events", json=_slack_event("2.0")).get_json()["deduped_text"]
+    assert calls == ["1.0", "1.0"]
@@ -0,0 +1,66 @@
+"""
+Tests for embedding_cache: hits/misses, LRU eviction and the maintained row count.
+Run with: pytest test_embedding_cache.py -v
+"""
+
+import sqlite3
+
+from embedding_cache import EmbeddingCache, cache_key
+
+
+def _encoder(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+    return encode
+
+
+def _rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+def test_encode_only_embeds_misses(tmp_path):
+    cache = EmbeddingCache("m", path=str(tmp_path / "c.sqlite3"))
+    calls = []
+    first = cache.encode(["a b", "c", "a  b"], _encoder(calls))
+    assert calls == [["a b", "c"]]  # whitespace-normalized duplicate embedded once
+    assert cache.encode(["c", "a b"], _encoder(calls)) == [first[1], first[0]]
+    assert len(calls) == 1
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (2, 3)  # per requested text
+    assert cache_key("m", "a b") != cache_key("other", "a b")
+
+
+def test_eviction_keeps_recently_used_rows(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    cache = EmbeddingCache("m", path=path, max_entries=10)
+    cache.put_many([(f"k{i}", [float(i)]) for i in range(10)])
+    cache.get_many(["k0"])  # refresh k0's LRU stamp
+    cache.put_many([("k10", [10.0])])
+
+    # Over the cap: trimmed to 90% of it, least recently used first
+    assert cache.stats()["entries"] == _rows(path) == 9
+    assert cache.evictions == 2
+    assert set(cache.get_many(["k0", "k10", "k1", "k2"])) == {"k0", "k10"}
+
+
+def test_count_survives_rewrites_and_other_writers(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    one = EmbeddingCache("m", path=path, max_entries=100)
+    two = EmbeddingCache("m", path=path, max_entries=100)
+    one.put_many([("a", [1.0]), ("b", [2.0])])
+    one.put_many([("a", [3.0])])  # rewrite of an existing key
+    two.put_many([("c", [4.0])])
+    assert one.stats()["entries"] == two.stats()["entries"] == _rows(path) == 3
+    assert one.get_many(["a"])["a"] == [3.0]
+
+
+def test_count_is_initialized_for_an_existing_file(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)")
+        conn.executemany("INSERT INTO embeddings VALUES (?, ?, 0)", [(f"k{i}", b"\0\0\0\0") for i in range(5)])
+    cache = EmbeddingCache("m", path=path, max_entries=100)
+    assert cache.stats()["entries"] == 5
+    cache.put_many([("k9", [1.0])])
+    assert EmbeddingCache("m", path=path).stats()["entries"] == 6
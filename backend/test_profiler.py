@@ -0,0 +1,47 @@
+"""
+Tests for profiler (token check, capture cap, capture files) and the app's profiling hook.
+Run with: pytest test_profiler.py -v
+"""
+
+import threading
+import time
+
+import pytest
+
+import profiler
+
+
+def test_token_matches():
+    assert profiler.token_matches("secret", "secret")
+    assert not profiler.token_matches("Secret", "secret")
+    assert not profiler.token_matches("secret", "")
+    assert not profiler.token_matches("", "secret")
+    # compare_digest raises TypeError on non-ASCII str; that must read as a mismatch
+    assert not profiler.token_matches("é", "abc")
+    assert profiler.token_matches("clé", "clé")
+
+
+def test_capture_limiter_caps_per_minute():
+    limiter = profiler.CaptureLimiter(max_per_minute=2)
+    assert [limiter.try_acquire() for _ in range(3)] == [True, True, False]
+    assert (limiter.allowed, limiter.rejected) == (2, 1)
+
+
+def test_save_capture_keeps_the_newest_files(tmp_path):
+    sampler = profiler.SamplingProfiler(threading.get_ident(), interval_ms=1).start()
+    time.sleep(0.02)
+    sampler.stop()
+    assert sampler.samples > 0 and "test_save_capture" in sampler.collapsed()
+
+    names = [profiler.save_capture(sampler, f"GET /x/{i}", directory=str(tmp_path), max_files=2) for i in range(3)]
+    kept = sorted(p.name for p in tmp_path.iterdir())
+    assert len(kept) == 2 and names[-1] in kept
+
+
+@pytest.mark.parametrize("supplied", ["é", "wrong"])
+def test_bad_profile_token_is_ignored_by_the_app(monkeypatch, supplied):
+    import app
+    monkeypatch.setattr(profiler, "PROFILE_TOKEN", "secret")
+    response = app.app.test_client().get("/health", query_string={"profile": supplied})
+    assert response.status_code == 200
+    assert "X-Profile-Capture" not in response.headers
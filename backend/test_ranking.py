@@ -0,0 +1,66 @@
+"""
+Tests for ranking: the vectorized scorer against the reference loop, the small-pool and
+feature-less fallbacks, self-match skipping and the read-only query vocabulary.
+Run with: pytest test_ranking.py -v
+"""
+
+import numpy as np
+import pytest
+
+import ranking
+from bench_rerank import USERS, make_candidates
+from feature_store import FeatureStore
+from ranking import build_rank_context, candidate_features, score_candidates, score_candidates_reference
+
+
+def _assert_same(got, expected):
+    assert [md["id"] for _, md, _ in got] == [md["id"] for _, md, _ in expected]
+    assert [r for _, _, r in got] == [r for _, _, r in expected]
+    np.testing.assert_allclose([s for s, _, _ in got], [s for s, _, _ in expected], rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("n", [0, 1, ranking.VECTORIZE_MIN_CANDIDATES - 1, ranking.VECTORIZE_MIN_CANDIDATES, 300])
+@pytest.mark.parametrize("user, targets", USERS)
+def test_vectorized_matches_reference(n, user, targets):
+    cands = make_candidates(n)
+    ctx = build_rank_context(user, targets)
+    expected = score_candidates_reference(cands, ctx)
+    _assert_same(score_candidates(cands, ctx, features=candidate_features), expected)
+    _assert_same(score_candidates(cands, ctx, features=FeatureStore().get), expected)
+    _assert_same(score_candidates(cands, ctx), expected)
+
+
+def test_small_or_featureless_pools_use_the_loop(monkeypatch):
+    calls = []
+    real = ranking.score_candidates_reference
+    monkeypatch.setattr(ranking, "score_candidates_reference", lambda c, ctx: calls.append(len(c)) or real(c, ctx))
+    ctx = build_rank_context(*USERS[0])
+    score_candidates(make_candidates(ranking.VECTORIZE_MIN_CANDIDATES - 1), ctx, features=candidate_features)
+    score_candidates(make_candidates(50), ctx)
+    score_candidates(make_candidates(50), ctx, features=candidate_features)
+    assert calls == [ranking.VECTORIZE_MIN_CANDIDATES - 1, 50]
+
+
+def test_self_matches_are_skipped():
+    cands = make_candidates(30)
+    user = dict(USERS[0][0], name=f"  {cands[3]['name'].upper()} ")
+    ids = [md["id"] for _, md, _ in score_candidates(cands, build_rank_context(user, []), features=candidate_features)]
+    assert cands[3]["id"] not in ids and len(ids) == len({md["id"] for md in cands if md["name"] != cands[3]["name"]})
+
+
+def test_queries_dont_grow_the_vocabulary():
+    cands = make_candidates(50)
+    store = FeatureStore()
+    score_candidates(cands, build_rank_context(*USERS[0]), features=store.get)
+    size = len(ranking.vocabulary)
+    for i in range(20):
+        user = {"name": "Q", "skills": [f"novelskill{i}"], "interests": [f"noveltopic{i}"]}
+        score_candidates(cands, build_rank_context(user, []), features=store.get)
+    assert len(ranking.vocabulary) == size
+    assert ranking.vocabulary.lookup(["noveltopic0", "healthcare"]) == ranking.vocabulary.lookup(["healthcare"])
+
+
+def test_tokenize_and_topic_aliases():
+    assert ranking.tokenize("UI/UX, React & Node|Go") == ["ui", "ux", "react", "node", "go"]
+    assert ranking.tokenize(["Machine Learning", "AI/ML"]) == ["machine", "learning", "ai", "ml"]
+    assert ranking.norm_topics(["healthtech", "medtech", "fintech"]) == {"healthcare", "finance"}
@@ -0,0 +1,94 @@
+"""
+Tests for result_cache and its use by ai_core.find_collaborators / search_by_skills.
+Runs offline against the scratch collection from conftest.py.
+Run with: pytest test_result_cache.py -v
+"""
+
+from result_cache import ResultCache, normalize_terms
+
+QUERY = {"name": "Zed", "skills": ["Python", "Flask"], "interests": ["HealthTech"], "looking_for": "Designer"}
+
+
+def test_normalize_terms_ignores_case_order_and_spacing():
+    assert normalize_terms(["React", " python "]) == normalize_terms(["python", "react", "PYTHON"])
+    assert normalize_terms("Go") == ("go",)
+    assert normalize_terms(None) == ()
+
+
+def test_put_is_skipped_when_a_write_landed_after_the_key():
+    cache = ResultCache(max_entries=4)
+    key = cache.skills_key(["Python"])
+    cache.bump()
+    cache.put(key, [{"id": "a"}])
+    assert cache.get(cache.skills_key(["Python"])) is None
+
+
+def test_lru_eviction_and_disabled_cache():
+    cache = ResultCache(max_entries=2)
+    for skill in ("a", "b", "c"):
+        cache.put(cache.skills_key([skill]), [skill])
+    assert cache.get(cache.skills_key(["a"])) is None
+    assert cache.get(cache.skills_key(["c"])) == ["c"]
+    assert cache.stats()["evictions"] == 1
+
+    off = ResultCache(max_entries=0)
+    off.put(off.skills_key(["a"]), ["a"])
+    assert off.get(off.skills_key(["a"])) is None
+
+
+def test_saved_keeps_only_the_same_names_entries():
+    cache = ResultCache(max_entries=8)
+    zed_key = cache.collaborators_key(QUERY, ["Designer"], "Designer")
+    amy_key = cache.collaborators_key(dict(QUERY, name="Amy"), ["Designer"], "Designer")
+    cache.put(zed_key, ["zed"])
+    cache.put(amy_key, ["amy"])
+    cache.put(cache.skills_key(["Python"]), ["py"])
+
+    cache.saved(" zed ")
+    assert cache.get(cache.collaborators_key(QUERY, ["Designer"], "Designer")) == ["zed"]
+    assert cache.get(cache.collaborators_key(dict(QUERY, name="Amy"), ["Designer"], "Designer")) is None
+    assert cache.get(cache.skills_key(["Python"])) is None
+    # A key taken before another name's save can't store a result computed without it
+    cache.saved("Amy")
+    cache.put(zed_key, ["stale"])
+    assert cache.get(cache.collaborators_key(QUERY, ["Designer"], "Designer")) is None
+
+
+def test_repeat_find_collaborators_is_a_cache_hit(corpus):
+    first_id = corpus.new_user_id(QUERY)
+    first = corpus.find_collaborators(QUERY, exclude_ids=[first_id])
+    assert corpus.save_user_profile(QUERY, user_id=first_id) == first_id
+    hits = corpus.result_cache.hits
+
+    # Same query from a new request: new id, and the previous request's save in between
+    second_id = corpus.new_user_id(QUERY)
+    second = corpus.find_collaborators(dict(QUERY, skills=["flask", "PYTHON"]), exclude_ids=[second_id])
+    assert corpus.result_cache.hits == hits + 1
+    assert [m["id"] for m in second] == [m["id"] for m in first]
+    assert first_id not in [m["id"] for m in second]
+
+
+def test_cached_ranking_is_filtered_per_caller(corpus):
+    full = corpus.find_collaborators(QUERY)
+    excluded = full[0]["id"]
+    hits = corpus.result_cache.hits
+    narrowed = corpus.find_collaborators(QUERY, exclude_ids=[excluded])
+    assert corpus.result_cache.hits == hits + 1
+    assert excluded not in [m["id"] for m in narrowed]
+    assert [m["id"] for m in narrowed][:len(full) - 1] == [m["id"] for m in full[1:]]
+
+
+def test_other_writes_invalidate(corpus):
+    corpus.find_collaborators(QUERY)
+    corpus.save_user_profile({"name": "Ivy", "skills": ["Figma"], "interests": ["HealthTech"], "looking_for": "Designer"})
+    misses = corpus.result_cache.misses
+    results = corpus.find_collaborators(QUERY)
+    assert corpus.result_cache.misses == misses + 1
+    assert "Ivy" in [m["name"] for m in results]
+
+    corpus.search_by_skills(["Figma"])
+    team = corpus.create_team(["user_1", "user_2"], "Design")
+    assert team["team_id"]
+    misses = corpus.result_cache.misses
+    corpus.search_by_skills(["figma"])
+    assert corpus.result_cache.misses == misses + 1
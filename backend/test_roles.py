@@ -0,0 +1,43 @@
+"""
+Tests for roles: the compiled RoleMatcher against the keyword cascades it replaced
+(kept as the baseline in bench_roles.py), rule priority and longest-keyword handling.
+Run with: pytest test_roles.py -v
+"""
+
+import pytest
+
+from bench_roles import legacy_canon_role, legacy_profile_role, legacy_skill_role, role_inputs, skill_inputs
+from roles import RoleMatcher, canon_role, infer_profile_role, infer_role_from_skills
+
+
+@pytest.mark.parametrize("label", role_inputs())
+def test_canon_role_matches_the_cascade(label):
+    assert canon_role(label) == legacy_canon_role(label)
+
+
+@pytest.mark.parametrize("skills", skill_inputs())
+def test_skill_roles_match_the_cascades(skills):
+    assert infer_role_from_skills(skills) == legacy_skill_role(skills)
+    assert infer_profile_role(skills) == legacy_profile_role(skills)
+
+
+def test_first_rule_wins_wherever_its_keyword_is():
+    matcher = RoleMatcher(rules=[("A", ["design"]), ("B", ["designer", "eng"])])
+    # "designer" belongs to B, but its prefix "design" is A's, and A comes first
+    assert matcher.match("designer") == "A"
+    assert matcher.match("eng and design") == "A"
+    assert matcher.match("engineer") == "B"
+    assert matcher.match("sales") is None
+
+
+def test_direct_lookup_beats_rules():
+    matcher = RoleMatcher(rules=[("A", ["pm"])], direct={"pm": "Product Manager"})
+    assert matcher.match("pm") == "Product Manager"
+    assert matcher.match("a pm") == "A"
+
+
+def test_no_rules_and_passthrough():
+    assert RoleMatcher(rules=[]).match("anything") is None
+    assert canon_role("") == ""
+    assert canon_role("  Astronaut  ") == "Astronaut"
+    assert infer_role_from_skills([]) == "Other"
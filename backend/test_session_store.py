@@ -0,0 +1,111 @@
+"""
+Tests for session_store: history caps, TTL expiry and LRU eviction on both backends,
+and sharing the SQLite file between store instances.
+Run with: pytest test_session_store.py -v
+"""
+
+import pytest
+
+import session_store
+from session_store import MemorySessionStore, SqliteSessionStore, new_session, trim_history
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        self.now += 1  # every call is a distinct moment, so LRU order is well defined
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "sqlite":
+            return SqliteSessionStore(path=str(tmp_path / "sessions.sqlite3"), **kwargs)
+        return MemorySessionStore(**kwargs)
+    return make
+
+
+def _session(*contents):
+    session = new_session()
+    session["history"] = [{"role": "user", "content": c} for c in contents]
+    return session
+
+
+def test_trim_history_applies_both_caps():
+    history = _session("a" * 10, "b" * 10, "c" * 10, "d")["history"]
+    assert trim_history(history, max_messages=3, max_chars=100) == 1
+    assert trim_history(history, max_messages=3, max_chars=11) == 1
+    assert [m["content"] for m in history] == ["c" * 10, "d"]
+    assert trim_history([], 0, 0) == 0
+
+
+def test_put_trims_history(make_store, clock):
+    store = make_store(max_messages=2)
+    store.put("s", _session("one", "two", "three"))
+    assert [m["content"] for m in store.get("s")["history"]] == ["two", "three"]
+    assert store.trimmed_messages == 1
+
+
+def test_ttl_expiry_and_refresh(make_store, clock):
+    store = make_store(ttl_seconds=10)
+    store.put("old", _session("x"))
+    store.put("kept", _session("y"))
+    clock.now += 8
+    assert store.get("kept") is not None  # refreshes its TTL
+    clock.now += 5
+    assert store.get("old") is None
+    assert store.get("kept") is not None
+    assert store.stats()["sessions"] == 1
+
+
+def test_lru_eviction_beyond_max_sessions(make_store, clock):
+    store = make_store(max_sessions=2)
+    store.put("a", _session("1"))
+    store.put("b", _session("2"))
+    store.get("a")  # "b" is now least recently used
+    store.put("c", _session("3"))
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    assert store.evicted == 1 and store.stats()["sessions"] == 2
+
+
+def test_delete_and_byte_accounting(make_store, clock):
+    store = make_store()
+    store.put("a", _session("hello"))
+    store.put("a", _session("hello", "again"))  # replacing must not double count
+    stats = store.stats()
+    assert stats["sessions"] == 1 and stats["bytes"] == stats["avg_bytes_per_session"] > 0
+    store.delete("a")
+    store.delete("missing")
+    assert store.get("a") is None
+    assert (store.stats()["sessions"], store.stats()["bytes"]) == (0, 0)
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path, clock):
+    path = str(tmp_path / "sessions.sqlite3")
+    one, two = SqliteSessionStore(path=path), SqliteSessionStore(path=path)
+    session = _session("hi")
+    session["slots"] = {"skills": ["Python"]}
+    one.put("s", session)
+    assert two.get("s") == session
+    two.delete("s")
+    assert one.get("s") is None
+
+
+def test_make_session_store_falls_back_to_memory(monkeypatch):
+    def unavailable(**kwargs):
+        raise OSError("unable to open database file")
+
+    monkeypatch.setattr(session_store, "SqliteSessionStore", unavailable)
+    assert session_store.make_session_store("sqlite").backend == "memory"
+    assert session_store.make_session_store("memory").backend == "memory"
@@ -0,0 +1,81 @@
+"""
+Tests for slack_backfill and the /slack/backfill endpoint.
+Runs offline against the scratch collection from conftest.py.
+Run with: pytest test_slack_backfill.py -v
+"""
+
+import json
+
+import pytest
+
+import slack_backfill
+
+
+def _lines(*texts, channel="C1"):
+    return [json.dumps({"text": t, "channel_id": channel, "ts": f"17000000{i}.0001"}) + "\n"
+            for i, t in enumerate(texts)]
+
+
+@pytest.fixture
+def client(corpus, monkeypatch):
+    import app
+    monkeypatch.setenv("SLACK_INGEST_TOKEN", "test-token")
+    app.app.config["TESTING"] = True
+    test_client = app.app.test_client()
+    test_client.environ_base["HTTP_AUTHORIZATION"] = "Bearer test-token"
+    return test_client
+
+
+def test_job_paths_returns_the_sanitized_id():
+    job_id, data_path, checkpoint_path = slack_backfill.job_paths("x!")
+    assert job_id == "x"
+    assert (data_path, checkpoint_path) == slack_backfill.job_paths("x")[1:]
+    with pytest.raises(ValueError):
+        slack_backfill.job_paths("../")
+
+
+def test_colliding_job_id_cant_replace_a_running_jobs_input(client):
+    job_id, data_path, _ = slack_backfill.job_paths("collide")
+    with open(data_path, "w") as f:
+        f.write("original\n")
+    assert slack_backfill.claim_job(job_id)
+    try:
+        response = client.post("/slack/backfill?job_id=collide!", data="".join(_lines("new input")))
+        assert response.status_code == 409
+        with open(data_path) as f:
+            assert f.read() == "original\n"
+
+        resumed = client.post("/slack/backfill?job_id=coll/ide")
+        assert resumed.status_code == 202
+        assert resumed.get_json()["job_id"] == "collide"
+    finally:
+        slack_backfill.release_job(job_id)
+
+
+class FailingGroq:
+    """Groq client whose every call fails, like an outage."""
+
+    class chat:
+        class completions:
+            @staticmethod
+            def create(**kwargs):
+                raise ConnectionError("groq unavailable")
+
+
+def test_failed_extraction_is_counted_and_retried(corpus, monkeypatch, tmp_path):
+    from slack_dedupe import processed_messages
+    lines = _lines("I'm Ana, a Python dev into HealthTech", "I'm Bo, a designer", channel="CFAIL")
+    checkpoint = str(tmp_path / "job.checkpoint.json")
+    stub = corpus.client
+    monkeypatch.setattr(corpus, "client", FailingGroq())
+
+    state = slack_backfill.backfill(lines, checkpoint)
+    assert (state["failed"], state["ingested"]) == (2, 0)
+    assert ("CFAIL", "170000000.0001") not in processed_messages
+    assert corpus.get_collaborator_by_id("slack_CFAIL_170000000_0001") is None
+
+    # Once Groq is back, a fresh run of the same messages ingests them
+    monkeypatch.setattr(corpus, "client", stub)
+    state = slack_backfill.backfill(lines)
+    assert (state["failed"], state["ingested"]) == (0, 2)
+    assert corpus.get_collaborator_by_id("slack_CFAIL_170000000_0001")["name"] != "User"
@@ -0,0 +1,156 @@
+"""
+Tests for slack_client against a local stub of Slack's chat.postMessage.
+No network or Slack credentials needed.
+Run with: pytest test_slack_client.py -v
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from slack_client import SlackClient, TokenBucket
+
+
+class StubSlack(BaseHTTPRequestHandler):
+    """chat.postMessage stub; behaviour per channel is scripted through server.script."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        channel = body.get("channel")
+        with self.server.lock:
+            self.server.requests.append((time.monotonic(), channel))
+            script = self.server.script.get(channel, [])
+            action = script.pop(0) if script else "ok"
+
+        if action == "429":
+            self._reply(429, {"ok": False, "error": "ratelimited"}, {"Retry-After": "0.2"})
+        elif action == "500":
+            self._reply(500, {"ok": False, "error": "internal_error"})
+        elif action == "not_in_channel":
+            self._reply(200, {"ok": False, "error": "not_in_channel"})
+        else:
+            self._reply(200, {"ok": True, "channel": channel, "ts": f"{time.time():.6f}"})
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSlack)
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = []
+    server.script = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server, **kwargs):
+    kwargs.setdefault("rate", 1000)
+    kwargs.setdefault("burst", 1000)
+    kwargs.setdefault("backoff_base", 0.01)
+    return SlackClient(base_url=f"http://127.0.0.1:{server.server_port}/api", **kwargs)
+
+
+def test_connection_reuse_and_p99_latency(stub):
+    client = _client(stub)
+    latencies = []
+    for i in range(200):
+        start = time.perf_counter()
+        assert client.post_message("xoxb-test", f"C{i % 5}", "hello", thread_ts="1.0")
+        latencies.append(time.perf_counter() - start)
+    client.close()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"\n  200 posts over {stub.connections} connection(s): p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+    # Sequential posts should all ride one kept-alive connection
+    assert stub.connections == 1
+    assert p99 < 250
+
+
+def test_retries_after_429_honouring_retry_after(stub):
+    stub.script["C1"] = ["429", "ok"]
+    client = _client(stub, rate=10, burst=1)
+    start = time.monotonic()
+    assert client.post_message("xoxb-test", "C1", "hi")
+    elapsed = time.monotonic() - start
+    client.close()
+
+    assert client.rate_limited == 1 and client.retried == 1
+    assert len(stub.requests) == 2
+    # Retry-After: 0.2 must be respected before the second attempt
+    assert stub.requests[1][0] - stub.requests[0][0] >= 0.2
+    assert elapsed >= 0.2
+
+
+def test_retries_5xx_with_backoff_then_gives_up(stub):
+    stub.script["C1"] = ["500", "ok"]
+    stub.script["C2"] = ["500"] * 10
+    client = _client(stub, retries=2)
+    assert client.post_message("xoxb-test", "C1", "hi")
+    assert not client.post_message("xoxb-test", "C2", "hi")
+    client.close()
+    assert sum(1 for _, c in stub.requests if c == "C2") == 3
+    assert client.failed == 1
+
+
+def test_permanent_errors_are_not_retried(stub):
+    stub.script["C1"] = ["not_in_channel"]
+    client = _client(stub)
+    assert not client.post_message("xoxb-test", "C1", "hi")
+    client.close()
+    assert len(stub.requests) == 1 and client.retried == 0
+
+
+def test_per_channel_rate_limit(stub):
+    client = _client(stub, rate=20, burst=1)
+    start = time.monotonic()
+    for _ in range(5):
+        assert client.post_message("xoxb-test", "C1", "hi")
+    same_channel = time.monotonic() - start
+
+    start = time.monotonic()
+    for i in range(5):
+        assert client.post_message("xoxb-test", f"D{i}", "hi")
+    other_channels = time.monotonic() - start
+    client.close()
+
+    # 4 posts beyond the burst at 20/s take >= 0.2s; distinct channels aren't throttled
+    assert same_channel >= 0.19
+    assert other_channels < same_channel
+
+
+def test_token_bucket_debt_after_penalty():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.acquire() == 0
+    bucket.penalize(0.1)
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.1
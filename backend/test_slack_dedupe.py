@@ -0,0 +1,55 @@
+"""
+Tests for slack_dedupe: the rotating key sets' window, early rotation at the per-bucket
+cap, discard, and text normalization.
+Run with: pytest test_slack_dedupe.py -v
+"""
+
+import pytest
+
+import slack_dedupe
+from slack_dedupe import RotatingKeySet, normalize_text
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(slack_dedupe.time, "time", lambda: now[0])
+    return now
+
+
+def test_keys_are_remembered_for_the_window(clock):
+    keys = RotatingKeySet(window_seconds=80, buckets=8)
+    assert keys.check_and_add(("C1", "1.0")) is False
+    assert keys.check_and_add(("C1", "1.0")) is True
+    assert ("C1", "2.0") not in keys
+    clock[0] += 80
+    assert ("C1", "1.0") in keys  # at least the window
+    clock[0] += 10
+    assert ("C1", "1.0") not in keys  # at most one bucket span longer
+    assert keys.stats()["keys"] == 0
+
+
+def test_full_buckets_rotate_early_and_stay_bounded(clock):
+    keys = RotatingKeySet(window_seconds=80, buckets=8, max_keys=18)  # 9 buckets of 2 keys
+    for i in range(100):
+        keys.add(i)
+    stats = keys.stats()
+    assert len(keys) <= stats["max_keys"] == 18
+    assert stats["buckets"] == 9 and stats["early_rotations"] > 0
+    assert 99 in keys and 0 not in keys  # oldest keys go first
+
+
+def test_discard_forgets_a_key(clock):
+    keys = RotatingKeySet(window_seconds=60)
+    keys.add("a")
+    clock[0] += 20  # now in an older bucket
+    keys.add("b")
+    keys.discard("a")
+    keys.discard("missing")
+    assert "a" not in keys and "b" in keys
+    assert keys.check_and_add("a") is False
+
+
+def test_normalize_text():
+    assert normalize_text("  Hello   WORLD\n") == "hello world"
+    assert normalize_text(None) == ""
@@ -0,0 +1,96 @@
+"""
+Tests for slot_detector: dictionary matches, ambiguous terms, seek and negation cues,
+the confidence threshold and the optional embedding lookup.
+Run with: pytest test_slot_detector.py -v
+"""
+
+import zlib
+
+import numpy as np
+import pytest
+
+import slot_detector
+from slot_detector import SlotDetector
+
+
+def _embed(aliases):
+    """Deterministic random vectors per (aliased) lowercased text, so only aliases are close."""
+    def embed(texts):
+        rows = []
+        for t in texts:
+            key = aliases.get(t.lower(), t.lower())
+            rows.append(np.random.default_rng(zlib.crc32(key.encode())).standard_normal(64))
+        return np.asarray(rows)
+    return embed
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return SlotDetector()
+
+
+def test_dictionary_matches_keep_the_users_spelling(detector):
+    d = detector.detect("I do Python and React, into HealthTech and AI")
+    assert (d.skills, d.interests, d.confident) == (["Python", "React"], ["HealthTech", "AI"], True)
+    assert (d.skills_confidence, d.interests_confidence) == (1.0, 1.0)
+    # Topic aliases have no display value, so the original casing is kept
+    assert detector.detect("healthtech python").interests == ["healthtech"]
+
+
+def test_ambiguous_terms_are_below_the_threshold(detector):
+    d = detector.detect("I know Go and love travel")
+    assert (d.skills, d.interests, d.confident) == ([], [], False)
+    assert (d.skills_confidence, d.interests_confidence) == (0.5, 0.5)
+    assert SlotDetector(threshold=0.5).detect("I know Go and love travel").skills == ["Go"]
+
+
+def test_seek_and_negation_cues(detector):
+    # Skills after a seeking cue describe someone else
+    d = detector.detect("I do Python. Looking for a Designer with Figma")
+    assert (d.skills, d.interests) == (["Python"], [])
+    # Everything after a negation in the same clause is dropped; "but" starts a new clause
+    assert detector.detect("I am not into fintech, I do Python").skills == []
+    d = detector.detect("I'm not into fintech but I do Python")
+    assert (d.skills, d.interests) == (["Python"], [])
+
+
+def test_empty_messages(detector):
+    for message in ("", None, "Hi there"):
+        assert detector.detect(message) == slot_detector.Detection([], [], 0.0, 0.0, False)
+
+
+def test_embeddings_are_off_by_default():
+    calls = []
+    detector = SlotDetector(embed=lambda texts: calls.append(texts) or _embed({})(texts))
+    assert detector.detect("I build with Pythn").skills == []
+    assert calls == [] and detector.stats()["embeddings"] is False
+
+
+def test_embedding_lookup_catches_near_misses(monkeypatch):
+    monkeypatch.setattr(slot_detector, "SLOT_DETECTOR_EMBEDDINGS", True)
+    detector = SlotDetector(embed=_embed({"pythn": "python", "helthcare": "healthcare"}))
+    d = detector.detect("I build with Pythn, into Helthcare")
+    assert (d.skills, d.interests, d.confident) == (["Python"], ["Healthcare"], True)
+    assert detector.stats()["embedding_matches"] == 2
+    # No embedder: dictionary only, even with the lookup enabled
+    assert SlotDetector(embed=None).detect("I build with Pythn").skills == []
+
+
+def test_failing_embedder_falls_back_to_the_dictionary(monkeypatch):
+    monkeypatch.setattr(slot_detector, "SLOT_DETECTOR_EMBEDDINGS", True)
+
+    def broken(texts):
+        raise RuntimeError("model not loaded")
+
+    assert SlotDetector(embed=broken).detect("Python and Pythn").skills == ["Python"]
+
+
+def test_stats_count_local_hits_and_fallbacks():
+    detector = SlotDetector()
+    detector.detect("Python, into AI")
+    detector.record(True)
+    detector.record(False)
+    detector.record(False)
+    stats = detector.stats()
+    assert (stats["messages"], stats["local_hits"], stats["fallbacks"]) == (1, 1, 2)
+    assert stats["hit_rate"] == round(1 / 3, 4) and stats["dictionary_matches"] == 2
@@ -0,0 +1,64 @@
+"""
+Tests for team create / dissolve and the team index (team_index.py), including teams
+formed by another process. Runs offline against the scratch collection from conftest.py.
+Run with: pytest test_teams.py -v
+"""
+
+import subprocess
+import sys
+import threading
+
+OTHER_PROCESS = """
+import ai_core
+result = ai_core.create_team(["user_4", "user_5"], "Elsewhere")
+print(result["team_id"])
+"""
+
+
+def test_create_and_dissolve(corpus):
+    result = corpus.create_team(["user_0", "user_1", "missing"], "Health")
+    team_id = result["team_id"]
+    assert result["members"] == {"user_0": "added", "user_1": "added", "missing": "not_found"}
+    assert set(corpus.team_index.members(team_id)) == {"user_0", "user_1"}
+    assert {m["id"] for m in corpus.get_teams()[team_id]} == {"user_0", "user_1"}
+    available = {u["id"] for u in corpus.get_available_users()}
+    assert "user_0" not in available and "user_1" not in available
+
+    again = corpus.create_team(["user_0", "user_2"], "Again")
+    assert again["team_id"] is None
+    assert again["members"] == {"user_0": "already_in_team", "user_2": "skipped"}
+
+    assert corpus.dissolve_team(team_id) is True
+    assert team_id not in corpus.get_teams()
+    assert corpus.dissolve_team(team_id) is False
+    assert {"user_0", "user_1"} <= {u["id"] for u in corpus.get_available_users()}
+
+
+def test_concurrent_creates_never_share_a_member(corpus):
+    results = []
+
+    def form(ids):
+        results.append(corpus.create_team(ids, "Race"))
+
+    threads = [threading.Thread(target=form, args=(["user_0", "user_1", f"user_{i}"],)) for i in (2, 3, 6, 7)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    formed = [r for r in results if r["team_id"]]
+    assert len(formed) == 1
+    members = [u for ids in corpus.get_teams().values() for u in (m["id"] for m in ids)]
+    assert len(members) == len(set(members)) == 3
+    assert corpus.get_database_stats()["by_availability"].get("In Team") == 3
+
+
+def test_team_created_by_another_process_is_found(corpus):
+    corpus.get_teams()  # index synced before the other process writes
+    out = subprocess.run([sys.executable, "-c", OTHER_PROCESS], capture_output=True, text=True, check=True)
+    team_id = out.stdout.strip().splitlines()[-1]
+    assert team_id.startswith("team_")
+
+    assert {m["id"] for m in corpus.get_teams()[team_id]} == {"user_4", "user_5"}
+    assert corpus.dissolve_team(team_id) is True
+    assert corpus.get_teams() == {}
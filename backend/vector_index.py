@@ -0,0 +1,318 @@
+"""
+Pluggable retrieval backends for collaborator search.
+
+- ChromaRetriever: delegates every query to collection.query (default).
+- NumpyRetriever: keeps the whole collection in one contiguous float32 matrix with
+  precomputed norms, so all filter tiers of a search are answered by a single matmul
+  and availability/role predicates are applied as boolean masks.
+
+Select with RETRIEVAL_BACKEND=chroma|numpy. The Chroma backend can also run in
+RETRIEVAL_MODE=single_pass, which fetches one wider candidate pool and resolves the
+filter tiers in memory instead of issuing one query per tier.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from corpus_version import corpus_version
+
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "chroma").strip().lower()
+# How often the in-memory index checks for writes by other processes (e.g. seed_db.py, other workers)
+VECTOR_INDEX_REFRESH_SECONDS = float(os.getenv("VECTOR_INDEX_REFRESH_SECONDS", "60"))
+# "tiered" = one collection.query per fallback tier, "single_pass" = one wide query for all tiers
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "tiered").strip().lower()
+SINGLE_PASS_POOL_SIZE = int(os.getenv("SINGLE_PASS_POOL_SIZE", "500"))
+
+
+def build_where(availability=None, roles=None):
+    """
+    Translate availability/role predicates into a Chroma where clause (None = unfiltered).
+    A single role becomes a plain $eq, since Chroma rejects $or with fewer than two clauses.
+    """
+    clauses = []
+    if availability:
+        clauses.append({"availability": {"$in": list(availability)}})
+    if roles:
+        roles = list(dict.fromkeys(roles))
+        if len(roles) == 1:
+            clauses.append({"role": {"$eq": roles[0]}})
+        else:
+            clauses.append({"$or": [{"role": {"$eq": r}} for r in roles]})
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+class ChromaRetriever:
+    """Runs each tier as its own collection.query round trip, or all of them from one wide query."""
+
+    name = "chroma"
+
+    def __init__(self, get_collection, mode=RETRIEVAL_MODE, pool_size=SINGLE_PASS_POOL_SIZE):
+        self._get_collection = get_collection
+        self.mode = mode
+        self.pool_size = pool_size
+
+    def query(self, embedding, n_results, availability=None, roles=None):
+        """Return candidate metadatas nearest to `embedding` that satisfy the predicates."""
+        kwargs = {
+            "query_embeddings": [embedding],
+            "n_results": n_results,
+            "include": ["metadatas"]
+        }
+        where = build_where(availability, roles)
+        if where is not None:
+            kwargs["where"] = where
+        results = self._get_collection().query(**kwargs)
+        if results and results.get('metadatas') and len(results['metadatas']) > 0:
+            return results['metadatas'][0] or []
+        return []
+
+    def query_tiers(self, embedding, n_results, tiers):
+        """
+        Try each (availability, roles) tier in order and return (metadatas, tier_index)
+        for the first one with results, or ([], len(tiers) - 1) if all are empty.
+        """
+        if self.mode == "single_pass" and tiers:
+            return self._query_tiers_single_pass(embedding, n_results, tiers)
+        metadatas = []
+        for i, (availability, roles) in enumerate(tiers):
+            metadatas = self.query(embedding, n_results, availability, roles)
+            if metadatas:
+                return metadatas, i
+        return metadatas, len(tiers) - 1
+
+    def _query_tiers_single_pass(self, embedding, n_results, tiers):
+        """
+        Fetch the nearest `pool_size` rows matching the first tier's availability filter
+        once, then resolve every tier sharing that filter by masking roles in memory.
+
+        Results are equivalent to the tiered chain up to ANN approximation: a tier answered
+        from the pool is what an exact search would return when the pool held every
+        matching row or already yields n_results hits; otherwise (pool truncated and short
+        for that tier) it is re-asked with its own query. Chroma's HNSW index is approximate,
+        though, and one wide filtered query and a narrower per-tier query can each miss a
+        different near neighbour, so the two modes may disagree on borderline rows. With a
+        pool at least as large as the collection no tier is re-asked, so every search costs
+        one ANN query unless no row matches the availability filter at all.
+        """
+        pool_availability = tiers[0][0]
+        collection = self._get_collection()
+        total = collection.count()
+        pool_size = min(total, max(n_results, self.pool_size))
+        pool = self.query(embedding, pool_size, pool_availability) if pool_size > 0 else []
+        truncated = len(pool) >= pool_size and pool_size < total
+
+        metadatas = []
+        for i, (availability, roles) in enumerate(tiers):
+            if availability == pool_availability:
+                hits = [md for md in pool if not roles or md.get('role') in roles]
+                if truncated and len(hits) < n_results:
+                    metadatas = self.query(embedding, n_results, availability, roles)
+                else:
+                    metadatas = hits[:n_results]
+            else:
+                metadatas = self.query(embedding, n_results, availability, roles)
+            if metadatas:
+                return metadatas, i
+        return metadatas, len(tiers) - 1
+
+    # Chroma is the source of truth, so there is nothing to keep in sync
+    watch = None
+
+    def upsert(self, ids, embeddings, metadatas):
+        pass
+
+    def update_metadatas(self, ids, metadatas):
+        pass
+
+
+class NumpyRetriever:
+    """
+    Exact L2 search over an in-memory copy of the collection. Writes made through ai_core
+    are mirrored in place; writes by other processes are noticed through the shared corpus
+    version (or a row-count change) and trigger a full reload.
+    """
+
+    name = "numpy"
+
+    def __init__(self, get_collection, refresh_seconds=VECTOR_INDEX_REFRESH_SECONDS):
+        self._get_collection = get_collection
+        self._refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._checked_at = 0.0
+        self.watch = corpus_version.watch()
+        self._reset()
+
+    def _reset(self, dim=0, capacity=0):
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._sq_norms = np.zeros(capacity, dtype=np.float32)
+        self._availability = np.empty(capacity, dtype=object)
+        self._roles = np.empty(capacity, dtype=object)
+        self._ids = []
+        self._metadatas = []
+        self._row_of = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def load(self):
+        """(Re)build the index from every row currently in Chroma."""
+        version = corpus_version.current()
+        data = self._get_collection().get(include=["embeddings", "metadatas"])
+        ids = data.get('ids') or []
+        embeddings = data.get('embeddings') or []
+        metadatas = data.get('metadatas') or []
+        with self._lock:
+            dim = len(embeddings[0]) if len(embeddings) else 0
+            self._reset(dim, len(ids))
+            self._loaded = True
+            self._checked_at = time.monotonic()
+            if ids:
+                self._append(ids, embeddings, metadatas)
+            self.watch.synced(version)
+        print(f"🧮 In-memory vector index loaded with {len(ids)} rows")
+
+    def _ensure_fresh(self):
+        if not self._loaded:
+            self.load()
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self._refresh_seconds:
+            return
+        self._checked_at = now
+        # Same-size reseeds and team changes elsewhere only show up in the version
+        stale, _ = self.watch.stale()
+        if stale or self._get_collection().count() != len(self._ids):
+            self.load()
+
+    def _append(self, ids, embeddings, metadatas):
+        n_old = len(self._ids)
+        n_new = n_old + len(ids)
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if self._matrix.shape[1] == 0:
+            self._reset(vectors.shape[1], 0)
+        if n_new > self._matrix.shape[0]:
+            # Grow geometrically so repeated single-profile saves stay amortized O(1)
+            capacity = max(n_new, 2 * self._matrix.shape[0], 64)
+            self._matrix = _grow(self._matrix, capacity)
+            self._sq_norms = _grow(self._sq_norms, capacity)
+            self._availability = _grow(self._availability, capacity)
+            self._roles = _grow(self._roles, capacity)
+        self._matrix[n_old:n_new] = vectors
+        self._sq_norms[n_old:n_new] = np.einsum('ij,ij->i', vectors, vectors)
+        for offset, (row_id, md) in enumerate(zip(ids, metadatas)):
+            row = n_old + offset
+            md = dict(md or {})
+            self._ids.append(row_id)
+            self._metadatas.append(md)
+            self._row_of[row_id] = row
+            self._availability[row] = md.get('availability')
+            self._roles[row] = md.get('role')
+
+    def upsert(self, ids, embeddings, metadatas):
+        """Mirror a collection.add/upsert into the index."""
+        with self._lock:
+            if not self._loaded:
+                return  # Picked up by the first load()
+            fresh_ids, fresh_emb, fresh_md = [], [], []
+            for row_id, emb, md in zip(ids, embeddings, metadatas):
+                row = self._row_of.get(row_id)
+                if row is None:
+                    fresh_ids.append(row_id)
+                    fresh_emb.append(emb)
+                    fresh_md.append(md)
+                    continue
+                vec = np.asarray(emb, dtype=np.float32)
+                self._matrix[row] = vec
+                self._sq_norms[row] = float(vec @ vec)
+                self._set_metadata(row, md)
+            if fresh_ids:
+                self._append(fresh_ids, fresh_emb, fresh_md)
+
+    def update_metadatas(self, ids, metadatas):
+        """Mirror a collection.update(metadatas=...) into the index."""
+        with self._lock:
+            if not self._loaded:
+                return
+            for row_id, md in zip(ids, metadatas):
+                row = self._row_of.get(row_id)
+                if row is not None:
+                    self._set_metadata(row, md)
+
+    def _set_metadata(self, row, md):
+        md = dict(md or {})
+        self._metadatas[row] = md
+        self._availability[row] = md.get('availability')
+        self._roles[row] = md.get('role')
+
+    def _mask(self, n, availability, roles):
+        mask = np.ones(n, dtype=bool)
+        if availability:
+            mask &= np.isin(self._availability[:n], list(availability))
+        if roles:
+            mask &= np.isin(self._roles[:n], list(roles))
+        return mask
+
+    def _distances(self, embedding):
+        n = len(self._ids)
+        q = np.asarray(embedding, dtype=np.float32)
+        # Squared L2, same metric as Chroma's default space
+        return self._sq_norms[:n] - 2.0 * (self._matrix[:n] @ q) + float(q @ q)
+
+    def _top(self, dist, mask, n_results):
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return []
+        k = min(n_results, rows.size)
+        d = dist[rows]
+        if k < rows.size:
+            part = np.argpartition(d, k - 1)[:k]
+            rows, d = rows[part], d[part]
+        order = np.argsort(d, kind='stable')
+        return [dict(self._metadatas[r]) for r in rows[order]]
+
+    def query(self, embedding, n_results, availability=None, roles=None):
+        with self._lock:
+            self._ensure_fresh()
+            if not self._ids:
+                return []
+            dist = self._distances(embedding)
+            return self._top(dist, self._mask(len(self._ids), availability, roles), n_results)
+
+    def query_tiers(self, embedding, n_results, tiers):
+        """All tiers share one distance computation; only the masks differ."""
+        with self._lock:
+            self._ensure_fresh()
+            if not self._ids:
+                return [], len(tiers) - 1
+            n = len(self._ids)
+            dist = self._distances(embedding)
+            for i, (availability, roles) in enumerate(tiers):
+                metadatas = self._top(dist, self._mask(n, availability, roles), n_results)
+                if metadatas:
+                    return metadatas, i
+            return [], len(tiers) - 1
+
+
+def _grow(arr, capacity):
+    out = np.empty((capacity,) + arr.shape[1:], dtype=arr.dtype)
+    if arr.dtype != object:
+        out[:] = 0
+    out[:arr.shape[0]] = arr
+    return out
+
+
+def make_retriever(get_collection, backend=RETRIEVAL_BACKEND):
+    """Build the retrieval backend named by RETRIEVAL_BACKEND (unknown names fall back to Chroma)."""
+    if backend == "numpy":
+        return NumpyRetriever(get_collection)
+    if backend != "chroma":
+        print(f"⚠️  Unknown RETRIEVAL_BACKEND '{backend}', using chroma")
+    return ChromaRetriever(get_collection)
@@ -19,6 +19,7 @@ def wipe_chromadb():
         print("✅ ChromaDB wiped successfully!")
     else:
         print("ℹ️  No ChromaDB found at ./chroma_db")
+    print("ℹ️  The embedding cache (EMBED_CACHE_PATH) is kept, so re-seeding skips inference")
     
     print("\n📝 Next steps:")
     print("   1. Run: python seed_db.py")